@@ -35,6 +35,8 @@ uniaxialMaterial('Elastic', matTag, E)
 
 # SECTIONS LIBRERIES:
 from DEF_leer_registro_peer import leer_registro_peer
+from DEF_registro_respuesta import registrar_respuesta
+from DEF_energia import iniciar_energia, actualizar_energia, balance_energia
 
 # TIME SERIES:
 
@@ -96,26 +98,14 @@ integrator('Newmark', 0.5, 0.25)
  # create analysis object
 analysis('Transient')
 
-ustep=np.zeros(Nsteps)
-vstep=np.zeros(Nsteps)
-astep=np.zeros(Nsteps)
-Lstep=np.zeros(Nsteps)
-nstep=np.zeros(Nsteps)
-tstep=np.zeros(Nsteps)
-Rstep=np.zeros(Nsteps)
-Fstep=np.zeros(Nsteps)
-
-for i in range(Nsteps):
-    analyze(1,dt)
-    ustep[i]=nodeDisp(2, 1)
-    vstep[i]=nodeVel(2, 1)
-    astep[i]=nodeAccel(2, 1)
-    Lstep[i]=getLoadFactor(1)
-    reactions()
-    Rstep[i]=nodeReaction(1, 1)
-    Fstep[i]=eleForce(1, 1)
-    nstep[i]=i+1
-    tstep[i]=getTime()
+canales=[('disp', 2, 1), ('vel', 2, 1), ('accel', 2, 1), ('loadFactor', 1),
+         ('reaction', 1, 1), ('eleForce', 1, 1), ('time',)]
+# Balance energético paso a paso, sin guardar historias
+energia=iniciar_energia(ag, dt, 1, alphaM, betaK, betaKinit, betaKcomm)
+datos, nombres = registrar_respuesta(canales, Nsteps, dt, al_paso=[lambda: actualizar_energia(energia)])
+print(balance_energia(energia))
+ustep, vstep, astep, Lstep, Rstep, Fstep, tstep = datos.T
+nstep=np.arange(1, len(datos)+1)
     
 # plt.plot(nstep,Lstep)
 # plt.title('LoadFactor')
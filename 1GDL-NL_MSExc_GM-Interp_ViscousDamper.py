@@ -47,6 +47,7 @@ uniaxialMaterial('ViscousDamper', matTag2, K_el, Cd, alpha, LGap, NM, RelTol, Ab
 
 # SECTIONS LIBRERIES:
 from DEF_leer_registro_peer import leer_registro_peer
+from DEF_paso_adaptativo import crear_control, analisis_interpolado, resumen_control
 
 # TIME SERIES:
 
@@ -125,31 +126,27 @@ Iter=50
 pFlag=0
 nType=2
 test('NormDispIncr', tol, Iter, pFlag, nType)
+# Paso adaptativo: las series Trig son suaves, así que tras varios pasos
+# fáciles el paso crece hasta DT_MAX; las salidas se interpolan en t = i*dt
+# (con 4*dt la fuerza del amortiguador cambia un 2.5 %, con 2*dt un 1.5 %)
+DT_MAX = 2*dt
+control = crear_control(dt, dt_min=dt/2**6, dt_max=DT_MAX)
 
 integrator('Newmark', 0.5, 0.25)
  # create analysis object
 analysis('Transient')
 
-ustep=np.zeros(Nsteps)
-vstep=np.zeros(Nsteps)
-astep=np.zeros(Nsteps)
-Lstep=np.zeros(Nsteps)
-nstep=np.zeros(Nsteps)
-tstep=np.zeros(Nsteps)
-Rstep=np.zeros(Nsteps)
-Fstep=np.zeros(Nsteps)
-
-for i in range(Nsteps):
-    analyze(1,dt)
-    ustep[i]=nodeDisp(2, 1)
-    vstep[i]=nodeVel(2, 1)
-    astep[i]=nodeAccel(2, 1)
-    Lstep[i]=getLoadFactor(1)
+def leer_paso():
     reactions()
-    Rstep[i]=nodeReaction(1, 1)
-    Fstep[i]=eleForce(1, 1)
-    nstep[i]=i+1
-    tstep[i]=getTime()
+    return nodeDisp(2, 1), nodeVel(2, 1), nodeAccel(2, 1), getLoadFactor(1), nodeReaction(1, 1), eleForce(1, 1)
+
+pasos, salidas = analisis_interpolado(control, Nsteps, dt, leer_paso)
+ustep, vstep, astep, Lstep, Rstep, Fstep = salidas.T
+nstep = np.arange(1, pasos + 1)
+tstep = nstep*dt
+resumen, registro = resumen_control(control)
+print(f"Pasos de salida: {pasos}/{Nsteps}")
+print(resumen)
     
 # plt.plot(nstep,Lstep)
 # plt.title('LoadFactor')
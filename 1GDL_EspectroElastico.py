@@ -12,17 +12,15 @@ print("=========================================================")
 print("Espectro Elástico de Piso")
 
 # PYTHON LIBRERIES:
-from openseespy.opensees import *
-
 import numpy as np
 import matplotlib.pyplot as plt
 import time
-from scipy.integrate import cumulative_trapezoid
 
 tic = time.time()     # empieza el cronómetro
 	
 # DEFINITIONS:
 from DEF_leer_registro_peer import leer_registro_peer
+from DEF_espectro_elastico import espectros_amortiguamientos, comprobar_espectro_elastico
 
 # CONSTANTS VALUES:
 g = 9810; # Aceleración de la gravedad en mm/s^2
@@ -37,97 +35,24 @@ ruta='Imperial Valley/RSN4_IMPVALL.BG_B-ELC000.AT2'
 Nsteps, dt, ag = leer_registro_peer(ruta)
 ag=ag*g
 
-umax=np.zeros(len(T))
-vmax=np.zeros(len(T))
-amax=np.zeros(len(T))
-Emax=np.zeros(len(T))
-Fmax=np.zeros(len(T))
-
-for j in range(len(T)):
-    
-    # OPENSEES LIBRERIES:
-    model('basic', '-ndm', 1, '-ndf', 1) # Carga las funciones de OpenSees para construir el modelo
-    wipe() # Limpia los objetos y archivos de salida del interprete
-
-    # MATERIALS LIBRERIES:
-    matTag=1
-    K=(2*pi/T[j])**2
-    uniaxialMaterial('Elastic', matTag, K)
-    
-    # SECTIONS LIBRERIES:
-    
-    # TIME SERIES:
-    tagTS=1
-    timeSeries('Path', tagTS, '-dt', dt, '-values', *ag)
-   
-        # NODE COORDENATES:
-    node(1, 0)
-    node(2, 0,'-mass', M)
-    
-    # BOUNDARY CONDITIONS:
-    fix(1, 1)
-    fix(2, 0)
-     
-    # ELEMENTS:
-    eleTag=1
-    element('zeroLength', eleTag, 1,2, '-mat', matTag, '-dir', 1,'-doRayleigh', 1)
-    
-    
-    # DAMPING MODEL    
-    Damping=0.05
-    Lambda=eigen('-fullGenLapack', 1)
-    LambdaI=Lambda[0]
-   
-    omegaI=np.sqrt(LambdaI)
-    
-    alphaM=2*Damping*omegaI
-    betaK=0
-    betaKinit=0
-    betaKcomm=0
-    rayleigh(alphaM, betaK, betaKinit, betaKcomm)
-    	 
-    # ANALYSIS
-    accelSeriesTag=tagTS
-    pattern('UniformExcitation', 1, 1, '-accel', accelSeriesTag)
-    
-    system('UmfPack')
-    numberer("RCM")
-    constraints('Transformation')
-    algorithm("Newton")
-    integrator('Newmark', 0.5, 0.25)
-    analysis('Transient')
-
-    # SAVE RESULTS
-    ustep=np.zeros(Nsteps)
-    vstep=np.zeros(Nsteps)
-    astep=np.zeros(Nsteps)
-    Estep=np.zeros(Nsteps)
-    Lstep=np.zeros(Nsteps)
-    Fstep=np.zeros(Nsteps)
-    nstep=np.zeros(Nsteps)
-    tstep=np.zeros(Nsteps)
-    for i in range(Nsteps):
-        
-        analyze(1,dt)
-        
-        ustep[i]=nodeDisp(2, 1)
-        vstep[i]=nodeVel(2, 1)
-        astep[i]=nodeAccel(2, 1)
-        
-        Lstep[i]=getLoadFactor(1)
-        Fstep[i]=eleForce(1, 1)
-        nstep[i]=i+1
-        tstep[i]=getTime()
-        
-    du = np.gradient(ustep, dt)
-    Estep = cumulative_trapezoid(-ag * M * vstep, dx=dt, initial=0.0)
-    
-    # FIGURE
-    umax[j]=np.max(np.abs(ustep))
-    vmax[j]=np.max(np.abs(vstep))
-    amax[j]=np.max(np.abs(astep))
-    Fmax[j]=np.max(np.abs(Fstep))
-    Emax[j]=np.max(Estep)
+# Integración vectorizada: todos los periodos y amortiguamientos avanzan a la
+# vez en NumPy (una sola pasada por el registro)
+amortiguamientos=(0.02, 0.05, 0.10, 0.20)
+S=espectros_amortiguamientos(T, dt, ag, amortiguamientos, M)
+
+Damping=0.05
+iD=amortiguamientos.index(Damping)
+umax=S['umax'][iD]
+vmax=S['vmax'][iD]
+amax=S['amax'][iD]
+Emax=S['Emax'][iD]
+Fmax=S['Fmax'][iD]
+
+# Comprobación frente al bucle original de OpenSees (un modelo por periodo)
+comprobar=False
+if comprobar:
+    errores=comprobar_espectro_elastico(T, dt, ag, M, Damping)
+    print("Error relativo frente a OpenSees:", errores)
         
 plt.plot(T,amax)
 plt.title('Espectro Elástico - Aceleración')
@@ -149,6 +74,14 @@ plt.xlabel('T [s]')
 plt.ylabel(r'$S_d$ [mm]')
 plt.show()
 
+for d, xi in enumerate(amortiguamientos):
+    plt.plot(T, S['Sa'][d], label='{:.0%}'.format(xi))
+plt.title('Espectro Elástico - Pseudoaceleración')
+plt.xlabel('T [s]')
+plt.ylabel(r'$S_a$ [mm/s$^2$]')
+plt.legend()
+plt.show()
+
 plt.plot(T,np.sqrt(Emax))
 plt.title('Espectro Elástico - energy Input')
 plt.xlabel('T [s]')
@@ -166,7 +99,8 @@ print("Tiempo transcurrido: {:.4f} s".format(toc - tic))
 
     
  # Guardar todo en un solo archivo
-np.savez("ImperialValley_EspectroL.npz", T=T,amax=amax,vmax=vmax,umax=umax,Emax=Emax,Fmax=Fmax)  
+np.savez("ImperialValley_EspectroL.npz", T=T,amax=amax,vmax=vmax,umax=umax,Emax=Emax,Fmax=Fmax,
+         amortiguamientos=S['amortiguamientos'], Sd=S['umax'], Sa=S['Sa'], E=S['Emax'])  
     
 
 
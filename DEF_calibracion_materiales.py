@@ -0,0 +1,232 @@
+import os
+import hashlib
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import openseespy.opensees as ops
+from scipy.optimize import differential_evolution
+
+from DEF_materiales_vectorizados import PARAMETROS, respuesta_material
+
+# Carpeta por defecto para la caché (.npz) de parámetros ya evaluados
+DIR_CACHE_CALIBRACION = os.environ.get('CALIBRACION_CACHE_DIR',
+                                       os.path.join(os.path.expanduser('~'), '.cache',
+                                                    'calibracion_materiales'))
+
+
+def ciclo_zerolength(nombre, desplazamientos, parametros):
+    """
+    Ensayo cíclico en control de desplazamiento de un elemento zeroLength
+    con el uniaxialMaterial 'nombre' (como en los scripts 1GDL-NL_CtrlF_*):
+    el desplazamiento del nudo 2 se impone con sp() y una serie 'Path' y se
+    lee la fuerza del elemento en cada paso. Borra el modelo actual de
+    OpenSees.
+
+    Parámetros:
+        nombre          : material de OpenSees ('Steel02', 'Hysteretic', ...)
+        desplazamientos : historia de desplazamientos (pasos,), desde 0
+        parametros      : diccionario con los parámetros del material
+                          (nombres de PARAMETROS[nombre] en
+                          DEF_materiales_vectorizados; los opcionales que
+                          falten toman el valor por defecto)
+
+    Devuelve:
+        fuerza : np.ndarray (pasos,)
+    """
+    d = np.asarray(desplazamientos, dtype=float)
+    valores = [float(parametros.get(p, defecto)) for p, defecto in PARAMETROS[nombre]]
+
+    ops.wipe()
+    ops.model('basic', '-ndm', 1, '-ndf', 1)
+    ops.node(1, 0.0)
+    ops.node(2, 0.0)
+    ops.fix(1, 1)
+    ops.uniaxialMaterial(nombre, 1, *valores)
+    ops.element('zeroLength', 1, 1, 2, '-mat', 1, '-dir', 1)
+    ops.timeSeries('Path', 1, '-time', *range(d.size + 1), '-values', 0.0, *d)
+    ops.pattern('Plain', 1, 1)
+    ops.sp(2, 1, 1.0)
+    ops.system('UmfPack')
+    ops.numberer('RCM')
+    ops.constraints('Transformation')
+    ops.integrator('LoadControl', 1.0)
+    ops.algorithm('Newton')
+    ops.test('NormDispIncr', 1e-8, 50, 0, 2)
+    ops.analysis('Static')
+
+    fuerza = np.full(d.size, np.nan)
+    for i in range(d.size):
+        if ops.analyze(1) != 0:
+            break
+        fuerza[i] = ops.eleForce(1, 2)
+    ops.wipe()
+    return fuerza
+
+
+def error_ciclo(fuerza, fuerza_medida):
+    """
+    Error del ciclo: raíz del error cuadrático medio entre la fuerza
+    calculada y la medida, dividida por la fuerza máxima medida. Un ciclo
+    que no converge da infinito.
+    """
+    fuerza = np.asarray(fuerza, dtype=float)
+    fuerza_medida = np.asarray(fuerza_medida, dtype=float)
+    e = np.sqrt(np.mean((fuerza - fuerza_medida)**2, axis=-1))/np.max(np.abs(fuerza_medida))
+    return np.where(np.isfinite(e), e, np.inf)
+
+
+# Datos comunes de cada proceso de trabajo: el ciclo medido se envía una sola
+# vez al arrancar el proceso y no con cada bloque de candidatos.
+_datos_trabajador = {}
+
+
+def _iniciar_trabajador(nombre, desplazamientos, fuerza_medida, libres, fijos, motor):
+    _datos_trabajador.update(nombre=nombre, desplazamientos=desplazamientos,
+                             fuerza_medida=fuerza_medida, libres=libres, fijos=fijos, motor=motor)
+
+
+def _evaluar_bloque(X):
+    # Error del ciclo de cada fila de X (candidatos x parámetros libres)
+    datos = _datos_trabajador
+    if datos['motor'] == 'numpy':
+        parametros = dict(datos['fijos'])
+        parametros.update(zip(datos['libres'], X.T))
+        fuerza = respuesta_material(datos['nombre'], np.atleast_2d(datos['desplazamientos']),
+                                     **parametros)
+        return error_ciclo(fuerza, datos['fuerza_medida'])
+    errores = np.empty(len(X))
+    for i, x in enumerate(X):
+        parametros = dict(datos['fijos'], **dict(zip(datos['libres'], x)))
+        fuerza = ciclo_zerolength(datos['nombre'], datos['desplazamientos'], parametros)
+        errores[i] = error_ciclo(fuerza, datos['fuerza_medida'])
+    return errores
+
+
+def _huella(nombre, desplazamientos, fuerza_medida, libres, fijos, motor):
+    h = hashlib.sha1(np.ascontiguousarray(desplazamientos, dtype=float).tobytes())
+    h.update(np.ascontiguousarray(fuerza_medida, dtype=float).tobytes())
+    h.update(repr((nombre, motor, tuple(libres), sorted((k, float(v)) for k, v in fijos.items())))
+             .encode())
+    return h.hexdigest()
+
+
+def _leer_cache(ruta):
+    try:
+        with np.load(ruta) as datos:
+            return dict(zip(map(tuple, datos['X'].tolist()), datos['errores'].tolist()))
+    except (OSError, ValueError, KeyError):
+        return {}
+
+
+def _escribir_cache(ruta, memo):
+    os.makedirs(os.path.dirname(ruta), exist_ok=True)
+    temporal = ruta + f'.{os.getpid()}.tmp.npz'
+    np.savez(temporal, X=np.array(list(memo)), errores=np.array(list(memo.values())))
+    os.replace(temporal, ruta)
+
+
+def calibrar_material(nombre, desplazamientos, fuerza_medida, libres, fijos=None, motor='opensees',
+                      nproc=None, cache=True, dir_cache=None, semilla=None, **opciones_de):
+    """
+    Ajusta los parámetros de un uniaxialMaterial (p.ej. Steel02 o
+    Hysteretic) a un ciclo fuerza-desplazamiento medido con evolución
+    diferencial (scipy.optimize.differential_evolution). Cada generación de
+    candidatos se reparte en bloques entre procesos de trabajo, que
+    calculan el ciclo con ciclo_zerolength() (motor='opensees') o con los
+    kernels vectorizados de DEF_materiales_vectorizados (motor='numpy',
+    toda la generación de una vez en este intérprete; compensa con
+    poblaciones grandes o cuando no hay varios núcleos).
+
+    Los vectores de parámetros ya evaluados se memorizan y, con cache=True,
+    se guardan en dir_cache (por defecto DIR_CACHE_CALIBRACION, o la
+    variable de entorno CALIBRACION_CACHE_DIR) en un .npz por ciclo,
+    material y parámetros fijos, de modo que repetir una calibración con la
+    misma semilla no vuelve a calcular ningún ciclo.
+
+    Parámetros:
+        nombre          : material de OpenSees ('Steel02', 'Hysteretic', ...)
+        desplazamientos : desplazamientos impuestos del ensayo (pasos,)
+        fuerza_medida   : fuerza medida en cada paso (pasos,)
+        libres          : diccionario parámetro -> (mínimo, máximo)
+        fijos           : diccionario parámetro -> valor de los que no se
+                          ajustan (los opcionales que falten toman el valor
+                          por defecto de OpenSees)
+        nproc           : número de procesos (None -> os.cpu_count();
+                          1 -> cálculo en serie en este intérprete)
+        semilla         : semilla de differential_evolution
+        opciones_de     : otras opciones de differential_evolution
+                          (maxiter, popsize, tol, polish, ...)
+
+    Devuelve:
+        diccionario con 'parametros' (todos, ajustados y fijos), 'error'
+        (error_ciclo() del ajuste), 'fuerza' (ciclo ajustado),
+        'evaluaciones' (ciclos calculados), 'memorizadas' (ciclos tomados
+        de la memoria) y 'resultado' (OptimizeResult de scipy)
+
+    Nota: en Windows los procesos se crean con 'spawn', por lo que el script
+    que llama a esta función debe protegerse con if __name__ == '__main__':
+    """
+    if motor not in ('opensees', 'numpy'):
+        raise ValueError("motor debe ser 'opensees' o 'numpy'")
+    fijos = dict(fijos or {})
+    nombres = [p for p, _ in PARAMETROS[nombre]]
+    desconocidos = (set(libres) | set(fijos)) - set(nombres)
+    if desconocidos:
+        raise ValueError(f"Parámetros desconocidos para {nombre}: {sorted(desconocidos)}")
+    libres_orden = [p for p in nombres if p in libres]
+    limites = [libres[p] for p in libres_orden]
+    d = np.asarray(desplazamientos, dtype=float)
+    f_med = np.asarray(fuerza_medida, dtype=float)
+    datos = (nombre, d, f_med, libres_orden, fijos, motor)
+
+    memo = {}
+    ruta = None
+    if cache:
+        if dir_cache is None:
+            dir_cache = DIR_CACHE_CALIBRACION
+        ruta = os.path.join(dir_cache, _huella(*datos) + '.npz')
+        memo = _leer_cache(ruta)
+    contador = {'evaluaciones': 0, 'memorizadas': 0}
+
+    # Con motor='numpy' cada generación se calcula de una vez en este intérprete
+    if nproc is None:
+        nproc = os.cpu_count() or 1
+    pool = None
+    if nproc > 1 and motor == 'opensees':
+        pool = ProcessPoolExecutor(max_workers=nproc, initializer=_iniciar_trabajador, initargs=datos)
+    else:
+        _iniciar_trabajador(*datos)
+
+    def objetivo(x):
+        # x: (n_libres,) o (n_libres, S) con vectorized=True
+        X = np.atleast_2d(np.asarray(x, dtype=float).T)
+        claves = [tuple(fila) for fila in X.tolist()]
+        nuevas = list(dict.fromkeys(c for c in claves if c not in memo))
+        contador['memorizadas'] += len(claves) - len(nuevas)
+        if nuevas:
+            Xn = np.array(nuevas)
+            if pool is None:
+                errores = _evaluar_bloque(Xn)
+            else:
+                bloques = np.array_split(Xn, min(nproc, len(Xn)))
+                errores = np.concatenate(list(pool.map(_evaluar_bloque, bloques)))
+            memo.update(zip(nuevas, errores.tolist()))
+            contador['evaluaciones'] += len(nuevas)
+        errores = np.array([memo[c] for c in claves])
+        return errores if np.ndim(x) == 2 else errores[0]
+
+    try:
+        resultado = differential_evolution(objetivo, limites, vectorized=True, updating='deferred',
+                                           seed=semilla, **opciones_de)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+        if cache:
+            _escribir_cache(ruta, memo)
+
+    parametros = dict(fijos, **dict(zip(libres_orden, resultado.x.tolist())))
+    fuerza = ciclo_zerolength(nombre, d, parametros) if motor == 'opensees' else \
+        respuesta_material(nombre, d, **parametros)
+    return {'parametros': parametros, 'error': float(error_ciclo(fuerza, f_med)), 'fuerza': fuerza,
+            'evaluaciones': contador['evaluaciones'], 'memorizadas': contador['memorizadas'],
+            'resultado': resultado}
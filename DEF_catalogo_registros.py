@@ -0,0 +1,246 @@
+import os
+import sqlite3
+
+from DEF_leer_registro_peer import leer_cabecera_peer, cargar_registro_peer
+
+# Nombre por defecto del índice, dentro de la carpeta de registros
+NOMBRE_INDICE = 'catalogo_registros.sqlite'
+
+TIPOS_PEER = ('AT2', 'VT2', 'DT2')
+
+# Sufijos de componente vertical habituales en los nombres NGA
+COMPONENTES_VERTICALES = ('UP', 'DWN', 'DN', 'V', 'Z', 'HNZ', 'VER')
+
+_COLUMNAS = ['ruta', 'carpeta', 'rsn', 'evento', 'estacion', 'componente', 'tipo',
+             'horizontal', 'npts', 'dt', 'descripcion', 'mtime_ns', 'size']
+
+
+def interpretar_nombre_peer(nombre):
+    """
+    Separa el nombre de un archivo PEER NGA en sus campos, p.ej.:
+
+        'RSN6_IMPVALL.I_I-ELC180.AT2' -> rsn=6, evento='IMPVALL.I',
+                                          estacion='I-ELC', componente='180', tipo='AT2'
+        'RSN1100_KOBE_ABN000.DT2'     -> rsn=1100, evento='KOBE',
+                                          estacion='ABN', componente='000', tipo='DT2'
+
+    Devuelve un diccionario con rsn, evento, estacion, componente, tipo y
+    horizontal, o None si el nombre no sigue el convenio RSN<n>_<evento>_<estación><comp>.
+    """
+    base, ext = os.path.splitext(os.path.basename(nombre))
+    tipo = ext[1:].upper()
+    if tipo not in TIPOS_PEER or not base.upper().startswith('RSN'):
+        return None
+
+    trozos = base.split('_')
+    if len(trozos) < 3 or not trozos[0][3:].isdigit():
+        return None
+
+    rsn = int(trozos[0][3:])
+    evento = '_'.join(trozos[1:-1])
+    resto = trozos[-1]
+
+    # Componente: acimut de 3 cifras al final, o un sufijo vertical conocido
+    componente = ''
+    if len(resto) > 3 and resto[-3:].isdigit():
+        componente = resto[-3:]
+    else:
+        for sufijo in sorted(COMPONENTES_VERTICALES, key=len, reverse=True):
+            if resto.upper().endswith(sufijo) and len(resto) > len(sufijo):
+                componente = resto[-len(sufijo):]
+                break
+    estacion = resto[:len(resto) - len(componente)].rstrip('-')
+    horizontal = componente.upper() not in COMPONENTES_VERTICALES
+
+    return dict(rsn=rsn, evento=evento, estacion=estacion, componente=componente,
+                tipo=tipo, horizontal=horizontal)
+
+
+def _conectar(ruta_indice):
+    con = sqlite3.connect(ruta_indice)
+    con.row_factory = sqlite3.Row
+    con.execute("""
+        CREATE TABLE IF NOT EXISTS registros (
+            ruta        TEXT PRIMARY KEY,
+            carpeta     TEXT,
+            rsn         INTEGER,
+            evento      TEXT,
+            estacion    TEXT,
+            componente  TEXT,
+            tipo        TEXT,
+            horizontal  INTEGER,
+            npts        INTEGER,
+            dt          REAL,
+            descripcion TEXT,
+            mtime_ns    INTEGER,
+            size        INTEGER
+        )""")
+    con.execute("CREATE INDEX IF NOT EXISTS idx_clave ON registros (rsn, estacion, componente, tipo)")
+    con.execute("CREATE INDEX IF NOT EXISTS idx_evento ON registros (evento, tipo)")
+    con.execute("CREATE INDEX IF NOT EXISTS idx_dt ON registros (tipo, dt)")
+    return con
+
+
+def indexar_registros(dir_raiz, ruta_indice=None):
+    """
+    Recorre dir_raiz (con subcarpetas) y guarda en un índice SQLite todos los
+    registros .AT2/.VT2/.DT2 con su RSN, evento, estación, componente, tipo,
+    NPTS y DT. Solo se lee la cabecera de cada archivo, y en una nueva
+    ejecución solo se vuelven a leer los archivos añadidos o modificados
+    (fecha o tamaño distintos); los que ya no existen se eliminan del índice.
+
+    Las rutas se guardan relativas a la carpeta del índice, que por defecto
+    es dir_raiz/catalogo_registros.sqlite.
+
+    Devuelve:
+        ruta_indice : str
+    """
+    if ruta_indice is None:
+        ruta_indice = os.path.join(dir_raiz, NOMBRE_INDICE)
+    dir_indice = os.path.dirname(os.path.abspath(ruta_indice))
+
+    con = _conectar(ruta_indice)
+    previos = {fila['ruta']: (fila['mtime_ns'], fila['size'])
+               for fila in con.execute("SELECT ruta, mtime_ns, size FROM registros")}
+
+    vistos = set()
+    nuevos = []
+    for carpeta, _, archivos in os.walk(dir_raiz):
+        for nombre in archivos:
+            campos = interpretar_nombre_peer(nombre)
+            if campos is None:
+                continue
+            ruta_abs = os.path.join(carpeta, nombre)
+            ruta = os.path.relpath(ruta_abs, dir_indice).replace(os.sep, '/')
+            vistos.add(ruta)
+
+            estado = os.stat(ruta_abs)
+            if previos.get(ruta) == (estado.st_mtime_ns, estado.st_size):
+                continue
+
+            cabecera = leer_cabecera_peer(ruta_abs)
+            campos.update(ruta=ruta, carpeta=os.path.relpath(carpeta, dir_raiz).replace(os.sep, '/'),
+                          npts=cabecera.npts, dt=cabecera.dt, descripcion=cabecera.evento,
+                          mtime_ns=estado.st_mtime_ns, size=estado.st_size)
+            nuevos.append(tuple(campos[c] for c in _COLUMNAS))
+
+    with con:
+        con.executemany(f"INSERT OR REPLACE INTO registros ({', '.join(_COLUMNAS)}) "
+                        f"VALUES ({', '.join('?'*len(_COLUMNAS))})", nuevos)
+        borrados = [(ruta,) for ruta in previos if ruta not in vistos]
+        con.executemany("DELETE FROM registros WHERE ruta = ?", borrados)
+    con.close()
+
+    return ruta_indice
+
+
+def buscar_registros(ruta_indice, rsn=None, evento=None, estacion=None, componente=None,
+                     tipo=None, horizontal=None, dt_max=None, npts_max=None, carpeta=None):
+    """
+    Consulta el índice creado por indexar_registros(). Los filtros que se
+    dejan en None no se aplican; rsn, evento, estacion, componente y tipo
+    admiten un valor o una lista de valores.
+
+    Ej: buscar_registros(indice, tipo='AT2', horizontal=True, dt_max=0.01)
+
+    Devuelve:
+        lista de diccionarios (una entrada por archivo), ordenada por rsn,
+        estación, componente y tipo.
+    """
+    condiciones = []
+    valores = []
+    for columna, valor in [('rsn', rsn), ('evento', evento), ('estacion', estacion),
+                           ('componente', componente), ('tipo', tipo), ('carpeta', carpeta)]:
+        if valor is None:
+            continue
+        if isinstance(valor, (list, tuple, set)):
+            valor = list(valor)
+            condiciones.append(f"{columna} IN ({', '.join('?'*len(valor))})")
+            valores.extend(valor)
+        else:
+            condiciones.append(f"{columna} = ?")
+            valores.append(valor)
+    if horizontal is not None:
+        condiciones.append("horizontal = ?")
+        valores.append(int(horizontal))
+    if dt_max is not None:
+        condiciones.append("dt <= ?")
+        valores.append(dt_max)
+    if npts_max is not None:
+        condiciones.append("npts <= ?")
+        valores.append(npts_max)
+
+    consulta = "SELECT * FROM registros"
+    if condiciones:
+        consulta += " WHERE " + " AND ".join(condiciones)
+    consulta += " ORDER BY rsn, estacion, componente, tipo"
+
+    con = _conectar(ruta_indice)
+    filas = [dict(fila) for fila in con.execute(consulta, valores)]
+    con.close()
+
+    dir_indice = os.path.dirname(os.path.abspath(ruta_indice))
+    for fila in filas:
+        fila['horizontal'] = bool(fila['horizontal'])
+        fila['ruta_abs'] = os.path.join(dir_indice, fila['ruta'])
+
+    return filas
+
+
+def pares_horizontales(ruta_indice, tipo='AT2', dt_max=None, **filtros):
+    """
+    Devuelve los pares de componentes horizontales de un mismo registro
+    (mismo RSN y estación) que cumplen los filtros, p.ej. todos los pares
+    con dt <= 0.01:
+
+        pares_horizontales(indice, dt_max=0.01)
+
+    Devuelve:
+        lista de tuplas (registro1, registro2) con los diccionarios de
+        buscar_registros(), ordenados por componente.
+    """
+    filas = buscar_registros(ruta_indice, tipo=tipo, horizontal=True, dt_max=dt_max, **filtros)
+
+    grupos = {}
+    for fila in filas:
+        grupos.setdefault((fila['rsn'], fila['estacion'], fila['tipo']), []).append(fila)
+
+    return [tuple(grupo[:2]) for grupo in grupos.values() if len(grupo) >= 2]
+
+
+def cargar_registros(filas, cache=True, dir_cache=None):
+    """
+    Carga los datos de los registros devueltos por buscar_registros() o
+    pares_horizontales() a través de la caché binaria de
+    DEF_leer_registro_peer (np.memmap en lecturas repetidas).
+
+    Devuelve:
+        lista de np.ndarray con la misma estructura que filas.
+    """
+    datos = []
+    for fila in filas:
+        if isinstance(fila, tuple):
+            datos.append(tuple(cargar_registros(fila, cache, dir_cache)))
+        else:
+            datos.append(cargar_registro_peer(fila['ruta_abs'], cache, dir_cache)[1])
+    return datos
+
+
+def cargar_terna(ruta_indice, rsn, componente, estacion=None, cache=True, dir_cache=None):
+    """
+    Carga la terna desplazamiento/velocidad/aceleración (.DT2, .VT2, .AT2) de
+    una componente de un registro, como la usan los scripts de excitación
+    multiapoyo (1GDL-L_MSExc*.py).
+
+    Devuelve:
+        dt, ug, vg, ag
+    """
+    filas = buscar_registros(ruta_indice, rsn=rsn, componente=componente, estacion=estacion)
+    por_tipo = {fila['tipo']: fila for fila in filas}
+    faltan = [t for t in ('DT2', 'VT2', 'AT2') if t not in por_tipo]
+    if faltan:
+        raise ValueError(f"Faltan los archivos {faltan} del registro RSN{rsn} componente {componente}.")
+
+    ug, vg, ag = cargar_registros([por_tipo['DT2'], por_tipo['VT2'], por_tipo['AT2']], cache, dir_cache)
+
+    return por_tipo['AT2']['dt'], ug, vg, ag
@@ -0,0 +1,174 @@
+import numpy as np
+import openseespy.opensees as ops
+import scipy.sparse as sp
+
+
+def iniciar_energia(ag=None, dt=None, dof=1, alphaM=0.0, betaK=0.0, betaKinit=0.0, betaKcomm=0.0,
+                    nodos=None, elementos=None):
+    """
+    Prepara el balance energético incremental del análisis transitorio ya
+    definido en OpenSees (1-GDL o el pórtico 3D), en la formulación relativa
+    de una excitación UniformExcitation con aceleración del terreno ag:
+
+        E_entrada = E_cinetica + E_amortiguamiento + E_elastica + E_histeretica
+
+        E_entrada         = -int(ag r' M v dt)
+        E_cinetica        = 1/2 v' M v
+        E_amortiguamiento = int(v' C v dt), con C de Rayleigh: alphaM con las
+                            masas nodales y betaK, betaKinit, betaKcomm con la
+                            rigidez básica de los elementos
+        E_elastica        = 1/2 q' kb0^-1 q (fuerzas básicas q y rigidez
+                            básica inicial kb0 de cada elemento)
+        E_histeretica     = int(q' dv) - E_elastica (v: deformación básica)
+
+    El estado solo guarda los valores del paso anterior y los acumulados
+    (memoria O(1) por canal, sin historias): se llama a actualizar_energia()
+    después de cada analyze(), p.ej. con
+    registrar_respuesta(..., al_paso=[lambda: actualizar_energia(estado)]).
+
+    Parámetros:
+        ag        : aceleración del terreno del patrón UniformExcitation (en
+                    las unidades del modelo; None -> sin energía de entrada)
+        dt        : paso de tiempo del registro ag (ag[k] en t = k*dt; el
+                    paso del análisis puede ser otro o variable)
+        dof       : dirección de la excitación
+        alphaM, betaK, betaKinit, betaKcomm : coeficientes de rayleigh()
+        nodos     : nudos con masa (None -> todos los que tienen masa)
+        elementos : elementos con fuerzas y deformaciones básicas
+                    (basicForce/basicDeformation) y Rayleigh en rigidez
+                    (None -> todos)
+
+    Devuelve:
+        estado : diccionario para actualizar_energia() y balance_energia()
+    """
+    if nodos is None:
+        nodos = [nd for nd in ops.getNodeTags() if any(ops.nodeMass(nd))]
+    if elementos is None:
+        elementos = ops.getEleTags()
+    nodos = list(nodos)
+    elementos = list(elementos)
+
+    masas = np.array([m for nd in nodos for m in ops.nodeMass(nd)], dtype=float)
+    r = np.array([float(g == dof - 1) for nd in nodos for g in range(len(ops.nodeMass(nd)))])
+    kb0 = [_rigidez_basica(e) for e in elementos]
+    inicio = np.cumsum([0] + [k.shape[0] for k in kb0])
+    flexibilidad = sp.block_diag([np.linalg.pinv(k) for k in kb0], format='csr') if kb0 else None
+
+    estado = {
+        'nodos': nodos, 'elementos': elementos, 'masas': masas, 'Mr': masas*r,
+        'ag': None if ag is None else np.asarray(ag, dtype=float), 'dt': dt,
+        'rayleigh': (alphaM, betaK, betaKinit, betaKcomm),
+        'kb0': kb0, 'inicio': inicio, 'flexibilidad': flexibilidad,
+        'entrada': 0.0, 'amortiguamiento': 0.0, 'trabajo': 0.0,
+        'max_entrada': 0.0, 'max_error': 0.0,
+    }
+    estado['t'], estado['v'], estado['q'], estado['vb'] = _leer_estado(estado)
+    # OpenSees no impone el equilibrio inicial (aceleración nula en t = 0): la
+    # carga del primer paso parte de cero, como en DEF_espectro_elastico
+    estado['ag_t'] = _ag(estado, estado['t']) if estado['t'] > 0 else 0.0
+    estado['kb'] = kb0
+    estado['vbv'] = np.zeros_like(estado['vb'])
+    estado['fd'] = np.zeros_like(estado['vb'])
+    _balance(estado)
+    return estado
+
+
+def _rigidez_basica(e):
+    # basicStiffness() devuelve la matriz nb x nb por filas en una lista
+    kb = np.array(ops.basicStiffness(e), dtype=float)
+    n = int(round(np.sqrt(kb.size)))
+    return kb.reshape(n, n)
+
+
+def _leer_estado(estado):
+    # Tiempo, velocidades de los nudos con masa y fuerzas/deformaciones básicas
+    v = np.array([x for nd in estado['nodos'] for x in ops.nodeVel(nd)], dtype=float)
+    q = np.array([x for e in estado['elementos'] for x in ops.basicForce(e)], dtype=float)
+    vb = np.array([x for e in estado['elementos'] for x in ops.basicDeformation(e)], dtype=float)
+    return ops.getTime(), v, q, vb
+
+
+def _ag(estado, t):
+    # Aceleración del terreno en t con la misma regla que PathSeries de
+    # OpenSees: lineal a tramos y cero desde el último valor en adelante
+    ag = estado['ag']
+    if ag is None:
+        return 0.0
+    k = t/estado['dt']
+    i = int(np.floor(k))
+    if i < 0 or i + 1 >= ag.size:
+        return 0.0
+    return float(ag[i] + (k - i)*(ag[i + 1] - ag[i]))
+
+
+def _balance(estado):
+    mv2 = estado['masas'] @ estado['v']**2
+    estado['cinetica'] = 0.5*mv2
+    q = estado['q']
+    estado['elastica'] = 0.5*q @ (estado['flexibilidad'] @ q) if estado['flexibilidad'] is not None else 0.0
+    estado['histeretica'] = estado['trabajo'] - estado['elastica']
+    absorbida = estado['cinetica'] + estado['amortiguamiento'] + estado['trabajo']
+    estado['error'] = estado['entrada'] - absorbida
+    estado['max_entrada'] = max(estado['max_entrada'], abs(estado['entrada']), absorbida)
+    estado['max_error'] = max(estado['max_error'], abs(estado['error']))
+    return mv2
+
+
+def actualizar_energia(estado):
+    """
+    Suma al balance el paso de análisis que se acaba de hacer: cada fuerza
+    trabaja con la media de sus valores al principio y al final del paso
+    sobre el incremento de desplazamiento du = h*(v0 + v)/2, que es el de
+    Newmark de aceleración media, de modo que con ese integrador el balance
+    se cumple salvo redondeo y la tolerancia de las iteraciones. Las
+    velocidades de deformación de los elementos (amortiguamiento en
+    rigidez) se obtienen con la misma regla, partiendo del reposo.
+    """
+    alphaM, betaK, betaKinit, betaKcomm = estado['rayleigh']
+    t, v, q, vb = _leer_estado(estado)
+    h = t - estado['t']
+    ag_t = _ag(estado, t)
+    v0 = estado['v']
+
+    # Trabajo de cada fuerza con su valor medio en el paso por du = h*(v0 + v)/2
+    du = 0.5*h*(v0 + v)
+    estado['entrada'] -= 0.5*(estado['ag_t'] + ag_t)*(estado['Mr'] @ du)
+    if alphaM:
+        estado['amortiguamiento'] += 0.5*alphaM*(estado['masas']*(v0 + v)) @ du
+
+    dvb = vb - estado['vb']
+    estado['trabajo'] += 0.5*(estado['q'] + q) @ dvb
+    if (betaK or betaKinit or betaKcomm) and h > 0:
+        # Velocidad de deformación básica de Newmark (vb1 = 2*dvb/h - vb0) y
+        # fuerza de amortiguamiento con la rigidez tangente actual (betaK),
+        # inicial (betaKinit) y la del último paso convergido (betaKcomm)
+        vbv = 2*dvb/h - estado['vbv']
+        kb_ant = estado['kb']
+        kb = [_rigidez_basica(e) for e in estado['elementos']] if betaK or betaKcomm else kb_ant
+        inicio = estado['inicio']
+        fd = np.zeros_like(vbv)
+        for j, (k, k0, k_ant) in enumerate(zip(kb, estado['kb0'], kb_ant)):
+            tramo = slice(inicio[j], inicio[j + 1])
+            fd[tramo] = (betaK*k + betaKinit*k0 + betaKcomm*k_ant) @ vbv[tramo]
+        estado['amortiguamiento'] += 0.5*(estado['fd'] + fd) @ dvb
+        estado['vbv'], estado['fd'], estado['kb'] = vbv, fd, kb
+
+    estado['t'], estado['v'], estado['q'], estado['vb'], estado['ag_t'] = t, v, q, vb, ag_t
+    _balance(estado)
+
+
+def balance_energia(estado):
+    """
+    Energías acumuladas hasta el último paso y error del balance.
+
+    Devuelve:
+        diccionario con 'tiempo', 'entrada', 'cinetica', 'amortiguamiento',
+        'elastica', 'histeretica', 'error' (entrada menos la suma de las
+        demás) y 'error_relativo' (máximo |error| del análisis dividido
+        entre la mayor energía de entrada o absorbida alcanzada)
+    """
+    claves = ('entrada', 'cinetica', 'amortiguamiento', 'elastica', 'histeretica', 'error')
+    balance = {'tiempo': estado['t']}
+    balance.update({k: float(estado[k]) for k in claves})
+    balance['error_relativo'] = float(estado['max_error']/estado['max_entrada']) if estado['max_entrada'] > 0 else 0.0
+    return balance
@@ -0,0 +1,278 @@
+import os
+import hashlib
+import numpy as np
+import openseespy.opensees as ops
+from concurrent.futures import ProcessPoolExecutor
+
+from DEF_series_temporales import preparar_serie_path
+from DEF_espectro_elastico import espectro_elastico
+from DEF_espectro_nolineal import analizar_periodo_nolineal, construir_plantilla_nolineal
+
+# Carpeta de la caché de análisis (T, Fy); se puede cambiar con la variable de
+# entorno DUCTILIDAD_CACHE_DIR
+DIR_CACHE_DUCTILIDAD = os.environ.get('DUCTILIDAD_CACHE_DIR',
+                                      os.path.join(os.path.expanduser('~'), '.cache', 'ductilidad'))
+
+
+def ruta_cache_ductilidad(dt, ag, M=1.0, pinchX=0.8, pinchY=0.2, Damping=0.05, dir_cache=None):
+    """
+    Archivo .npz de la caché de análisis no lineales de un registro y un
+    oscilador: la clave es un SHA-1 de todos los bits de ag, dt y los
+    parámetros del material y del amortiguamiento (Fy y T son las variables
+    de cada análisis guardado).
+    """
+    if dir_cache is None:
+        dir_cache = DIR_CACHE_DUCTILIDAD
+    h = hashlib.sha1(np.ascontiguousarray(ag, dtype=float).tobytes())
+    h.update(repr((float(dt), float(M), float(pinchX), float(pinchY), float(Damping))).encode())
+    return os.path.join(dir_cache, h.hexdigest() + '.npz')
+
+
+def leer_cache_ductilidad(ruta):
+    """
+    Lee la caché de análisis: diccionario {(T, Fy): (umax, vmax, amax, Emax, Fmax)}
+    (vacío si no existe o no se puede leer).
+    """
+    try:
+        with np.load(ruta) as datos:
+            claves = zip(datos['T'].tolist(), datos['Fy'].tolist())
+            return dict(zip(claves, map(tuple, datos['resultados'].tolist())))
+    except (OSError, ValueError, KeyError):
+        return {}
+
+
+def _escribir_cache(ruta, cache):
+    os.makedirs(os.path.dirname(ruta), exist_ok=True)
+    claves = list(cache)
+    temporal = ruta + f'.{os.getpid()}.tmp.npz'
+    np.savez(temporal, T=np.array([c[0] for c in claves]), Fy=np.array([c[1] for c in claves]),
+             resultados=np.array([cache[c] for c in claves]).reshape(-1, 5))
+    os.replace(temporal, ruta)
+
+
+def _buscar_fy(Fe, mu_obj, eta0, ductilidad, conocidos, tol, eta_min, max_iter):
+    """
+    Busca la resistencia Fy = eta*Fe con ductilidad(Fy) = mu_obj. Se trabaja
+    con x = ln(eta) y f = ln(mu/mu_obj): f > 0 si Fy es pequeña. eta = 1 (comportamiento elástico, mu = 1) es el
+    extremo superior del intervalo sin necesidad de calcularlo.
+
+    conocidos son los análisis ya hechos en este periodo {Fy: mu} (de la
+    caché), que se usan para acotar el intervalo antes de calcular nada.
+
+    Devuelve:
+        Fy (nan si no se encuentra) y número de evaluaciones de ductilidad()
+    """
+    tol_f = np.log1p(tol)
+    f_obj = np.log(mu_obj)
+
+    if mu_obj <= 1 + tol:
+        return Fe, 0
+    x_hi, f_hi = 0.0, -f_obj
+    x_lo = f_lo = None
+
+    # Intervalo inicial a partir de los análisis ya hechos: el extremo inferior
+    # es el mayor Fy con f > 0 y el superior el menor Fy por encima con f < 0
+    puntos = sorted((np.log(Fy/Fe), np.log(mu) - f_obj) for Fy, mu in conocidos.items() if 0 < Fy < Fe)
+    validos = [x for x, f in puntos if abs(f) <= tol_f]
+    if validos:
+        return Fe*np.exp(max(validos)), 0
+    for x, f in puntos:
+        if f > 0:
+            x_lo, f_lo = x, f
+    if x_lo is not None:
+        arriba = [(x, f) for x, f in puntos if x > x_lo and f < 0]
+        if arriba:
+            x_hi, f_hi = arriba[0]
+
+    n = 0
+    def F(x):
+        nonlocal n
+        n += 1
+        return np.log(ductilidad(Fe*np.exp(x))) - f_obj
+
+    # Acotación: desde el valor de arranque (periodo vecino) se baja duplicando
+    # el paso en ln(eta) hasta encontrar f > 0
+    if x_lo is None:
+        x = min(np.log(eta0), x_hi - 0.05) if eta0 is not None else x_hi - np.log(mu_obj)
+        paso = max(x_hi - x, 0.05)
+        while True:
+            if x < np.log(eta_min) or n >= max_iter:
+                return np.nan, n
+            f = F(x)
+            if abs(f) <= tol_f:
+                return Fe*np.exp(x), n
+            if f > 0:
+                x_lo, f_lo = x, f
+                break
+            x_hi, f_hi = x, f
+            paso *= 2
+            x = x_hi - paso
+
+    # Secante (regula falsi) con bisección de seguridad: si el intervalo no se
+    # ha reducido a la mitad en el paso anterior, o la secante se sale del
+    # tramo central, se biseca
+    ancho_ant = np.inf
+    while n < max_iter and x_hi - x_lo > 1e-10:
+        ancho = x_hi - x_lo
+        x = x_lo - f_lo*(x_hi - x_lo)/(f_hi - f_lo)
+        if ancho > 0.5*ancho_ant or not (x_lo + 0.05*ancho < x < x_hi - 0.05*ancho):
+            x = 0.5*(x_lo + x_hi)
+        ancho_ant = ancho
+        f = F(x)
+        if abs(f) <= tol_f:
+            return Fe*np.exp(x), n
+        if f > 0:
+            x_lo, f_lo = x, f
+        else:
+            x_hi, f_hi = x, f
+    return np.nan, n
+
+
+# Datos comunes de cada proceso de trabajo: el registro, la caché y los
+# parámetros se envían una sola vez al arrancar el proceso, y el oscilador se
+# construye una sola vez (plantilla) para todos los periodos y resistencias.
+_datos_trabajador = {}
+
+def _iniciar_trabajador(dt, ag, parametros, opciones, cache):
+    _datos_trabajador['dt'] = dt
+    _datos_trabajador['ag'] = ag
+    _datos_trabajador['parametros'] = parametros
+    _datos_trabajador['opciones'] = opciones
+    _datos_trabajador['cache'] = cache
+    _datos_trabajador['plantilla'] = construir_plantilla_nolineal(
+        preparar_serie_path(dt, ag), parametros['M'], parametros['pinchX'], parametros['pinchY'])
+
+
+def _barrer_bloque(bloque):
+    # Periodos contiguos en serie: cada uno arranca con el eta del anterior
+    T_bloque, Fe_bloque, mu_obj = bloque
+    dt = _datos_trabajador['dt']
+    ag = _datos_trabajador['ag']
+    parametros = _datos_trabajador['parametros']
+    opciones = _datos_trabajador['opciones']
+    cache = _datos_trabajador['cache']
+    plantilla = _datos_trabajador['plantilla']
+    M = parametros['M']
+
+    nuevos = {}
+    def evaluar(Tj, Fy):
+        clave = (float(Tj), float(Fy))
+        if clave not in cache:
+            cache[clave] = tuple(map(float, analizar_periodo_nolineal(Tj, dt, ag, Fy=Fy, plantilla=plantilla,
+                                                                      **parametros)))
+            nuevos[clave] = cache[clave]
+        return cache[clave]
+
+    Fy = np.full(len(T_bloque), np.nan)
+    resultados = np.full((len(T_bloque), 5), np.nan)
+    analisis = np.zeros(len(T_bloque), dtype=int)
+    eta = None
+    for j, (Tj, Fe) in enumerate(zip(T_bloque, Fe_bloque)):
+        K = M*(2*np.pi/Tj)**2
+        ductilidad = lambda Fy_j: evaluar(Tj, Fy_j)[0]*K/Fy_j
+        conocidos = {Fyc: r[0]*K/Fyc for (Tc, Fyc), r in cache.items() if Tc == float(Tj)}
+        n_antes = len(nuevos)
+        Fy[j], _ = _buscar_fy(Fe, mu_obj, eta, ductilidad, conocidos, **opciones)
+        if np.isfinite(Fy[j]):
+            eta = Fy[j]/Fe
+            if Fy[j] < Fe:
+                resultados[j] = evaluar(Tj, Fy[j])
+        analisis[j] = len(nuevos) - n_antes
+    return Fy, resultados, analisis, nuevos
+
+
+def espectro_ductilidad_constante(T, dt, ag, mu=(2.0, 4.0, 6.0), M=1.0, pinchX=0.8, pinchY=0.2,
+                                  Damping=0.05, tol=0.01, eta_min=1e-3, max_iter=40,
+                                  nproc=None, bloques_por_proceso=4, cache=True, dir_cache=None):
+    """
+    Espectros de ductilidad constante (R-mu-T) con el oscilador 'Hysteretic'
+    de 1GDL_EspectroNolineal.py: para cada periodo y ductilidad objetivo se
+    busca la resistencia Fy con umax/dy = mu (dy = Fy/K).
+
+    La búsqueda se hace en eta = Fy/Fe, con Fe = K*umax elástico (de
+    DEF_espectro_elastico, todos los periodos a la vez): eta = 1 da mu = 1 y
+    acota el intervalo por arriba; por abajo se acota desde el eta del
+    periodo anterior y después se combina la secante con la bisección (ver
+    _buscar_fy). Cuando mu(Fy) no es monótona puede haber varias
+    soluciones; se devuelve una de ellas dentro del intervalo encontrado, y
+    como el arranque depende del periodo anterior del mismo bloque, con
+    distinto nproc los resultados pueden diferir dentro de la tolerancia.
+
+    Los periodos se reparten en bloques contiguos entre procesos de trabajo
+    (cada uno con su dominio de OpenSees). Con cache=True cada análisis
+    (T, Fy) se guarda en un .npz (ruta_cache_ductilidad()); al pedir otra
+    ductilidad, o repetir la consulta, los análisis guardados acotan el
+    intervalo de partida y no se vuelven a calcular.
+
+    Parámetros:
+        T                   : periodos [s], np.ndarray de forma (nT,)
+        dt, ag              : paso de tiempo y aceleración del terreno
+        mu                  : ductilidades objetivo (n_mu,)
+        M, pinchX, pinchY, Damping : parámetros del oscilador
+        tol                 : tolerancia relativa en mu
+        eta_min             : Fy/Fe mínimo antes de dar el periodo por fallido
+        max_iter            : análisis máximos por periodo y ductilidad
+        nproc               : número de procesos (None -> os.cpu_count();
+                              1 -> cálculo en serie en este intérprete)
+        bloques_por_proceso : bloques de periodos por proceso
+
+    Devuelve:
+        diccionario con 'T', 'mu', 'Fe' (nT,) y, de forma (n_mu, nT):
+            'Fy' (nan si no se encuentra), 'R' (Fe/Fy), 'analisis'
+            (análisis nuevos de OpenSees) y los espectros 'umax', 'vmax',
+            'amax', 'Emax', 'Fmax' del oscilador con esa Fy
+
+    Nota: en Windows los procesos se crean con 'spawn', por lo que el script
+    que llama a esta función debe protegerse con if __name__ == '__main__':
+    """
+    T = np.atleast_1d(np.asarray(T, dtype=float))
+    ag = np.asarray(ag, dtype=float)
+    mu = np.atleast_1d(np.asarray(mu, dtype=float))
+    parametros = dict(M=M, pinchX=pinchX, pinchY=pinchY, Damping=Damping)
+    opciones = dict(tol=tol, eta_min=eta_min, max_iter=max_iter)
+
+    Fe = espectro_elastico(T, dt, ag, M, Damping)[4]
+
+    ruta = ruta_cache_ductilidad(dt, ag, M, pinchX, pinchY, Damping, dir_cache) if cache else None
+    analisis_guardados = leer_cache_ductilidad(ruta) if cache else {}
+
+    if nproc is None:
+        nproc = os.cpu_count() or 1
+    nproc = max(1, min(nproc, len(T)))
+    nbloques = 1 if nproc == 1 else min(len(T), nproc*bloques_por_proceso)
+    indices = np.array_split(np.arange(len(T)), nbloques)
+
+    resultado = {'T': T, 'mu': mu, 'Fe': Fe, 'Fy': np.zeros((mu.size, T.size)),
+                 'analisis': np.zeros((mu.size, T.size), dtype=int)}
+    espectros = np.zeros((mu.size, T.size, 5))
+    for k, mu_obj in enumerate(mu):
+        bloques = [(T[i], Fe[i], mu_obj) for i in indices]
+        if nproc == 1:
+            _iniciar_trabajador(dt, ag, parametros, opciones, analisis_guardados)
+            partes = [_barrer_bloque(b) for b in bloques]
+            ops.wipe()
+        else:
+            with ProcessPoolExecutor(max_workers=nproc, initializer=_iniciar_trabajador,
+                                     initargs=(dt, ag, parametros, opciones, analisis_guardados)) as pool:
+                # map() devuelve los bloques en el orden de entrada
+                partes = list(pool.map(_barrer_bloque, bloques))
+
+        for i, (Fy, resultados, analisis, nuevos) in zip(indices, partes):
+            resultado['Fy'][k, i] = Fy
+            resultado['analisis'][k, i] = analisis
+            espectros[k, i] = resultados
+            analisis_guardados.update(nuevos)
+        if cache and any(p[3] for p in partes):
+            _escribir_cache(ruta, analisis_guardados)
+
+    # Los periodos con Fy = Fe (mu <= 1) responden en régimen elástico
+    elasticos = resultado['Fy'] >= Fe
+    if np.any(elasticos):
+        umax, vmax, amax, Emax, Fmax = espectro_elastico(T, dt, ag, M, Damping)
+        elastico = np.stack([umax, vmax, amax, Emax, Fmax], axis=-1)
+        espectros[elasticos] = np.broadcast_to(elastico, espectros.shape)[elasticos]
+
+    resultado['R'] = Fe/resultado['Fy']
+    for n, nombre in enumerate(('umax', 'vmax', 'amax', 'Emax', 'Fmax')):
+        resultado[nombre] = espectros[..., n]
+    return resultado
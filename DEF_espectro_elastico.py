@@ -0,0 +1,278 @@
+import numpy as np
+
+def espectro_elastico(T, dt, ag, M=1.0, Damping=0.05, metodo='newmark'):
+    """
+    Calcula el espectro elástico de un registro para todos los periodos a la vez.
+
+    Integra el oscilador de 1-GDL con amortiguamiento proporcional a la masa
+    (alphaM = 2*Damping*omega, como en 1GDL_EspectroElastico.py) avanzando en el
+    tiempo un vector de estado de forma (len(T),): un paso de tiempo resuelve
+    todos los periodos. Se reproduce el convenio de OpenSees: el estado inicial
+    es nulo, el paso i lleva al instante (i+1)*dt con la carga -M*ag[i+1] y la
+    serie 'Path' vale cero fuera del registro.
+
+    ag puede contener varios registros del mismo dt y número de pasos (p.ej.
+    las aceleraciones de todas las plantas de un edificio, ver
+    DEF_espectro_piso): con forma (..., Nsteps) se integran todos a la vez y
+    los espectros tienen forma (..., nT).
+
+    Parámetros:
+        T        : periodos [s], np.ndarray de forma (nT,)
+        dt       : paso de tiempo del registro [s]
+        ag       : aceleración del terreno (mismas unidades que la salida),
+                   de forma (Nsteps,) o (..., Nsteps)
+        M        : masa del oscilador (K = M*(2*pi/T)**2)
+        Damping  : fracción de amortiguamiento crítico; escalar o un valor
+                   por periodo (nT,)
+        metodo   : 'newmark'  -> aceleración media (0.5, 0.25), igual que OpenSees
+                   'nigam'    -> solución exacta para excitación lineal a tramos
+                                 (Nigam-Jennings)
+
+    Devuelve:
+        umax, vmax, amax, Emax, Fmax : np.ndarray de forma (nT,) o (..., nT)
+        (desplazamiento, velocidad y aceleración relativas máximas, energía
+        de entrada máxima y fuerza elástica máxima).
+    """
+    T = np.atleast_1d(np.asarray(T, dtype=float))
+    ag = np.asarray(ag, dtype=float)
+    Nsteps = ag.shape[-1]
+
+    omega = 2*np.pi/T
+    K = M*omega**2
+    C = 2*Damping*omega*M
+
+    # Carga en el instante final de cada paso: ag[i+1] y cero tras el registro
+    p = np.zeros(ag.shape + (1,))
+    p[..., :-1, 0] = -M*ag[..., 1:]
+
+    if metodo == 'newmark':
+        paso = _paso_newmark(dt, M, C, K)
+    elif metodo == 'nigam':
+        paso = _paso_nigam(dt, M, Damping, omega)
+    else:
+        raise ValueError(f"Método de integración desconocido: {metodo}")
+
+    forma = ag.shape[:-1] + (T.size,)
+    u = np.zeros(forma)
+    v = np.zeros(forma)
+    a = np.zeros(forma)
+    umax = np.zeros(forma)
+    vmax = np.zeros(forma)
+    amax = np.zeros(forma)
+
+    # Energía de entrada: misma regla del trapecio que cumulative_trapezoid(-ag*M*vstep)
+    E = np.zeros(forma)
+    Emax = np.zeros(forma)
+    f_ant = None
+
+    p_ant = 0.0
+    for i in range(Nsteps):
+        u, v, a = paso(u, v, a, p_ant, p[..., i, :])
+        p_ant = p[..., i, :]
+
+        np.maximum(umax, np.abs(u), out=umax)
+        np.maximum(vmax, np.abs(v), out=vmax)
+        np.maximum(amax, np.abs(a), out=amax)
+
+        f = -ag[..., i, None]*M*v
+        if f_ant is not None:
+            E += 0.5*dt*(f_ant + f)
+            np.maximum(Emax, E, out=Emax)
+        f_ant = f
+
+    Fmax = K*umax
+
+    return umax, vmax, amax, Emax, Fmax
+
+
+def espectros_amortiguamientos(T, dt, ag, amortiguamientos=(0.02, 0.05, 0.10, 0.20), M=1.0,
+                               metodo='newmark'):
+    """
+    Espectros elásticos de un registro para varios amortiguamientos a la
+    vez: los osciladores amortiguamiento x periodo se integran juntos en una
+    sola llamada a espectro_elastico(), de modo que el registro se recorre
+    una única vez.
+
+    Para el oscilador elástico de 1-GDL el amortiguamiento proporcional a la
+    masa (alphaM = 2*Damping*omega) y el proporcional a la rigidez
+    (betaK = 2*Damping/omega, como en Espectros_Antoine.py) dan la misma
+    matriz C = 2*Damping*omega*M, así que ambos quedan cubiertos.
+
+    Parámetros:
+        T                : periodos [s] (nT,)
+        ag               : aceleración del terreno, (Nsteps,) o (..., Nsteps)
+        amortiguamientos : fracciones de amortiguamiento crítico (n_xi,)
+
+    Devuelve:
+        diccionario con 'T', 'amortiguamientos' y los espectros 'umax',
+        'vmax', 'amax', 'Emax', 'Fmax' (como en espectro_elastico()) y 'Sa'
+        (pseudoaceleración omega²*umax), de forma (n_xi, nT) o
+        (..., n_xi, nT)
+    """
+    T = np.atleast_1d(np.asarray(T, dtype=float))
+    xi = np.atleast_1d(np.asarray(amortiguamientos, dtype=float))
+    ag = np.asarray(ag, dtype=float)
+    espectros = espectro_elastico(np.tile(T, xi.size), dt, ag, M, np.repeat(xi, T.size), metodo)
+
+    forma = ag.shape[:-1] + (xi.size, T.size)
+    resultado = {'T': T, 'amortiguamientos': xi}
+    for nombre, valores in zip(('umax', 'vmax', 'amax', 'Emax', 'Fmax'), espectros):
+        resultado[nombre] = valores.reshape(forma)
+    resultado['Sa'] = (2*np.pi/T)**2*resultado['umax']
+    return resultado
+
+
+def _paso_newmark(dt, M, C, K):
+    # Newmark de aceleración media en formulación total, como el integrador de
+    # OpenSees: no se supone equilibrio al inicio del paso.
+    gamma = 0.5
+    beta = 0.25
+    c1 = 1/(beta*dt**2)
+    c2 = 1/(beta*dt)
+    c3 = 1/(2*beta) - 1
+    Kef = K + gamma/(beta*dt)*C + M*c1
+
+    def paso(u, v, a, p_ant, p):
+        rhs = (p + M*(c1*u + c2*v + c3*a)
+               + C*(gamma/(beta*dt)*u + (gamma/beta - 1)*v + dt*(gamma/(2*beta) - 1)*a))
+        u1 = rhs/Kef
+        a1 = c1*(u1 - u) - c2*v - c3*a
+        v1 = v + dt*((1 - gamma)*a + gamma*a1)
+        return u1, v1, a1
+
+    return paso
+
+
+def _paso_nigam(dt, M, Damping, omega):
+    # Coeficientes exactos de Nigam-Jennings para carga lineal en el paso
+    # (notación de Chopra, con la carga por unidad de masa f = p/M).
+    xi = Damping
+    raiz = np.sqrt(1 - xi**2)
+    wd = omega*raiz
+    e = np.exp(-xi*omega*dt)
+    s = np.sin(wd*dt)
+    c = np.cos(wd*dt)
+    w2 = omega**2
+
+    A = e*(xi/raiz*s + c)
+    B = e*s/wd
+    C = (2*xi/(omega*dt) + e*(((1 - 2*xi**2)/(wd*dt) - xi/raiz)*s
+                              - (1 + 2*xi/(omega*dt))*c))/w2
+    D = (1 - 2*xi/(omega*dt) + e*((2*xi**2 - 1)/(wd*dt)*s + 2*xi/(omega*dt)*c))/w2
+
+    A1 = -e*omega/raiz*s
+    B1 = e*(c - xi/raiz*s)
+    C1 = (-1/dt + e*((omega/raiz + xi/(dt*raiz))*s + c/dt))/w2
+    D1 = (1 - e*(xi/raiz*s + c))/(w2*dt)
+
+    def paso(u, v, a, p_ant, p):
+        f0 = p_ant/M
+        f1 = p/M
+        u1 = A*u + B*v + C*f0 + D*f1
+        v1 = A1*u + B1*v + C1*f0 + D1*f1
+        a1 = f1 - 2*xi*omega*v1 - w2*u1
+        return u1, v1, a1
+
+    return paso
+
+
+def espectro_elastico_opensees(T, dt, ag, M=1.0, Damping=0.05):
+    """
+    Versión de referencia con OpenSees: reconstruye el modelo de 1-GDL para
+    cada periodo y avanza paso a paso, como el bucle original de
+    1GDL_EspectroElastico.py. Se usa para comprobar espectro_elastico().
+
+    Devuelve:
+        umax, vmax, amax, Emax, Fmax : np.ndarray de forma (nT,)
+    """
+    from openseespy.opensees import (wipe, model, uniaxialMaterial, node, fix,
+                                     element, eigen, rayleigh, pattern, system, numberer,
+                                     constraints, algorithm, integrator, analysis, analyze,
+                                     nodeDisp, nodeVel, nodeAccel, eleForce)
+    from scipy.integrate import cumulative_trapezoid
+    from DEF_series_temporales import preparar_serie_path, definir_serie_path
+
+    T = np.atleast_1d(np.asarray(T, dtype=float))
+    ag = np.asarray(ag, dtype=float)
+    Nsteps = ag.size
+    serie = preparar_serie_path(dt, ag)
+
+    umax = np.zeros(len(T))
+    vmax = np.zeros(len(T))
+    amax = np.zeros(len(T))
+    Emax = np.zeros(len(T))
+    Fmax = np.zeros(len(T))
+
+    for j in range(len(T)):
+        wipe()
+        model('basic', '-ndm', 1, '-ndf', 1)
+
+        matTag = 1
+        K = M*(2*np.pi/T[j])**2
+        uniaxialMaterial('Elastic', matTag, K)
+
+        tagTS = 1
+        definir_serie_path(tagTS, serie)
+
+        node(1, 0)
+        node(2, 0, '-mass', M)
+        fix(1, 1)
+        fix(2, 0)
+        element('zeroLength', 1, 1, 2, '-mat', matTag, '-dir', 1, '-doRayleigh', 1)
+
+        Lambda = eigen('-fullGenLapack', 1)
+        omegaI = np.sqrt(Lambda[0])
+        rayleigh(2*Damping*omegaI, 0, 0, 0)
+
+        pattern('UniformExcitation', 1, 1, '-accel', tagTS)
+        system('UmfPack')
+        numberer("RCM")
+        constraints('Transformation')
+        algorithm("Newton")
+        integrator('Newmark', 0.5, 0.25)
+        analysis('Transient')
+
+        ustep = np.zeros(Nsteps)
+        vstep = np.zeros(Nsteps)
+        astep = np.zeros(Nsteps)
+        Fstep = np.zeros(Nsteps)
+        for i in range(Nsteps):
+            analyze(1, dt)
+            ustep[i] = nodeDisp(2, 1)
+            vstep[i] = nodeVel(2, 1)
+            astep[i] = nodeAccel(2, 1)
+            Fstep[i] = eleForce(1, 1)
+
+        Estep = cumulative_trapezoid(-ag*M*vstep, dx=dt, initial=0.0)
+
+        umax[j] = np.max(np.abs(ustep))
+        vmax[j] = np.max(np.abs(vstep))
+        amax[j] = np.max(np.abs(astep))
+        Fmax[j] = np.max(np.abs(Fstep))
+        Emax[j] = np.max(Estep)
+
+    wipe()
+
+    return umax, vmax, amax, Emax, Fmax
+
+
+def comprobar_espectro_elastico(T, dt, ag, M=1.0, Damping=0.05, rtol=1e-6):
+    """
+    Compara espectro_elastico() con la versión de OpenSees y devuelve el
+    error relativo máximo de cada espectro en un diccionario. Lanza
+    AssertionError si alguno supera rtol.
+    """
+    nombres = ['umax', 'vmax', 'amax', 'Emax', 'Fmax']
+    rapido = espectro_elastico(T, dt, ag, M, Damping)
+    referencia = espectro_elastico_opensees(T, dt, ag, M, Damping)
+
+    errores = {}
+    for nombre, x, xref in zip(nombres, rapido, referencia):
+        escala = np.max(np.abs(xref))
+        errores[nombre] = np.max(np.abs(x - xref))/escala if escala > 0 else 0.0
+
+    malos = {k: e for k, e in errores.items() if e > rtol}
+    if malos:
+        raise AssertionError(f"El espectro vectorizado no coincide con OpenSees: {malos}")
+
+    return errores
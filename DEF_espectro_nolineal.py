@@ -0,0 +1,180 @@
+import os
+import numpy as np
+import openseespy.opensees as ops
+from concurrent.futures import ProcessPoolExecutor
+
+from DEF_series_temporales import preparar_serie_path
+from DEF_plantilla_modelo import (plantilla_1gdl_histeretica, valores_1gdl_histeretico,
+                                 preparar_plantilla, actualizar_plantilla)
+
+def analizar_periodo_nolineal(Tj, dt, ag, M=1.0, Fy=300.0, pinchX=0.8, pinchY=0.2, Damping=0.05,
+                              serie=None, plantilla=None):
+    """
+    Análisis dinámico del oscilador de 1-GDL con material 'Hysteretic' para
+    un periodo Tj, igual que el bucle de 1GDL_EspectroNolineal.py.
+
+    serie es el registro preparado con preparar_serie_path(dt, ag); si no se
+    da, se prepara aquí (conviene prepararlo una vez para todos los periodos).
+
+    plantilla es la de plantilla_1gdl_histeretica(M, pinchX, pinchY) ya
+    construida en el dominio con preparar_plantilla() para este registro: el
+    modelo no se reconstruye, solo se hace reset() y se actualizan la
+    envolvente (Tj, Fy) y el amortiguamiento, y el dominio queda listo para
+    el siguiente periodo. Si no se da, el modelo se construye aquí y se
+    elimina al terminar.
+
+    Devuelve:
+        umax, vmax, amax, Emax, Fmax : float
+    """
+    from openseespy.opensees import wipe
+    from DEF_registro_respuesta import registrar_envolventes
+
+    ag = np.asarray(ag, dtype=float)
+    Nsteps = ag.size
+
+    valores = valores_1gdl_histeretico(Tj, M, Fy, Damping)
+    if plantilla is None:
+        if serie is None:
+            serie = preparar_serie_path(dt, ag)
+        valores.update(tagTS=1, serie=serie)
+        preparar_plantilla(plantilla_1gdl_histeretica(M, pinchX, pinchY), valores)
+    else:
+        actualizar_plantilla(plantilla, valores)
+
+    # Solo se guardan los máximos y la energía de entrada, en línea
+    canales = [('disp', 2, 1), ('vel', 2, 1), ('accel', 2, 1), ('eleForce', 1, 1)]
+    envolventes, _ = registrar_envolventes(canales, Nsteps, dt, parar_si_falla=False,
+                                           entrada=(('vel', 2, 1), ag, M))
+
+    if plantilla is None:
+        wipe()
+
+    umax, vmax, amax, Fmax = envolventes['pico']
+    return umax, vmax, amax, envolventes['energia_entrada_max'], Fmax
+
+
+def construir_plantilla_nolineal(serie, M=1.0, pinchX=0.8, pinchY=0.2):
+    """
+    Construye en el dominio el oscilador de analizar_periodo_nolineal() para
+    el registro serie (de preparar_serie_path) y devuelve su plantilla, que
+    se pasa a analizar_periodo_nolineal(..., plantilla=plantilla) para
+    recorrer periodos y resistencias sin reconstruir el modelo.
+    """
+    plantilla = plantilla_1gdl_histeretica(M, pinchX, pinchY)
+    valores = valores_1gdl_histeretico(1.0, M)
+    valores.update(tagTS=1, serie=serie)
+    preparar_plantilla(plantilla, valores)
+    return plantilla
+
+
+def comprobar_plantilla_nolineal(T, dt, ag, M=1.0, Fy=300.0, pinchX=0.8, pinchY=0.2, Damping=0.05):
+    """
+    Comprueba en la malla de periodos T que la plantilla da la misma
+    respuesta que reconstruir el oscilador en cada periodo (wipe() + todos
+    los comandos) e imprime el tiempo de cada variante.
+
+    Devuelve:
+        diferencia relativa máxima entre ambas variantes (umax, vmax, amax,
+        Emax, Fmax)
+    """
+    import time
+
+    T = np.atleast_1d(np.asarray(T, dtype=float))
+    ag = np.asarray(ag, dtype=float)
+    serie = preparar_serie_path(dt, ag)
+    parametros = dict(M=M, Fy=Fy, pinchX=pinchX, pinchY=pinchY, Damping=Damping)
+
+    tic = time.perf_counter()
+    reconstruccion = np.array([analizar_periodo_nolineal(Tj, dt, ag, serie=serie, **parametros) for Tj in T])
+    t_reconstruccion = time.perf_counter() - tic
+
+    tic = time.perf_counter()
+    plantilla = construir_plantilla_nolineal(serie, M, pinchX, pinchY)
+    con_plantilla = np.array([analizar_periodo_nolineal(Tj, dt, ag, plantilla=plantilla, **parametros) for Tj in T])
+    t_plantilla = time.perf_counter() - tic
+    ops.wipe()
+
+    escala = np.maximum(np.abs(reconstruccion), np.finfo(float).tiny)
+    dif = np.max(np.abs(con_plantilla - reconstruccion)/escala)
+    print("reconstruccion: {:.4f} s, plantilla: {:.4f} s".format(t_reconstruccion, t_plantilla))
+    print("Diferencia relativa máxima: {:.3e}".format(dif))
+    return dif
+
+
+# Datos comunes de cada proceso de trabajo: el registro se envía una sola vez
+# al arrancar el proceso y no con cada bloque de periodos. El modelo se
+# construye también una sola vez por proceso (plantilla) y cada periodo solo
+# actualiza la envolvente y el amortiguamiento.
+_datos_trabajador = {}
+
+def _iniciar_trabajador(dt, ag, parametros):
+    _datos_trabajador['dt'] = dt
+    _datos_trabajador['ag'] = ag
+    _datos_trabajador['parametros'] = parametros
+    _datos_trabajador['serie'] = preparar_serie_path(dt, ag)
+    _datos_trabajador['plantilla'] = construir_plantilla_nolineal(
+        _datos_trabajador['serie'], parametros['M'], parametros['pinchX'], parametros['pinchY'])
+
+
+def _barrer_periodos(T_bloque):
+    # Cada proceso tiene su propio intérprete y, por tanto, su propio dominio de OpenSees
+    dt = _datos_trabajador['dt']
+    ag = _datos_trabajador['ag']
+    parametros = _datos_trabajador['parametros']
+    plantilla = _datos_trabajador['plantilla']
+
+    resultados = np.zeros((5, len(T_bloque)))
+    for j, Tj in enumerate(T_bloque):
+        resultados[:, j] = analizar_periodo_nolineal(Tj, dt, ag, plantilla=plantilla, **parametros)
+    return resultados
+
+
+def espectro_nolineal(T, dt, ag, M=1.0, Fy=300.0, pinchX=0.8, pinchY=0.2, Damping=0.05,
+                      nproc=None, bloques_por_proceso=4):
+    """
+    Espectro no lineal (material 'Hysteretic') repartiendo la malla de
+    periodos entre procesos de trabajo.
+
+    Cada proceso mantiene su propio dominio de OpenSees y calcula un bloque
+    contiguo de periodos; los resultados se reensamblan en el orden de T, de
+    modo que el resultado es idéntico al del cálculo en serie.
+
+    Parámetros:
+        T                   : periodos [s], np.ndarray de forma (nT,)
+        dt, ag              : paso de tiempo y aceleración del terreno
+        M, Fy, pinchX, pinchY, Damping : parámetros del oscilador
+        nproc               : número de procesos (None -> os.cpu_count();
+                              1 -> cálculo en serie en este intérprete)
+        bloques_por_proceso : bloques de periodos por proceso, para
+                              equilibrar la carga (los periodos cortos cuestan
+                              más iteraciones que los largos)
+
+    Devuelve:
+        umax, vmax, amax, Emax, Fmax : np.ndarray de forma (nT,)
+
+    Nota: en Windows los procesos se crean con 'spawn', por lo que el script
+    que llama a esta función debe protegerse con if __name__ == '__main__':
+    """
+    T = np.atleast_1d(np.asarray(T, dtype=float))
+    ag = np.asarray(ag, dtype=float)
+    parametros = dict(M=M, Fy=Fy, pinchX=pinchX, pinchY=pinchY, Damping=Damping)
+
+    if nproc is None:
+        nproc = os.cpu_count() or 1
+    nproc = max(1, min(nproc, len(T)))
+
+    if nproc == 1:
+        _iniciar_trabajador(dt, ag, parametros)
+        resultados = _barrer_periodos(T)
+        ops.wipe()
+    else:
+        nbloques = min(len(T), nproc*bloques_por_proceso)
+        bloques = np.array_split(T, nbloques)
+        with ProcessPoolExecutor(max_workers=nproc, initializer=_iniciar_trabajador,
+                                 initargs=(dt, ag, parametros)) as pool:
+            # map() devuelve los bloques en el orden de entrada
+            resultados = np.hstack(list(pool.map(_barrer_periodos, bloques)))
+
+    umax, vmax, amax, Emax, Fmax = resultados
+
+    return umax, vmax, amax, Emax, Fmax
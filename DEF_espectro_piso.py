@@ -0,0 +1,139 @@
+import os
+
+import numpy as np
+import openseespy.opensees as ops
+
+from DEF_leer_registro_peer import cargar_registro_peer
+from DEF_series_temporales import preparar_serie_path, definir_serie_path
+from DEF_registro_respuesta import registrar_respuesta
+from DEF_espectro_elastico import espectros_amortiguamientos
+
+
+def modelo_cortante(masas=(200.0, 200.0), rigideces=(40e4, 40e4), Damping=0.05):
+    """
+    Edificio de cortante de MGDL_EspectroElasticoPiso.py: un nudo por planta
+    con masa en X unido al de debajo con un muelle zeroLength 'Elastic', y
+    amortiguamiento proporcional a la masa (alphaM = 2*Damping*omega del
+    primer modo). Con n masas y rigideces se obtiene un edificio de n
+    plantas. Borra el modelo actual de OpenSees.
+
+    Devuelve:
+        nodos : nudos de planta, de abajo arriba
+    """
+    ops.wipe()
+    ops.model('basic', '-ndm', 1, '-ndf', 1)
+    ops.node(1, 0.0)
+    ops.fix(1, 1)
+    nodos = []
+    for k, (m, K) in enumerate(zip(masas, rigideces)):
+        ops.node(k + 2, 0.0, '-mass', m)
+        ops.uniaxialMaterial('Elastic', k + 1, K)
+        ops.element('zeroLength', k + 1, k + 1, k + 2, '-mat', k + 1, '-dir', 1, '-doRayleigh', 1)
+        nodos.append(k + 2)
+
+    omegaI = np.sqrt(ops.eigen('-fullGenLapack', 1)[0])
+    ops.rayleigh(2*Damping*omegaI, 0, 0, 0)
+    return nodos
+
+
+def aceleraciones_absolutas(nodos, Nsteps, dt, ag, dof=1):
+    """
+    Ejecuta una sola vez el análisis transitorio ya definido (con un patrón
+    UniformExcitation de la serie ag) y guarda la aceleración de todos los
+    nudos de planta en un buffer (DEF_registro_respuesta). Con
+    UniformExcitation, nodeAccel() es la aceleración relativa al terreno, de
+    modo que se le suma ag para obtener la absoluta, que es la que excita a
+    los equipos de cada planta.
+
+    Devuelve:
+        np.ndarray (n_nudos, Nsteps + 1) con la aceleración absoluta en
+        t = k*dt, k = 0..Nsteps (la muestra 0 es la del reposo)
+    """
+    datos, _ = registrar_respuesta([('accel', nd, dof) for nd in nodos], Nsteps, dt)
+    relativa = np.zeros((len(nodos), Nsteps + 1))
+    relativa[:, 1:len(datos) + 1] = datos.T
+    terreno = np.zeros(Nsteps + 1)
+    n = min(len(ag), Nsteps + 1)
+    terreno[:n] = ag[:n]
+    return relativa + terreno
+
+
+def espectros_piso(aceleraciones, dt, T, amortiguamientos=(0.05,), M=1.0, metodo='newmark'):
+    """
+    Espectros de respuesta de todas las plantas (y registros) para la malla
+    de periodos T y varios amortiguamientos, en una sola pasada vectorizada
+    (DEF_espectro_elastico.espectros_amortiguamientos()) sobre los
+    osciladores planta x amortiguamiento x periodo.
+
+    Parámetros:
+        aceleraciones    : aceleraciones absolutas de planta, (..., Nsteps)
+                           (p.ej. (n_pisos, Nsteps) de aceleraciones_absolutas()
+                           o (n_registros, n_pisos, Nsteps))
+        T                : periodos [s] (nT,)
+        amortiguamientos : fracciones de amortiguamiento crítico (n_xi,)
+
+    Devuelve:
+        diccionario con 'T', 'amortiguamientos' y los espectros 'umax',
+        'vmax', 'amax' (relativas, como en espectro_elastico), 'Emax',
+        'Fmax' y 'Sa' (pseudoaceleración omega²*umax) de forma
+        (..., n_xi, nT)
+    """
+    return espectros_amortiguamientos(T, dt, aceleraciones, amortiguamientos, M, metodo)
+
+
+def espectros_piso_registros(registros, T, amortiguamientos=(0.05,), construir_modelo=modelo_cortante,
+                             Fsc=1.0, g=9810.0, dof=1, M=1.0, metodo='newmark'):
+    """
+    Espectros de piso de un edificio para un lote de registros: para cada
+    registro la estructura principal se calcula una sola vez con OpenSees
+    (aceleraciones_absolutas) y después los espectros de todas las plantas,
+    registros y amortiguamientos se calculan juntos con espectros_piso(),
+    una pasada por cada paso de tiempo distinto. Los registros más cortos
+    de cada grupo se completan con ceros (vibración libre) hasta el más
+    largo.
+
+    Parámetros:
+        registros        : rutas de los registros PEER (.AT2)
+        construir_modelo : función que define el modelo y su amortiguamiento
+                           (sin excitación ni análisis) y devuelve los nudos
+                           de planta (por defecto modelo_cortante())
+        Fsc, g           : factor de escala y gravedad (registro en g)
+
+    Devuelve:
+        diccionario con 'registros' (nombres), 'T', 'amortiguamientos' y los
+        espectros de espectros_piso() de forma (n_registros, n_pisos, n_xi, nT)
+    """
+    aceleraciones, pasos_tiempo = [], []
+    for ruta in registros:
+        cabecera, ag = cargar_registro_peer(ruta)
+        ag = ag*g*Fsc
+        nodos = construir_modelo()
+        tagTS = 1
+        definir_serie_path(tagTS, preparar_serie_path(cabecera.dt, ag))
+        ops.pattern('UniformExcitation', 1, dof, '-accel', tagTS)
+        ops.system('UmfPack')
+        ops.numberer('RCM')
+        ops.constraints('Transformation')
+        ops.algorithm('Newton')
+        ops.integrator('Newmark', 0.5, 0.25)
+        ops.analysis('Transient')
+        aceleraciones.append(aceleraciones_absolutas(nodos, len(ag), cabecera.dt, ag, dof))
+        pasos_tiempo.append(cabecera.dt)
+        ops.wipe()
+
+    resultado = None
+    for dt in dict.fromkeys(pasos_tiempo):
+        grupo = [k for k, d in enumerate(pasos_tiempo) if d == dt]
+        n = max(aceleraciones[k].shape[-1] for k in grupo)
+        lote = np.zeros((len(grupo),) + aceleraciones[grupo[0]].shape[:-1] + (n,))
+        for j, k in enumerate(grupo):
+            lote[j, ..., :aceleraciones[k].shape[-1]] = aceleraciones[k]
+        espectros = espectros_piso(lote, dt, T, amortiguamientos, M, metodo)
+        if resultado is None:
+            resultado = {'registros': [os.path.basename(r) for r in registros],
+                         'T': espectros['T'], 'amortiguamientos': espectros['amortiguamientos']}
+            for nombre in ('umax', 'vmax', 'amax', 'Emax', 'Fmax', 'Sa'):
+                resultado[nombre] = np.zeros((len(registros),) + espectros[nombre].shape[1:])
+        for nombre in ('umax', 'vmax', 'amax', 'Emax', 'Fmax', 'Sa'):
+            resultado[nombre][grupo] = espectros[nombre]
+    return resultado
@@ -0,0 +1,438 @@
+import os
+import time
+import sqlite3
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+import numpy as np
+import openseespy.opensees as ops
+
+from DEF_leer_registro_peer import cargar_registro_peer
+from DEF_series_temporales import preparar_serie_path, definir_serie_path
+from DEF_portico3d import construir_portico_ejemplo
+from DEF_modal import analisis_modal
+from DEF_plantilla_modelo import cambiar_registro
+
+# Opciones por defecto de cada análisis (mismos valores que MGDL-NL_UnfExc_Frame3D.py)
+OPCIONES_IDA = {
+    'dir': 1,                 # dirección de la excitación y de las derivas
+    'g': 9810.0,              # registro en g -> mm/s^2
+    'Damping': 0.05,
+    'tol': 1e-3,
+    'iter': 200,
+    'algoritmo': 'KrylovNewton',
+    'deriva_colapso': 0.10,   # deriva de entrepiso que se considera colapso
+    'tiempo_max': None,       # segundos de cálculo por análisis (None: sin límite);
+                              # un caso cortado por tiempo cuenta como colapso
+    'reutilizar_modelo': True,  # cada proceso construye el modelo una vez (ver preparar_modelo_ida)
+}
+
+_COLUMNAS = ['registro', 'Fsc', 'deriva_max', 'cortante_max', 'desp_techo_max', 'colapso',
+             'motivo', 'pasos', 'pasos_totales', 'tiempo_calculo']
+
+
+def clave_registro(ruta_registro, dir_registros=None):
+    """
+    Clave de un registro en el almacén de resultados: su ruta relativa a
+    dir_registros (por defecto, la carpeta de trabajo) con '/' como
+    separador. Con dir_registros igual a la carpeta del índice de
+    DEF_catalogo_registros coincide con la columna 'ruta' del índice.
+    Registros con el mismo nombre en carpetas distintas tienen claves
+    distintas.
+    """
+    return os.path.relpath(ruta_registro, dir_registros or os.curdir).replace(os.sep, '/')
+
+
+def preparar_modelo_ida(construir_modelo=construir_portico_ejemplo, opciones=None):
+    """
+    Construye el modelo con construir_modelo() y define el amortiguamiento y
+    los objetos de análisis, sin excitación. El dominio queda listo para
+    analizar_caso_ida(..., modelo=modelo), que en cada caso solo hace
+    reset() y cambia el registro (DEF_plantilla_modelo.cambiar_registro), sin
+    reconstruir el modelo.
+
+    reset() devuelve el modelo al estado sin deformar, así que construir_modelo
+    no debe dejar análisis previos en el dominio (p.ej. gravitatorio); para
+    esos modelos se usa opciones['reutilizar_modelo'] = False.
+
+    Devuelve:
+        diccionario que devuelve construir_modelo()
+    """
+    op = dict(OPCIONES_IDA)
+    if opciones:
+        op.update(opciones)
+
+    info = construir_modelo()
+
+    # MODELO DE AMORTIGUAMIENTO (modos 1 y 2, como en el script)
+    # Mismo modelo en todos los casos: los modos se leen de la caché de DEF_modal
+    Lambda = analisis_modal(2)['Lambda']
+    omegaI = np.sqrt(Lambda[0])
+    omegaJ = np.sqrt(Lambda[1])
+    alphaM = op['Damping']/(omegaI + omegaJ)*(omegaI*omegaJ)
+    betaK = op['Damping']/(omegaI + omegaJ)
+    ops.rayleigh(alphaM, betaK, 0, 0)
+
+    ops.system('UmfPack')
+    ops.numberer('RCM')
+    ops.constraints('Transformation')
+    ops.integrator('Newmark', 0.5, 0.25)
+    ops.algorithm(op['algoritmo'])
+    ops.test('NormDispIncr', op['tol'], op['iter'], 0, 2)
+    ops.analysis('Transient')
+
+    return info
+
+
+def analizar_caso_ida(ruta_registro, Fsc, construir_modelo=construir_portico_ejemplo, opciones=None,
+                      modelo=None):
+    """
+    Análisis dinámico de un registro escalado por Fsc sobre el modelo que
+    crea construir_modelo() (por defecto el pórtico 3D de MGDL-NL_UnfExc_Frame3D.py).
+
+    construir_modelo debe hacer wipe(), definir el modelo y devolver un
+    diccionario con 'nodos_base', 'nodos_control' y 'alturas' (ver
+    DEF_portico3d.construir_portico_ejemplo).
+
+    modelo es el diccionario de preparar_modelo_ida() con el modelo ya
+    construido en el dominio: se reutiliza (reset() + cambio de registro) y
+    queda listo para el siguiente caso. Si no se da, el modelo se construye
+    aquí y se elimina al terminar.
+
+    El análisis se corta en cuanto un paso no converge, la deriva supera
+    opciones['deriva_colapso'] o se agota opciones['tiempo_max'], para que
+    los casos de colapso no consuman el tiempo de cálculo. Los tres motivos
+    cuentan como colapso: un caso cortado por tiempo no ha demostrado ser
+    estable, y tomarlo como tal haría que la búsqueda siguiera subiendo la
+    intensidad.
+
+    Devuelve:
+        diccionario con registro, Fsc, deriva_max, cortante_max,
+        desp_techo_max, colapso, motivo, pasos, pasos_totales y tiempo_calculo
+    """
+    op = dict(OPCIONES_IDA)
+    if opciones:
+        op.update(opciones)
+    tic = time.perf_counter()
+
+    cabecera, ag = cargar_registro_peer(ruta_registro)
+    dt = cabecera.dt
+    Nsteps = cabecera.npts
+
+    dirn = op['dir']
+    tagTS = 1
+    serie = preparar_serie_path(dt, ag, op['g']*Fsc)
+    if modelo is None:
+        info = preparar_modelo_ida(construir_modelo, op)
+        definir_serie_path(tagTS, serie)
+        ops.pattern('UniformExcitation', 1, dirn, '-accel', tagTS)
+    else:
+        info = modelo
+        ops.reset()
+        cambiar_registro(tagTS, serie, 1, dirn)
+    nodos_control = info['nodos_control']
+    alturas = np.asarray(info['alturas'], dtype=float)
+
+    deriva_max = 0.0
+    cortante_max = 0.0
+    techo_max = 0.0
+    motivo = ''
+    pasos = 0
+    for i in range(Nsteps):
+        if ops.analyze(1, dt) != 0:
+            motivo = 'no converge'
+            break
+        pasos = i + 1
+
+        u = np.array([ops.nodeDisp(n, dirn) for n in nodos_control])
+        deriva_max = max(deriva_max, np.max(np.abs(np.diff(u))/alturas))
+        techo_max = max(techo_max, abs(u[-1] - u[0]))
+
+        ops.reactions()
+        cortante = sum(ops.nodeReaction(n, dirn) for n in info['nodos_base'])
+        cortante_max = max(cortante_max, abs(cortante))
+
+        if deriva_max > op['deriva_colapso']:
+            motivo = 'deriva'
+            break
+        if op['tiempo_max'] is not None and time.perf_counter() - tic > op['tiempo_max']:
+            motivo = 'tiempo'
+            break
+
+    if modelo is None:
+        ops.wipe()
+
+    return {'registro': clave_registro(ruta_registro), 'Fsc': float(Fsc),
+            'deriva_max': float(deriva_max), 'cortante_max': float(cortante_max),
+            'desp_techo_max': float(techo_max), 'colapso': motivo != '',
+            'motivo': motivo, 'pasos': pasos, 'pasos_totales': Nsteps,
+            'tiempo_calculo': time.perf_counter() - tic}
+
+
+def comprobar_modelo_ida(casos, construir_modelo=construir_portico_ejemplo, opciones=None):
+    """
+    Comprueba que reutilizar el modelo (preparar_modelo_ida + reset() y
+    cambio de registro) da los mismos resultados que reconstruirlo en cada
+    caso, e imprime el tiempo de cada variante.
+
+    Parámetros:
+        casos : lista de (ruta_registro, Fsc), en el orden de ejecución
+
+    Devuelve:
+        diferencia relativa máxima en deriva_max, cortante_max y desp_techo_max
+    """
+    claves = ['deriva_max', 'cortante_max', 'desp_techo_max']
+
+    tic = time.perf_counter()
+    reconstruccion = [analizar_caso_ida(ruta, Fsc, construir_modelo, opciones) for ruta, Fsc in casos]
+    t_reconstruccion = time.perf_counter() - tic
+
+    tic = time.perf_counter()
+    modelo = preparar_modelo_ida(construir_modelo, opciones)
+    reutilizado = [analizar_caso_ida(ruta, Fsc, construir_modelo, opciones, modelo) for ruta, Fsc in casos]
+    t_reutilizado = time.perf_counter() - tic
+    ops.wipe()
+
+    a = np.array([[r[c] for c in claves] for r in reconstruccion])
+    b = np.array([[r[c] for c in claves] for r in reutilizado])
+    dif = np.max(np.abs(b - a)/np.maximum(np.abs(a), np.finfo(float).tiny))
+    if any(ra['motivo'] != rb['motivo'] or ra['pasos'] != rb['pasos']
+           for ra, rb in zip(reconstruccion, reutilizado)):
+        dif = np.inf
+    print("reconstruccion: {:.2f} s, modelo reutilizado: {:.2f} s".format(t_reconstruccion, t_reutilizado))
+    print("Diferencia relativa máxima: {:.3e}".format(dif))
+    return dif
+
+
+# ---------------------------------------------------------------------------
+# Almacén de resultados
+# ---------------------------------------------------------------------------
+
+def _conectar(ruta_resultados):
+    con = sqlite3.connect(ruta_resultados)
+    con.execute("""
+        CREATE TABLE IF NOT EXISTS ida (
+            registro       TEXT,
+            Fsc            REAL,
+            deriva_max     REAL,
+            cortante_max   REAL,
+            desp_techo_max REAL,
+            colapso        INTEGER,
+            motivo         TEXT,
+            pasos          INTEGER,
+            pasos_totales  INTEGER,
+            tiempo_calculo REAL,
+            PRIMARY KEY (registro, Fsc)
+        )""")
+    return con
+
+
+def _guardar(con, resultado):
+    with con:
+        con.execute(f"INSERT OR REPLACE INTO ida ({', '.join(_COLUMNAS)}) "
+                    f"VALUES ({', '.join('?'*len(_COLUMNAS))})",
+                    [resultado[c] for c in _COLUMNAS])
+
+
+def leer_resultados_ida(ruta_resultados, guardar_npz=None):
+    """
+    Lee el almacén de resultados y lo devuelve por columnas (un np.ndarray
+    por magnitud), ordenado por registro e intensidad. Con guardar_npz se
+    escribe además un .npz con esas columnas.
+    """
+    con = _conectar(ruta_resultados)
+    filas = con.execute(f"SELECT {', '.join(_COLUMNAS)} FROM ida ORDER BY registro, Fsc").fetchall()
+    con.close()
+
+    columnas = {}
+    for k, nombre in enumerate(_COLUMNAS):
+        valores = [fila[k] for fila in filas]
+        if nombre in ('registro', 'motivo'):
+            columnas[nombre] = np.array(valores, dtype=str)
+        elif nombre == 'colapso':
+            columnas[nombre] = np.array(valores, dtype=bool)
+        else:
+            columnas[nombre] = np.array(valores, dtype=float)
+
+    if guardar_npz is not None:
+        np.savez(guardar_npz, **columnas)
+
+    return columnas
+
+
+# ---------------------------------------------------------------------------
+# Planificación de los casos registro x intensidad
+# ---------------------------------------------------------------------------
+
+_datos_trabajador = {}
+
+def _iniciar_trabajador(construir_modelo, opciones):
+    _datos_trabajador['construir_modelo'] = construir_modelo
+    _datos_trabajador['opciones'] = opciones
+    _datos_trabajador['reutilizar'] = {**OPCIONES_IDA, **(opciones or {})}['reutilizar_modelo']
+    _datos_trabajador['modelo'] = None
+
+
+def _ejecutar_caso(ruta_registro, Fsc):
+    # El modelo se construye en el primer caso de cada proceso y se reutiliza
+    # en los siguientes
+    construir_modelo = _datos_trabajador['construir_modelo']
+    opciones = _datos_trabajador['opciones']
+    if not _datos_trabajador['reutilizar']:
+        return analizar_caso_ida(ruta_registro, Fsc, construir_modelo, opciones)
+    if _datos_trabajador['modelo'] is None:
+        _datos_trabajador['modelo'] = preparar_modelo_ida(construir_modelo, opciones)
+    return analizar_caso_ida(ruta_registro, Fsc, construir_modelo, opciones, _datos_trabajador['modelo'])
+
+
+def ida_malla(registros, intensidades, ruta_resultados='Outputs/ida.sqlite',
+              construir_modelo=construir_portico_ejemplo, opciones=None, nproc=None,
+              dir_registros=None):
+    """
+    IDA sobre una malla fija de intensidades (factores de escala Fsc).
+
+    Los casos registro x intensidad se reparten entre procesos; cada
+    resultado se escribe en el almacén (SQLite) en cuanto termina, de modo
+    que una ejecución interrumpida se retoma saltando los casos ya hechos.
+    Cuando un registro colapsa con Fsc, los casos pendientes de ese registro
+    con intensidad mayor se cancelan y se guardan como colapso con motivo
+    'omitido'.
+
+    Parámetros:
+        registros        : rutas de los registros PEER (.AT2)
+        intensidades     : factores de escala
+        ruta_resultados  : archivo SQLite de resultados
+        construir_modelo : función (importable) que construye el modelo
+        opciones         : cambios sobre OPCIONES_IDA
+        nproc            : número de procesos (None -> os.cpu_count())
+        dir_registros    : carpeta de la biblioteca de registros; los
+                           resultados se guardan con la ruta relativa a
+                           ella (ver clave_registro)
+
+    Devuelve:
+        resultados por columnas (ver leer_resultados_ida)
+    """
+    carpeta = os.path.dirname(ruta_resultados)
+    if carpeta:
+        os.makedirs(carpeta, exist_ok=True)
+    con = _conectar(ruta_resultados)
+    hechos = {(r, f) for r, f in con.execute("SELECT registro, Fsc FROM ida")}
+
+    claves = {ruta: clave_registro(ruta, dir_registros) for ruta in registros}
+    intensidades = sorted(float(f) for f in intensidades)
+    casos = [(ruta, Fsc) for ruta in registros for Fsc in intensidades
+             if (claves[ruta], Fsc) not in hechos]
+
+    with ProcessPoolExecutor(max_workers=nproc, initializer=_iniciar_trabajador,
+                             initargs=(construir_modelo, opciones)) as pool:
+        pendientes = {pool.submit(_ejecutar_caso, ruta, Fsc): (ruta, Fsc) for ruta, Fsc in casos}
+        while pendientes:
+            terminados, _ = wait(pendientes, return_when=FIRST_COMPLETED)
+            for futuro in terminados:
+                ruta, Fsc = pendientes.pop(futuro)
+                if futuro.cancelled():
+                    continue
+                resultado = futuro.result()
+                resultado['registro'] = claves[ruta]
+                _guardar(con, resultado)
+                if not resultado['colapso']:
+                    continue
+                for otro, (ruta2, Fsc2) in list(pendientes.items()):
+                    if ruta2 == ruta and Fsc2 > Fsc and otro.cancel():
+                        pendientes.pop(otro)
+                        _guardar(con, {'registro': claves[ruta2], 'Fsc': Fsc2,
+                                       'deriva_max': np.nan, 'cortante_max': np.nan,
+                                       'desp_techo_max': np.nan, 'colapso': True, 'motivo': 'omitido',
+                                       'pasos': 0, 'pasos_totales': 0, 'tiempo_calculo': 0.0})
+    con.close()
+
+    return leer_resultados_ida(ruta_resultados)
+
+
+def _siguiente_intensidad(estado, paso_min):
+    # Fase de búsqueda (hunt): se aumenta Fsc con pasos crecientes hasta el
+    # primer colapso. Fase de relleno (fill): bisección entre el último Fsc
+    # sin colapso y el primero con colapso.
+    if estado['Fsc_colapso'] is None:
+        Fsc = estado['Fsc_ok'] + estado['paso']
+        estado['paso'] *= estado['factor_paso']
+        return Fsc
+    if estado['n_fill'] <= 0 or estado['Fsc_colapso'] - estado['Fsc_ok'] <= paso_min:
+        return None
+    estado['n_fill'] -= 1
+    return 0.5*(estado['Fsc_ok'] + estado['Fsc_colapso'])
+
+
+def _actualizar_estado(estado, Fsc, colapso):
+    if colapso:
+        estado['Fsc_colapso'] = Fsc
+    else:
+        estado['Fsc_ok'] = Fsc
+
+
+def ida_hunt_fill(registros, Fsc_inicial=0.25, paso_inicial=0.25, factor_paso=1.5, n_fill=4,
+                  paso_min=0.02, Fsc_max=10.0, ruta_resultados='Outputs/ida.sqlite',
+                  construir_modelo=construir_portico_ejemplo, opciones=None, nproc=None,
+                  dir_registros=None):
+    """
+    IDA con búsqueda del colapso por registro (hunt & fill).
+
+    Para cada registro se ejecuta Fsc_inicial y se aumenta la intensidad con
+    pasos crecientes (paso_inicial*factor_paso**k) hasta el primer colapso o
+    Fsc_max; después se rellenan n_fill casos por bisección entre la última
+    intensidad estable y la de colapso (hasta que la diferencia es menor que
+    paso_min). Los registros avanzan en paralelo: en cuanto termina un caso
+    se lanza el siguiente de ese registro, y cada resultado se escribe en el
+    almacén al terminar.
+
+    La secuencia de intensidades de cada registro solo depende de los
+    resultados anteriores, así que una ejecución interrumpida se retoma
+    recorriendo la secuencia con los casos ya guardados (con los mismos
+    parámetros de búsqueda) y lanzando el primero que falte.
+
+    dir_registros es la carpeta de la biblioteca de registros (ver
+    clave_registro).
+
+    Devuelve:
+        resultados por columnas (ver leer_resultados_ida)
+    """
+    carpeta = os.path.dirname(ruta_resultados)
+    if carpeta:
+        os.makedirs(carpeta, exist_ok=True)
+    con = _conectar(ruta_resultados)
+    guardados = {(r, f): bool(c) for r, f, c in con.execute("SELECT registro, Fsc, colapso FROM ida")}
+
+    claves = {ruta: clave_registro(ruta, dir_registros) for ruta in registros}
+    estados = {ruta: {'Fsc_ok': 0.0, 'Fsc_colapso': None, 'paso': paso_inicial,
+                      'factor_paso': factor_paso, 'n_fill': n_fill} for ruta in registros}
+
+    def siguiente(ruta, Fsc):
+        # Avanza la secuencia del registro sobre los casos ya guardados
+        while Fsc is not None and Fsc <= Fsc_max and (claves[ruta], Fsc) in guardados:
+            _actualizar_estado(estados[ruta], Fsc, guardados[(claves[ruta], Fsc)])
+            Fsc = _siguiente_intensidad(estados[ruta], paso_min)
+        if Fsc is None or Fsc > Fsc_max:
+            return None
+        return Fsc
+
+    with ProcessPoolExecutor(max_workers=nproc, initializer=_iniciar_trabajador,
+                             initargs=(construir_modelo, opciones)) as pool:
+        pendientes = {}
+        for ruta in registros:
+            Fsc = siguiente(ruta, float(Fsc_inicial))
+            if Fsc is not None:
+                pendientes[pool.submit(_ejecutar_caso, ruta, Fsc)] = ruta
+        while pendientes:
+            terminados, _ = wait(pendientes, return_when=FIRST_COMPLETED)
+            for futuro in terminados:
+                ruta = pendientes.pop(futuro)
+                resultado = futuro.result()
+                resultado['registro'] = claves[ruta]
+                _guardar(con, resultado)
+
+                _actualizar_estado(estados[ruta], resultado['Fsc'], resultado['colapso'])
+                Fsc = siguiente(ruta, _siguiente_intensidad(estados[ruta], paso_min))
+                if Fsc is not None:
+                    pendientes[pool.submit(_ejecutar_caso, ruta, Fsc)] = ruta
+    con.close()
+
+    return leer_resultados_ida(ruta_resultados)
@@ -1,60 +1,172 @@
+import os
+import json
+import hashlib
+from collections import namedtuple
+
 import numpy as np
 
-def leer_registro_peer(ruta_archivo):
+# Cabecera de un registro PEER NGA (.AT2, .VT2, .DT2)
+CabeceraPEER = namedtuple('CabeceraPEER', ['titulo', 'evento', 'tipo', 'unidades', 'npts', 'dt'])
+
+# Carpeta por defecto para la caché binaria (.npy) de los registros leídos
+DIR_CACHE_PEER = os.environ.get('PEER_CACHE_DIR',
+                                os.path.join(os.path.expanduser('~'), '.cache', 'registros_peer'))
+
+
+def leer_cabecera_peer(f):
     """
-    Lee un archivo de registro PEER NGA con formato:
+    Lee las cuatro líneas de cabecera de un registro PEER NGA:
 
     Línea 1: PEER NGA STRONG MOTION DATABASE RECORD
     Línea 2: Info del evento
-    Línea 3: ACCELERATION TIME SERIES...
+    Línea 3: ACCELERATION TIME SERIES IN UNITS OF G
     Línea 4: NPTS= xxxx, DT= xxxx SEC, ...
-    Líneas siguientes: serie de aceleraciones (en G).
+
+    f puede ser la ruta del archivo o un archivo ya abierto (queda posicionado
+    al comienzo de los datos).
 
     Devuelve:
-        npts : int
-        dt   : float
-        acc  : np.ndarray de forma (npts,) con los datos en orden.
+        CabeceraPEER(titulo, evento, tipo, unidades, npts, dt)
     """
-    with open(ruta_archivo, 'r') as f:
-        # Saltar las tres primeras líneas
-        f.readline()  # línea 1
-        f.readline()  # línea 2
-        f.readline()  # línea 3
-        linea4 = f.readline()  # línea 4 con NPTS y DT
-
-        # --- Extraer NPTS y DT sin regex ---
-        # Dividimos por comas: típicamente algo como
-        # ["NPTS=  14000", " DT=   .0100 SEC", "   ..."]
-        partes = linea4.split(',')
-
-        npts = None
-        dt = None
-
-        for parte in partes:
-            texto = parte.strip()
-            if 'NPTS' in texto:
-                # Ej: "NPTS=  14000"
-                trozos = texto.split('=')
-                npts_str = trozos[1].strip()
-                npts = int(npts_str)
-            elif 'DT' in texto:
-                # Ej: "DT=   .0100 SEC"
-                trozos = texto.split('=')
-                dt_str = trozos[1].strip().split()[0]  # nos quedamos con ".0100"
-                dt = float(dt_str)
-
-        if npts is None or dt is None:
-            raise ValueError("No se han podido encontrar NPTS y/o DT en la cabecera.")
+    if isinstance(f, (str, os.PathLike)):
+        with open(f, 'r') as archivo:
+            return leer_cabecera_peer(archivo)
+
+    titulo = f.readline().strip()  # línea 1
+    evento = f.readline().strip()  # línea 2
+    tipo = f.readline().strip()    # línea 3
+    linea4 = f.readline()          # línea 4 con NPTS y DT
+
+    # Unidades: lo que sigue a "UNITS OF" en la línea 3 (G, CM/S, CM, ...)
+    unidades = ''
+    if 'UNITS OF' in tipo.upper():
+        unidades = tipo.upper().split('UNITS OF')[1].strip()
 
+    # --- Extraer NPTS y DT sin regex ---
+    # Dividimos por comas: típicamente algo como
+    # ["NPTS=  14000", " DT=   .0100 SEC", "   ..."]
+    partes = linea4.split(',')
+
+    npts = None
+    dt = None
+
+    for parte in partes:
+        texto = parte.strip()
+        if 'NPTS' in texto:
+            # Ej: "NPTS=  14000"
+            trozos = texto.split('=')
+            npts = int(trozos[1].strip())
+        elif 'DT' in texto:
+            # Ej: "DT=   .0100 SEC"
+            trozos = texto.split('=')
+            dt = float(trozos[1].strip().split()[0])  # nos quedamos con ".0100"
+
+    if npts is None or dt is None:
+        raise ValueError("No se han podido encontrar NPTS y/o DT en la cabecera.")
+
+    return CabeceraPEER(titulo, evento, tipo, unidades, npts, dt)
+
+
+def _leer_datos(texto, npts):
+    # Conversión directa en C de todos los valores separados por blancos
+    try:
+        datos = np.fromstring(texto, dtype=float, sep=' ')
+        if datos.size == npts:
+            return datos
+    except ValueError:
+        pass
+
+    # Formato de ancho fijo sin separación (p.ej. "-.1234E-02-.5678E-02"):
+    # el ancho de campo se deduce de la primera línea completa.
+    lineas = [linea.rstrip('\r\n') for linea in texto.splitlines() if linea.strip()]
+    if not lineas:
+        return np.zeros(0)
+    ncol = max(lineas[0].upper().count('E'), 1)
+    ancho = len(lineas[0])//ncol
+    campos = [linea[k:k + ancho] for linea in lineas for k in range(0, len(linea), ancho)]
+    return np.array([c for c in campos if c.strip()], dtype=float)
+
+
+def _ruta_cache(ruta_archivo, dir_cache):
+    # Un par .npy/.json por archivo, con nombre derivado de la ruta absoluta
+    clave = hashlib.sha1(os.path.abspath(ruta_archivo).encode('utf-8')).hexdigest()
+    return os.path.join(dir_cache, clave + '.npy'), os.path.join(dir_cache, clave + '.json')
+
+
+def cargar_registro_peer(ruta_archivo, cache=True, dir_cache=None):
+    """
+    Lee un registro PEER NGA y devuelve su cabecera y sus datos.
+
+    Con cache=True los datos se guardan en un archivo .npy (más un .json con
+    la cabecera) dentro de dir_cache (por defecto DIR_CACHE_PEER, o la
+    variable de entorno PEER_CACHE_DIR). La entrada de caché se identifica
+    por la ruta absoluta del registro y solo se reutiliza si coinciden la
+    fecha de modificación y el tamaño del archivo; en ese caso los datos se
+    devuelven como np.memmap en modo copia en escritura ('c'), sin volver a
+    leer el texto: se pueden modificar en memoria (ag *= g) sin alterar la caché.
+
+    Devuelve:
+        cabecera : CabeceraPEER
+        datos    : np.ndarray de forma (npts,) con los datos en orden.
+    """
+    if cache:
+        if dir_cache is None:
+            dir_cache = DIR_CACHE_PEER
+        estado = os.stat(ruta_archivo)
+        ruta_npy, ruta_json = _ruta_cache(ruta_archivo, dir_cache)
+        try:
+            with open(ruta_json, 'r') as f:
+                meta = json.load(f)
+            if meta['mtime_ns'] == estado.st_mtime_ns and meta['size'] == estado.st_size:
+                cabecera = CabeceraPEER(**meta['cabecera'])
+                return cabecera, np.load(ruta_npy, mmap_mode='c')
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
+
+    with open(ruta_archivo, 'r') as f:
+        cabecera = leer_cabecera_peer(f)
         # --- Leer el resto del archivo como números ---
         # Se leen en el orden en que aparecen: izq→dcha, arriba→abajo
-        resto = f.read().split()
-        acc = np.array(resto, dtype=float)
+        datos = _leer_datos(f.read(), cabecera.npts)
 
     # Comprobación de consistencia
-    if acc.size != npts:
+    if datos.size != cabecera.npts:
         raise ValueError(
-            f"NPTS indica {npts} puntos, pero se han leído {acc.size} valores."
+            f"NPTS indica {cabecera.npts} puntos, pero se han leído {datos.size} valores."
         )
 
-    return npts, dt, acc
\ No newline at end of file
+    if cache:
+        # Escritura atómica: otro proceso nunca ve una entrada a medias
+        os.makedirs(dir_cache, exist_ok=True)
+        sufijo = f'.{os.getpid()}.tmp'
+        with open(ruta_npy + sufijo, 'wb') as f:
+            np.save(f, datos)
+        with open(ruta_json + sufijo, 'w') as f:
+            json.dump({'ruta': os.path.abspath(ruta_archivo), 'mtime_ns': estado.st_mtime_ns,
+                       'size': estado.st_size, 'cabecera': cabecera._asdict()}, f)
+        os.replace(ruta_npy + sufijo, ruta_npy)
+        os.replace(ruta_json + sufijo, ruta_json)
+
+    return cabecera, datos
+
+
+def leer_registro_peer(ruta_archivo, cache=True, dir_cache=None):
+    """
+    Lee un archivo de registro PEER NGA (.AT2, .VT2 o .DT2) con formato:
+
+    Línea 1: PEER NGA STRONG MOTION DATABASE RECORD
+    Línea 2: Info del evento
+    Línea 3: ACCELERATION TIME SERIES...
+    Línea 4: NPTS= xxxx, DT= xxxx SEC, ...
+    Líneas siguientes: serie de aceleraciones (en G).
+
+    Ver cargar_registro_peer() para la caché y la cabecera completa.
+
+    Devuelve:
+        npts : int
+        dt   : float
+        acc  : np.ndarray de forma (npts,) con los datos en orden.
+    """
+    cabecera, acc = cargar_registro_peer(ruta_archivo, cache, dir_cache)
+
+    return cabecera.npts, cabecera.dt, acc
@@ -0,0 +1,602 @@
+import numpy as np
+import openseespy.opensees as ops
+
+# Mismo umbral que usan los materiales de OpenSees para ignorar incrementos nulos
+DBL_EPSILON = np.finfo(float).eps
+# Giro "infinito" de Hysteretic (POS_INF_STRAIN de OpenSees): límite de los
+# giros límite de la envolvente y de los giros máximos degradados por daño
+ROT_INF = 1e16
+
+# Parámetros de cada material en el orden de uniaxialMaterial() y valores por defecto
+PARAMETROS = {
+    'Steel01': (('Fy', None), ('E0', None), ('b', None),
+                ('a1', 0.0), ('a2', 1.0), ('a3', 0.0), ('a4', 1.0)),
+    'Steel02': (('Fy', None), ('E0', None), ('b', None),
+                ('R0', 15.0), ('cR1', 0.925), ('cR2', 0.15),
+                ('a1', 0.0), ('a2', 1.0), ('a3', 0.0), ('a4', 1.0), ('sigInit', 0.0)),
+    'Hysteretic': (('mom1p', None), ('rot1p', None), ('mom2p', None), ('rot2p', None),
+                   ('mom3p', None), ('rot3p', None),
+                   ('mom1n', None), ('rot1n', None), ('mom2n', None), ('rot2n', None),
+                   ('mom3n', None), ('rot3n', None),
+                   ('pinchX', None), ('pinchY', None),
+                   ('damage1', 0.0), ('damage2', 0.0), ('beta', 0.0)),
+    'Concrete01': (('fpc', None), ('epsc0', None), ('fpcu', None), ('epscu', None)),
+    'Concrete02': (('fpc', None), ('epsc0', None), ('fpcu', None), ('epscu', None),
+                   ('rat', None), ('ft', None), ('Ets', None)),
+}
+
+
+def _preparar(nombre, deformaciones, parametros):
+    # Deformaciones como (N, pasos) y cada parámetro como vector (N,)
+    eps = np.asarray(deformaciones, dtype=float)
+    unidim = eps.ndim == 1
+    eps = np.atleast_2d(eps)
+    if eps.ndim != 2:
+        raise ValueError("deformaciones debe ser un vector (pasos,) o una matriz (N, pasos)")
+
+    conocidos = dict(PARAMETROS[nombre])
+    sobrantes = set(parametros) - set(conocidos)
+    if sobrantes:
+        raise TypeError(f"Parámetros desconocidos para {nombre}: {sorted(sobrantes)}")
+    faltan = [p for p, defecto in conocidos.items() if defecto is None and p not in parametros]
+    if faltan:
+        raise TypeError(f"Faltan parámetros de {nombre}: {faltan}")
+
+    valores = {p: parametros.get(p, defecto) for p, defecto in conocidos.items()}
+    N = np.broadcast_shapes(eps.shape[:1], *[np.shape(v) for v in valores.values()])[0]
+    eps = np.broadcast_to(eps, (N, eps.shape[1]))
+    unidim = unidim and N == 1
+    valores = {p: np.broadcast_to(np.asarray(v, dtype=float), (N,)) for p, v in valores.items()}
+    return eps, valores, unidim
+
+
+def _resultado(sig, unidim):
+    return sig[0] if unidim else sig
+
+
+def steel01(deformaciones, **parametros):
+    """
+    Steel01 (bilineal con endurecimiento isótropo opcional a1..a4) para N
+    materiales independientes a la vez. Reproduce Steel01::setTrialStrain y
+    commitState de OpenSees paso a paso; cada paso es una operación
+    vectorizada sobre los N materiales.
+
+    Parámetros:
+        deformaciones : np.ndarray (N, pasos) o (pasos,), partiendo de 0;
+                        una sola historia se aplica a los N materiales
+        Fy, E0, b, a1, a2, a3, a4 : escalares o vectores (N,)
+
+    Devuelve:
+        tensiones : np.ndarray con la forma de deformaciones
+    """
+    eps, p, unidim = _preparar('Steel01', deformaciones, parametros)
+    Fy, E0, b = p['Fy'], p['E0'], p['b']
+    a1, a2, a3, a4 = p['a1'], p['a2'], p['a3'], p['a4']
+    N, pasos = eps.shape
+
+    fy1b = Fy*(1.0 - b)
+    Esh = b*E0
+    epsy = Fy/E0
+
+    e_c = np.zeros(N)
+    s_c = np.zeros(N)
+    e_min = np.zeros(N)
+    e_max = np.zeros(N)
+    despl_p = np.ones(N)
+    despl_n = np.ones(N)
+    carga = np.zeros(N)
+    sig = np.empty((N, pasos))
+
+    for k in range(pasos):
+        e = eps[:, k]
+        de = e - e_c
+        activo = np.abs(de) > DBL_EPSILON
+
+        s = np.maximum(Esh*e - despl_n*fy1b, np.minimum(Esh*e + despl_p*fy1b, s_c + E0*de))
+
+        # Inversiones de carga: se actualiza el endurecimiento isótropo
+        c = np.where((carga == 0) & (de != 0), np.sign(de), carga)
+        descarga = (c == 1) & (de < 0)
+        c = np.where(descarga, -1.0, c)
+        mx = np.where(descarga & (e_c > e_max), e_c, e_max)
+        dn = np.where(descarga, 1.0 + a1*((mx - e_min)/(2.0*a2*epsy))**0.8, despl_n)
+        recarga = (c == -1) & (de > 0)
+        c = np.where(recarga, 1.0, c)
+        mn = np.where(recarga & (e_c < e_min), e_c, e_min)
+        dp = np.where(recarga, 1.0 + a3*((mx - mn)/(2.0*a4*epsy))**0.8, despl_p)
+
+        s_c = np.where(activo, s, s_c)
+        e_min = np.where(activo, mn, e_min)
+        e_max = np.where(activo, mx, e_max)
+        despl_p = np.where(activo, dp, despl_p)
+        despl_n = np.where(activo, dn, despl_n)
+        carga = np.where(activo, c, carga)
+        e_c = e
+        sig[:, k] = s_c
+
+    return _resultado(sig, unidim)
+
+
+def steel02(deformaciones, **parametros):
+    """
+    Steel02 (Giuffré-Menegotto-Pinto con endurecimiento isótropo opcional y
+    tensión inicial sigInit) para N materiales independientes a la vez.
+    Reproduce Steel02::setTrialStrain y commitState de OpenSees.
+
+    Parámetros:
+        deformaciones : np.ndarray (N, pasos) o (pasos,), partiendo de 0
+        Fy, E0, b, R0, cR1, cR2, a1, a2, a3, a4, sigInit : escalares o
+                        vectores (N,)
+
+    Devuelve:
+        tensiones : np.ndarray con la forma de deformaciones
+    """
+    eps, p, unidim = _preparar('Steel02', deformaciones, parametros)
+    Fy, E0, b = p['Fy'], p['E0'], p['b']
+    R0, cR1, cR2 = p['R0'], p['cR1'], p['cR2']
+    a1, a2, a3, a4, sig0 = p['a1'], p['a2'], p['a3'], p['a4'], p['sigInit']
+    N, pasos = eps.shape
+
+    Esh = b*E0
+    epsy = Fy/E0
+    eps_ini = sig0/E0
+
+    e_p = eps_ini.copy()
+    s_p = sig0.copy()
+    e_max = epsy.copy()
+    e_min = -epsy
+    e_pl = np.zeros(N)
+    e_s0 = np.zeros(N)
+    s_s0 = np.zeros(N)
+    e_r = np.zeros(N)
+    s_r = np.zeros(N)
+    kon = np.zeros(N, dtype=int)
+    sig = np.empty((N, pasos))
+
+    for k in range(pasos):
+        e = eps[:, k] + eps_ini
+        de = e - e_p
+
+        # Primer escalón: todavía en el origen (kon 0/3) o sale de él
+        origen = (kon == 0) | (kon == 3)
+        quieto = origen & (np.abs(de) < 10.0*DBL_EPSILON)
+        arranca = origen & ~quieto
+        e_max = np.where(arranca, epsy, e_max)
+        e_min = np.where(arranca, -epsy, e_min)
+        comp = de < 0.0
+        kon = np.where(quieto, 3, np.where(arranca, np.where(comp, 2, 1), kon))
+        e_s0 = np.where(arranca, np.where(comp, e_min, e_max), e_s0)
+        s_s0 = np.where(arranca, np.where(comp, -Fy, Fy), s_s0)
+        e_pl = np.where(arranca, e_s0, e_pl)
+
+        # Inversión de compresión a tracción
+        inv_t = (kon == 2) & (de > 0.0)
+        # Inversión de tracción a compresión
+        inv_c = (kon == 1) & (de < 0.0)
+        inv = inv_t | inv_c
+        e_r = np.where(inv, e_p, e_r)
+        s_r = np.where(inv, s_p, s_r)
+        e_min = np.where(inv_t, np.minimum(e_p, e_min), e_min)
+        e_max = np.where(inv_c, np.maximum(e_p, e_max), e_max)
+        d1 = (e_max - e_min)/(2.0*np.where(inv_t, a4, a2)*epsy)
+        shft = 1.0 + np.where(inv_t, a3, a1)*d1**0.8
+        signo = np.where(inv_t, 1.0, -1.0)
+        es0 = (signo*(Fy*shft - Esh*epsy*shft) - s_r + E0*e_r)/(E0 - Esh)
+        e_s0 = np.where(inv, es0, e_s0)
+        s_s0 = np.where(inv, signo*Fy*shft + Esh*(es0 - signo*epsy*shft), s_s0)
+        e_pl = np.where(inv_t, e_max, np.where(inv_c, e_min, e_pl))
+        kon = np.where(inv_t, 1, np.where(inv_c, 2, kon))
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            xi = np.abs((e_pl - e_s0)/epsy)
+            R = R0*(1.0 - (cR1*xi)/(cR2 + xi))
+            rat = (e - e_r)/(e_s0 - e_r)
+            dum2 = (1.0 + np.abs(rat)**R)**(1.0/R)
+            s = (b*rat + (1.0 - b)*rat/dum2)*(s_s0 - s_r) + s_r
+
+        s_p = np.where(quieto, sig0, s)
+        e_p = e
+        sig[:, k] = s_p
+
+    return _resultado(sig, unidim)
+
+
+def _envolventes_hysteretic(p):
+    # Ramas de la envolvente trilineal (HystereticMaterial::setEnvelope)
+    env = dict(p)
+    for s in 'pn':
+        m1, m2, m3 = p['mom1' + s], p['mom2' + s], p['mom3' + s]
+        r1, r2, r3 = p['rot1' + s], p['rot2' + s], p['rot3' + s]
+        env['E1' + s] = m1/r1
+        env['E2' + s] = (m2 - m1)/(r2 - r1)
+        env['E3' + s] = (m3 - m2)/(r3 - r2)
+    env['energyA'] = 0.5*sum(p['rot1' + s]*p['mom1' + s]
+                             + (p['rot2' + s] - p['rot1' + s])*(p['mom2' + s] + p['mom1' + s])
+                             + (p['rot3' + s] - p['rot2' + s])*(p['mom3' + s] + p['mom2' + s])
+                             for s in 'pn')
+    return env
+
+
+def _envolvente_pos(x, v):
+    return np.where(x <= 0.0, 0.0,
+           np.where(x <= v['rot1p'], v['E1p']*x,
+           np.where(x <= v['rot2p'], v['mom1p'] + v['E2p']*(x - v['rot1p']),
+           np.where((x <= v['rot3p']) | (v['E3p'] > 0.0), v['mom2p'] + v['E3p']*(x - v['rot2p']),
+                    v['mom3p']))))
+
+
+def _envolvente_neg(x, v):
+    return np.where(x >= 0.0, 0.0,
+           np.where(x >= v['rot1n'], v['E1n']*x,
+           np.where(x >= v['rot2n'], v['mom1n'] + v['E2n']*(x - v['rot1n']),
+           np.where((x >= v['rot3n']) | (v['E3n'] > 0.0), v['mom2n'] + v['E3n']*(x - v['rot2n']),
+                    v['mom3n']))))
+
+
+def _giro_limite_pos(x, v):
+    return np.where(x < v['rot1p'], ROT_INF,
+           np.where((x < v['rot2p']) & (v['E2p'] < 0.0), v['rot1p'] - v['mom1p']/v['E2p'],
+           np.where((x < v['rot3p']) & (v['E3p'] < 0.0), v['rot2p'] - v['mom2p']/v['E3p'],
+                    ROT_INF)))
+
+
+def _giro_limite_neg(x, v):
+    return np.where(x > v['rot1n'], -ROT_INF,
+           np.where((x > v['rot2n']) & (v['E2n'] < 0.0), v['rot1n'] - v['mom1n']/v['E2n'],
+           np.where((x > v['rot3n']) & (v['E3n'] < 0.0), v['rot2n'] - v['mom2n']/v['E3n'],
+                    -ROT_INF)))
+
+
+def hysteretic(deformaciones, **parametros):
+    """
+    Hysteretic (envolvente trilineal con pinzamiento pinchX/pinchY, daño
+    damage1/damage2 y degradación de la rigidez de descarga beta) para N
+    materiales independientes a la vez. Reproduce
+    HystereticMaterial::setTrialStrain y commitState de OpenSees (con las
+    ramas de pinzamiento de la versión posterior a 2022).
+
+    Parámetros:
+        deformaciones : np.ndarray (N, pasos) o (pasos,), partiendo de 0
+        mom1p, rot1p, ..., mom3n, rot3n : puntos de la envolvente (los
+                        negativos con signo negativo), escalares o (N,)
+        pinchX, pinchY, damage1, damage2, beta : escalares o (N,)
+
+    Devuelve:
+        tensiones : np.ndarray con la forma de deformaciones
+    """
+    eps, p, unidim = _preparar('Hysteretic', deformaciones, parametros)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        v = _envolventes_hysteretic(p)
+    pinchX, pinchY, beta = v['pinchX'], v['pinchY'], v['beta']
+    damfc1, damfc2 = v['damage1'], v['damage2']
+    rot1p, rot1n = v['rot1p'], v['rot1n']
+    Eup, Eun = v['E1p'], v['E1n']
+    N, pasos = eps.shape
+
+    e_c = np.zeros(N)
+    s_c = np.zeros(N)
+    rot_max = np.zeros(N)
+    rot_min = np.zeros(N)
+    rot_pu = np.zeros(N)
+    rot_nu = np.zeros(N)
+    energia = np.zeros(N)
+    carga = np.zeros(N, dtype=int)
+    sig = np.empty((N, pasos))
+
+    for k in range(pasos):
+        e = eps[:, k]
+        de = e - e_c
+        # Sin historia y en el origen: OpenSees no hace nada
+        inactivo = (carga == 0) & (e == 0.0)
+
+        c = np.where(carga == 0, np.where(de < 0.0, 2, 1), carga)
+        env_p = e >= rot_max
+        env_n = ~env_p & (e <= rot_min)
+        sube = ~env_p & ~env_n & (de > 0.0)
+        baja = ~env_p & ~env_n & (de < 0.0)
+
+        with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+            kn = (rot_min/rot1n)**beta
+            kn = np.where(kn < 1.0, 1.0, 1.0/kn)
+            kp = (rot_max/rot1p)**beta
+            kp = np.where(kp < 1.0, 1.0, 1.0/kp)
+
+            # Incremento positivo (HystereticMaterial::positiveIncrement)
+            inv = sube & (c == 2) & (s_c <= 0.0)
+            nu = np.where(inv, e_c - s_c/(Eun*kn), rot_nu)
+            ener = energia - 0.5*s_c/(Eun*kn)*s_c
+            damfc = np.where(rot_min < rot1n,
+                             damfc2*ener/v['energyA'] + damfc1*(rot_min - rot1n)/rot1n, 0.0)
+            tmax = np.where(inv, rot_max*(1.0 + damfc), rot_max)
+            # Con daño el giro máximo crece en cada inversión (damfc es
+            # proporcional a rot_min); OpenSees lo limita a ROT_INF, lo que
+            # evita que kp y la rama pinzada lleguen a 0*inf
+            tmax = np.minimum(np.maximum(tmax, rot1p), ROT_INF)
+            maxmom = _envolvente_pos(tmax, v)
+            rotrel = np.maximum(_giro_limite_neg(rot_min, v), nu)
+            rotmp2 = tmax - (1.0 - pinchY)*maxmom/(Eup*kp)
+            rotch = rotrel + (rotmp2 - rotrel)*pinchX
+            tmp1 = s_c + Eup*kp*de
+            s_a = s_c + Eun*kn*de
+            s_a = np.where(s_a >= 0.0, 0.0, s_a)
+            s_b = np.where(e <= rotrel, 0.0,
+                           np.minimum(tmp1, (e - rotrel)*maxmom*pinchY/(rotch - rotrel)))
+            s_d = np.minimum(tmp1, pinchY*maxmom
+                             + (e - rotch)*(1.0 - pinchY)*maxmom/(tmax - rotch))
+            s_sube = np.where(e < nu, s_a, np.where(e < rotch, s_b, s_d))
+
+            # Incremento negativo (HystereticMaterial::negativeIncrement)
+            inv = baja & (c == 1) & (s_c >= 0.0)
+            pu = np.where(inv, e_c - s_c/(Eup*kp), rot_pu)
+            ener = energia - 0.5*s_c/(Eup*kp)*s_c
+            damfc = np.where(rot_max > rot1p,
+                             damfc2*ener/v['energyA'] + damfc1*(rot_max - rot1p)/rot1p, 0.0)
+            tmin = np.where(inv, rot_min*(1.0 + damfc), rot_min)
+            tmin = np.maximum(np.minimum(tmin, rot1n), -ROT_INF)
+            minmom = _envolvente_neg(tmin, v)
+            rotrel = np.minimum(_giro_limite_pos(rot_max, v), pu)
+            rotmp2 = tmin - (1.0 - pinchY)*minmom/(Eun*kn)
+            rotch = rotrel + (rotmp2 - rotrel)*pinchX
+            tmp1 = s_c + Eun*kn*de
+            s_a = s_c + Eup*kp*de
+            s_a = np.where(s_a <= 0.0, 0.0, s_a)
+            s_b = np.where(e >= rotrel, 0.0,
+                           np.maximum(tmp1, (e - rotrel)*minmom*pinchY/(rotch - rotrel)))
+            s_d = np.maximum(tmp1, pinchY*minmom
+                             + (e - rotch)*(1.0 - pinchY)*minmom/(tmin - rotch))
+            s_baja = np.where(e > pu, s_a, np.where(e > rotch, s_b, s_d))
+
+            s = np.where(env_p, _envolvente_pos(e, v),
+                np.where(env_n, _envolvente_neg(e, v),
+                np.where(sube, s_sube, np.where(baja, s_baja, s_c))))
+
+        activo = ~inactivo
+        rot_max = np.where(activo & env_p, e, np.where(activo & sube, tmax, rot_max))
+        rot_min = np.where(activo & env_n, e, np.where(activo & baja, tmin, rot_min))
+        rot_nu = np.where(activo & sube, nu, rot_nu)
+        rot_pu = np.where(activo & baja, pu, rot_pu)
+        carga = np.where(activo, np.where(env_p | sube, 1, np.where(env_n | baja, 2, c)), carga)
+        energia = np.where(activo, energia + 0.5*(s_c + s)*de, energia)
+        s_c = np.where(activo, s, s_c)
+        e_c = np.where(activo, e, e_c)
+        sig[:, k] = s_c
+
+    return _resultado(sig, unidim)
+
+
+def concrete01(deformaciones, **parametros):
+    """
+    Concrete01 (Kent-Scott-Park sin resistencia a tracción, descarga
+    degradada de Karsan-Jirsa) para N materiales independientes a la vez.
+    Reproduce Concrete01::setTrialStrain y commitState de OpenSees; como en
+    OpenSees, fpc, epsc0, fpcu y epscu se toman en compresión sea cual sea
+    su signo.
+
+    Parámetros:
+        deformaciones : np.ndarray (N, pasos) o (pasos,), partiendo de 0
+        fpc, epsc0, fpcu, epscu : escalares o vectores (N,)
+
+    Devuelve:
+        tensiones : np.ndarray con la forma de deformaciones
+    """
+    eps, p, unidim = _preparar('Concrete01', deformaciones, parametros)
+    fpc, epsc0 = -np.abs(p['fpc']), -np.abs(p['epsc0'])
+    fpcu, epscu = -np.abs(p['fpcu']), -np.abs(p['epscu'])
+    N, pasos = eps.shape
+    Ec0 = 2.0*fpc/epsc0
+
+    e_c = np.zeros(N)
+    s_c = np.zeros(N)
+    e_min = np.zeros(N)
+    e_fin = np.zeros(N)
+    pend = Ec0.copy()
+    sig = np.empty((N, pasos))
+
+    for k in range(pasos):
+        e = eps[:, k]
+        de = e - e_c
+        activo = np.abs(de) >= DBL_EPSILON
+
+        # Envolvente de compresión (Concrete01::envelope)
+        eta = e/epsc0
+        s_env = np.where(e > epsc0, fpc*(2.0*eta - eta*eta),
+                np.where(e > epscu, fpc + (fpc - fpcu)/(epsc0 - epscu)*(e - epsc0), fpcu))
+
+        # Nueva rama de descarga desde la envolvente (Concrete01::unload)
+        eta = np.maximum(e, epscu)/epsc0
+        fin = np.where(eta < 2.0, 0.145*eta*eta + 0.13*eta, 0.707*(eta - 2.0) + 0.834)*epsc0
+        temp1 = e - fin
+        temp2 = s_env/Ec0
+        with np.errstate(divide='ignore', invalid='ignore'):
+            nueva_pend = np.where(temp1 > -DBL_EPSILON, Ec0,
+                                  np.where(temp1 <= temp2, s_env/temp1, Ec0))
+        nuevo_fin = np.where(temp1 > -DBL_EPSILON, fin,
+                             np.where(temp1 <= temp2, e - temp1, e - temp2))
+
+        # Recarga en compresión (Concrete01::reload)
+        sobre_env = e <= e_min
+        s_rec = np.where(sobre_env, s_env, np.where(e <= e_fin, pend*(e - e_fin), 0.0))
+        temp = s_c + pend*e - pend*e_c
+        comprime = e < e_c
+        s = np.where(comprime, np.maximum(s_rec, temp), np.where(temp <= 0.0, temp, 0.0))
+        s = np.where(e > 0.0, 0.0, s)
+
+        cambia = activo & (e <= 0.0) & comprime & sobre_env
+        e_min = np.where(cambia, e, e_min)
+        e_fin = np.where(cambia, nuevo_fin, e_fin)
+        pend = np.where(cambia, nueva_pend, pend)
+        s_c = np.where(activo, s, s_c)
+        e_c = np.where(activo, e, e_c)
+        sig[:, k] = s_c
+
+    return _resultado(sig, unidim)
+
+
+def _envolvente_compresion(e, fc, epsc0, fcu, epscu):
+    # Concrete02::Compr_Envlp
+    rat = e/epsc0
+    return np.where(e >= epsc0, fc*rat*(2.0 - rat),
+           np.where(e > epscu, (fcu - fc)*(e - epsc0)/(epscu - epsc0) + fc, fcu))
+
+
+def _envolvente_traccion(e, Ec0, ft, Ets):
+    # Concrete02::Tens_Envlp
+    eps0 = ft/Ec0
+    epsu = ft*(1.0/Ets + 1.0/Ec0)
+    return np.where(e <= eps0, e*Ec0, np.where(e <= epsu, ft - Ets*(e - eps0), 0.0))
+
+
+def concrete02(deformaciones, **parametros):
+    """
+    Concrete02 (Kent-Scott-Park en compresión con descarga lineal y
+    resistencia a tracción con ablandamiento lineal) para N materiales
+    independientes a la vez. Reproduce Concrete02::setTrialStrain y
+    commitState de OpenSees; fpc, epsc0, fpcu y epscu van con signo negativo.
+
+    Parámetros:
+        deformaciones : np.ndarray (N, pasos) o (pasos,), partiendo de 0
+        fpc, epsc0, fpcu, epscu, rat, ft, Ets : escalares o vectores (N,)
+
+    Devuelve:
+        tensiones : np.ndarray con la forma de deformaciones
+    """
+    eps, p, unidim = _preparar('Concrete02', deformaciones, parametros)
+    fc, epsc0, fcu, epscu = p['fpc'], p['epsc0'], p['fpcu'], p['epscu']
+    rat, ft, Ets = p['rat'], p['ft'], p['Ets']
+    N, pasos = eps.shape
+    ec0 = 2.0*fc/epsc0
+
+    # Punto R que fija la pendiente de recarga (Yassin, 1994)
+    epsr = (fcu - rat*ec0*epscu)/(ec0*(1.0 - rat))
+    sigr = ec0*epsr
+
+    e_p = np.zeros(N)
+    s_p = np.zeros(N)
+    ecmin = np.zeros(N)
+    dept = np.zeros(N)
+    sig = np.empty((N, pasos))
+
+    for k in range(pasos):
+        e = eps[:, k]
+        de = e - e_p
+        activo = np.abs(de) >= DBL_EPSILON
+
+        compr = e < ecmin
+        s_env = _envolvente_compresion(e, fc, epsc0, fcu, epscu)
+
+        sigmm = _envolvente_compresion(ecmin, fc, epsc0, fcu, epscu)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            er = (sigmm - sigr)/(ecmin - epsr)
+            ept = ecmin - sigmm/er
+
+            # Descarga-recarga entre ecmin y ept
+            s_u = s_p + ec0*de
+            s_u = np.where(s_u <= sigmm + er*(e - ecmin), sigmm + er*(e - ecmin), s_u)
+            s_u = np.minimum(s_u, er*0.5*(e - ept))
+
+            # Recarga en tracción hasta epn y envolvente de tracción desplazada ept
+            epn = ept + dept
+            sicn = _envolvente_traccion(dept, ec0, ft, Ets)
+            s_r = np.where(dept != 0.0, sicn/dept, ec0)*(e - ept)
+            s_t = _envolvente_traccion(e - ept, ec0, ft, Ets)
+            s = np.where(compr, s_env,
+                np.where(e <= ept, s_u, np.where(e <= epn, s_r, s_t)))
+
+        traccion = activo & ~compr & (e > ept) & (e > epn)
+        dept = np.where(traccion, e - ept, dept)
+        ecmin = np.where(activo & compr, e, ecmin)
+        s_p = np.where(activo, s, s_p)
+        e_p = e
+        sig[:, k] = s_p
+
+    return _resultado(sig, unidim)
+
+
+MATERIALES = {'Steel01': steel01, 'Steel02': steel02, 'Hysteretic': hysteretic,
+              'Concrete01': concrete01, 'Concrete02': concrete02}
+
+
+def respuesta_material(nombre, deformaciones, **parametros):
+    """
+    Tensiones de N materiales uniaxiales 'nombre' (ver MATERIALES) bajo
+    historias de deformación (N, pasos), con parámetros escalares o
+    vectores (N,) con los nombres de PARAMETROS[nombre].
+    """
+    return MATERIALES[nombre](deformaciones, **parametros)
+
+
+def respuesta_material_opensees(nombre, deformaciones, **parametros):
+    """
+    Misma respuesta que respuesta_material() calculada fila a fila con el
+    material de OpenSees (testUniaxialMaterial + setStrain, que fija y
+    consolida la deformación en cada paso). Borra el modelo actual de
+    OpenSees.
+    """
+    eps, p, unidim = _preparar(nombre, deformaciones, parametros)
+    orden = [nombre_p for nombre_p, _ in PARAMETROS[nombre]]
+    sig = np.empty(eps.shape)
+    for i in range(eps.shape[0]):
+        ops.wipe()
+        ops.model('basic', '-ndm', 1, '-ndf', 1)
+        ops.uniaxialMaterial(nombre, 1, *[float(p[q][i]) for q in orden])
+        ops.testUniaxialMaterial(1)
+        for k, e in enumerate(eps[i]):
+            ops.setStrain(float(e))
+            sig[i, k] = ops.getStress()
+    ops.wipe()
+    return _resultado(sig, unidim)
+
+
+def comprobar_material(nombre, deformaciones, rtol=1e-8, filas=None, **parametros):
+    """
+    Compara respuesta_material() con el material de OpenSees y devuelve el
+    error máximo relativo a la tensión máxima de cada fila. Lanza
+    AssertionError si supera rtol.
+
+    Con filas (índices) solo se comprueban esas filas, útil en barridos de
+    miles de variantes donde OpenSees es el paso lento.
+    """
+    eps, p, _ = _preparar(nombre, deformaciones, parametros)
+    if filas is not None:
+        eps = eps[filas]
+        p = {q: v[filas] for q, v in p.items()}
+    rapido = respuesta_material(nombre, eps, **p)
+    referencia = respuesta_material_opensees(nombre, eps, **p)
+
+    escala = np.max(np.abs(referencia), axis=1)
+    escala[escala == 0] = 1.0
+    error = np.max(np.max(np.abs(rapido - referencia), axis=1)/escala)
+    if not error <= rtol:
+        raise AssertionError(f"{nombre} vectorizado no coincide con OpenSees: error {error:.3e}")
+    return error
+
+
+def comprobar_materiales(pasos=400, N=6, semilla=1, rtol=1e-8):
+    """
+    Comprueba todos los materiales contra OpenSees en historias de
+    deformación aleatorias (paseos aleatorios de N filas), con los casos
+    de los scripts 1GDL-NL_CtrlF_*.py y los de daño combinado de Hysteretic
+    (damage1, damage2 y beta a la vez, que degradan la envolvente hasta
+    anularla). Lanza AssertionError si algún caso supera rtol.
+
+    Devuelve:
+        diccionario con el error máximo de cada caso
+    """
+    rng = np.random.default_rng(semilla)
+    paseo = lambda escala: np.cumsum(rng.normal(size=(N, pasos))*escala, axis=1)
+    trilineal = dict(mom1p=300.0, rot1p=0.002, mom2p=300.0, rot2p=0.004, mom3p=300.0, rot3p=0.006,
+                     mom1n=-300.0, rot1n=-0.002, mom2n=-300.0, rot2n=-0.004, mom3n=-300.0, rot3n=-0.006)
+    casos = {
+        'Steel01': ('Steel01', 8e-4, dict(Fy=275.0, E0=2e5, b=0.01, a1=0.01, a2=1.0, a3=0.01, a4=1.0)),
+        'Steel02': ('Steel02', 8e-4, dict(Fy=275.0, E0=2e5, b=0.01, R0=12.0, cR1=0.925, cR2=0.15)),
+        'Hysteretic': ('Hysteretic', 8e-4, dict(trilineal, pinchX=0.6, pinchY=0.2)),
+        'Hysteretic daño': ('Hysteretic', 8e-4, dict(trilineal, pinchX=0.5, pinchY=0.2,
+                                                      damage1=0.01, damage2=0.01, beta=0.3)),
+        'Concrete01': ('Concrete01', 4e-4, dict(fpc=-30.0, epsc0=-0.002, fpcu=-6.0, epscu=-0.01)),
+        'Concrete02': ('Concrete02', 4e-4, dict(fpc=-30.0, epsc0=-0.002, fpcu=-6.0, epscu=-0.01,
+                                               rat=0.1, ft=3.0, Ets=1500.0)),
+    }
+    errores = {}
+    for caso, (nombre, escala, parametros) in casos.items():
+        errores[caso] = comprobar_material(nombre, paseo(escala), rtol=rtol, **parametros)
+    return errores
@@ -0,0 +1,300 @@
+import os
+import re
+import tempfile
+
+import numpy as np
+import scipy.sparse as sp
+import openseespy.opensees as ops
+
+# Grupos de gdl que fija rigidDiaphragm según la dirección perpendicular al plano
+_DIAFRAGMAS = {(1, 2, 6): 3, (1, 3, 5): 2, (2, 3, 4): 1}
+
+
+def mapa_gdl():
+    """
+    Numera todos los grados de libertad del dominio en el orden de
+    getNodeTags() (nudo a nudo, gdl 1..ndf).
+
+    Devuelve:
+        mapa   : np.ndarray (n, 2) de enteros con (nudo, gdl) de cada índice
+        inicio : diccionario nudo -> índice de su primer gdl
+    """
+    nodos = ops.getNodeTags()
+    ndf = np.array([len(ops.nodeDisp(tag)) for tag in nodos], dtype=int)
+    primero = np.concatenate(([0], np.cumsum(ndf)[:-1]))
+    mapa = np.column_stack((np.repeat(nodos, ndf),
+                            np.arange(ndf.sum()) - np.repeat(primero, ndf) + 1))
+    inicio = dict(zip(nodos, primero.tolist()))
+    return mapa, inicio
+
+
+def _matriz_basica_local(L, nb):
+    # Transformación 'Linear' de desplazamientos locales a deformaciones básicas
+    # (LinearCrdTransf2d/3d): 3D [N, Mz_i, Mz_j, My_i, My_j, T], 2D [N, M_i, M_j]
+    n = L.size
+    uL = 1.0/L
+    if nb == 6:
+        A = np.zeros((n, 6, 12))
+        A[:, 0, 0], A[:, 0, 6] = -1.0, 1.0
+        A[:, 1, 5], A[:, 2, 11] = 1.0, 1.0
+        A[:, 1:3, 1], A[:, 1:3, 7] = uL[:, None], -uL[:, None]
+        A[:, 3, 4], A[:, 4, 10] = 1.0, 1.0
+        A[:, 3:5, 2], A[:, 3:5, 8] = -uL[:, None], uL[:, None]
+        A[:, 5, 9], A[:, 5, 3] = 1.0, -1.0
+    else:
+        A = np.zeros((n, 3, 6))
+        A[:, 0, 0], A[:, 0, 3] = -1.0, 1.0
+        A[:, 1, 2], A[:, 2, 5] = 1.0, 1.0
+        A[:, 1:3, 1], A[:, 1:3, 4] = uL[:, None], -uL[:, None]
+    return A
+
+
+def _transformaciones_geometricas():
+    # Tipo de geomTransf de cada elemento y si tiene desplazamientos de nudo
+    # (-jntOffset), leídos de printModel('-JSON'): OpenSees no tiene otro
+    # comando que devuelva la transformación de un elemento
+    fd, ruta = tempfile.mkstemp(suffix='.json')
+    os.close(fd)
+    try:
+        ops.printModel('-JSON', '-file', ruta)
+        with open(ruta) as f:
+            texto = f.read()
+    finally:
+        os.remove(ruta)
+
+    tipos = {}
+    for tag, tipo, resto in re.findall(r'\{"name": "(\d+)", "type": "(\w+CrdTransf\w*)"(.*)\}', texto):
+        desplazamientos = re.findall(r'"[ij]Offset": \[([^\]]*)\]', resto)
+        con_offset = any(float(x) != 0.0 for v in desplazamientos for x in v.split(','))
+        tipos[tag] = (tipo, con_offset)
+    return {int(ele): tipos.get(tag) for ele, tag in
+            re.findall(r'\{"name": (\d+), .*"crdTransformation": "(\d+)"', texto)}
+
+
+def transformaciones_elementos(inicio, elementos=None):
+    """
+    Rigidez básica y transformación a gdl globales de los elementos
+    viga-columna de dos nudos con transformación 'Linear', agrupados por
+    tamaño del sistema básico (nb = 6 en 3D: [N, Mz_i, Mz_j, My_i, My_j, T];
+    nb = 3 en 2D: [N, M_i, M_j]). Las fuerzas básicas de un elemento con
+    desplazamientos globales u_e son q = kb @ Ag @ u_e y su rigidez global
+    Ag' @ kb @ Ag. Los elementos de otros tipos, o con transformación
+    'PDelta' o 'Corotational' o con desplazamientos de nudo (-jntOffset),
+    producen un ValueError.
+
+    Parámetros:
+        inicio    : diccionario nudo -> índice de su primer gdl (mapa_gdl())
+        elementos : tags de los elementos (por defecto todos)
+
+    Devuelve:
+        lista de diccionarios (uno por nb) con 'tags' (ne,), 'gdl' (ne, 2*nb)
+        índices globales de los gdl de los dos nudos, 'Ag' (ne, nb, 2*nb) y
+        'kb' (ne, nb, nb)
+    """
+    transformacion = _transformaciones_geometricas()
+    grupos = {}
+    for tag in (ops.getEleTags() if elementos is None else elementos):
+        nodos = ops.eleNodes(tag)
+        kb = ops.basicStiffness(tag)
+        nb = int(round(len(kb)**0.5))
+        if len(nodos) != 2 or nb not in (3, 6) or nb*nb != len(kb):
+            raise ValueError(f"Elemento {tag} ({ops.eleType(tag)}): solo se admiten elementos "
+                             "viga-columna de dos nudos con transformación 'Linear'")
+        tipo, con_offset = transformacion.get(tag) or (None, False)
+        if tipo not in ('LinearCrdTransf2d', 'LinearCrdTransf3d') or con_offset:
+            raise ValueError(f"Elemento {tag} ({ops.eleType(tag)}): transformación "
+                             f"{tipo or 'desconocida'}{' con -jntOffset' if con_offset else ''}; "
+                             "solo se admite 'Linear' sin desplazamientos de nudo")
+        if nb == 6:
+            ejes = ops.eleResponse(tag, 'xaxis') + ops.eleResponse(tag, 'yaxis') + ops.eleResponse(tag, 'zaxis')
+        else:
+            ejes = []
+        g = grupos.setdefault(nb, {'tags': [], 'nodos': [], 'kb': [], 'ejes': []})
+        g['tags'].append(tag)
+        g['nodos'].append(nodos)
+        g['kb'].append(kb)
+        g['ejes'].append(ejes)
+
+    transformaciones = []
+    for nb, g in grupos.items():
+        nodos = np.array(g['nodos'])
+        kb = np.array(g['kb']).reshape(-1, nb, nb)
+        xi = np.array([ops.nodeCoord(int(t)) for t in nodos[:, 0]])
+        xj = np.array([ops.nodeCoord(int(t)) for t in nodos[:, 1]])
+        L = np.linalg.norm(xj - xi, axis=1)
+        A = _matriz_basica_local(L, nb)
+
+        # Rotación de coordenadas globales a locales en cada nudo
+        ne = 2*nb
+        R = np.zeros((len(L), ne, ne))
+        if nb == 6:
+            r = np.array(g['ejes']).reshape(-1, 3, 3)
+            for k in range(4):
+                R[:, 3*k:3*k+3, 3*k:3*k+3] = r
+        else:
+            c = (xj - xi)/L[:, None]
+            r = np.stack((c, np.column_stack((-c[:, 1], c[:, 0]))), axis=1)
+            for k in (0, 3):
+                R[:, k:k+2, k:k+2] = r
+            R[:, 2, 2] = R[:, 5, 5] = 1.0
+
+        ndf = nb
+        gdl = np.concatenate([np.array([inicio[int(t)] for t in nodos[:, k]])[:, None] + np.arange(ndf)
+                              for k in range(2)], axis=1)
+        transformaciones.append({'tags': np.array(g['tags']), 'gdl': gdl, 'Ag': A @ R, 'kb': kb})
+    return transformaciones
+
+
+def _rigidez_elementos(inicio):
+    # Matrices 12x12 (o 6x6 en 2D) globales de los elementos viga-columna
+    filas, columnas, valores = [], [], []
+    for g in transformaciones_elementos(inicio):
+        Ag, gdl = g['Ag'], g['gdl']
+        Ke = np.einsum('eba,ebc,ecd->ead', Ag, g['kb'], Ag)
+        filas.append(np.broadcast_to(gdl[:, :, None], Ke.shape).ravel())
+        columnas.append(np.broadcast_to(gdl[:, None, :], Ke.shape).ravel())
+        valores.append(Ke.ravel())
+
+    if not valores:
+        return np.zeros(0, dtype=int), np.zeros(0, dtype=int), np.zeros(0)
+    return np.concatenate(filas), np.concatenate(columnas), np.concatenate(valores)
+
+
+def _transformacion_restricciones(mapa, inicio):
+    # Matriz T (n_total x n_libres) con u_total = T @ u_libres: elimina los gdl
+    # empotrados (fix) y expresa los gdl esclavos de equalDOF/rigidDiaphragm en
+    # función de los del nudo maestro.
+    n = len(mapa)
+    eliminado = np.zeros(n, dtype=bool)
+    for tag in set(ops.getFixedNodes()):
+        for dof in ops.getFixedDOFs(tag):
+            eliminado[inicio[tag] + dof - 1] = True
+
+    esclavos = []
+    maestros = ops.getRetainedNodes()
+    for c in set(ops.getConstrainedNodes()):
+        for r in maestros:
+            dofs = ops.getConstrainedDOFs(c, r)
+            if dofs:
+                esclavos.append((c, r, [int(d) for d in dofs]))
+                for dof in dofs:
+                    eliminado[inicio[c] + dof - 1] = True
+
+    libres = np.flatnonzero(~eliminado)
+    indice = -np.ones(n, dtype=int)
+    indice[libres] = np.arange(libres.size)
+
+    filas = list(libres)
+    columnas = list(range(libres.size))
+    valores = [1.0]*libres.size
+    for c, r, dofs in esclavos:
+        perp = _DIAFRAGMAS.get(tuple(sorted(dofs)))
+        dx = np.subtract(ops.nodeCoord(c), ops.nodeCoord(r))
+        if perp is not None and np.any(np.delete(dx, perp - 1) != 0):
+            # rigidDiaphragm: u_c = u_r - theta*(b - b_r), v_c = v_r + theta*(a - a_r)
+            a, b = [d for d in (0, 1, 2) if d != perp - 1]
+            giro = perp + 3
+            coef = {a + 1: [(a + 1, 1.0), (giro, -dx[b])],
+                    b + 1: [(b + 1, 1.0), (giro, dx[a])],
+                    giro: [(giro, 1.0)]}
+        else:
+            coef = {dof: [(dof, 1.0)] for dof in dofs}
+        for dof in dofs:
+            for dof_r, valor in coef[dof]:
+                j = indice[inicio[r] + dof_r - 1]
+                if j >= 0 and valor != 0:
+                    filas.append(inicio[c] + dof - 1)
+                    columnas.append(j)
+                    valores.append(valor)
+
+    T = sp.csr_matrix((valores, (filas, columnas)), shape=(n, libres.size))
+    return T, libres
+
+
+def extraer_matrices(alphaM=0.0, betaK=0.0, reducir=True):
+    """
+    Ensambla las matrices de rigidez, masa y amortiguamiento del modelo
+    definido en OpenSees como matrices dispersas de scipy.sparse (CSR), sin
+    pasar por system('FullGeneral') y printA (que construye una matriz densa
+    de n x n y deja de ser viable a partir de unos pocos miles de gdl).
+
+    OpenSees no expone las matrices de los elementos, de modo que K se
+    ensambla a partir de basicStiffness(tag) de cada viga-columna (rigidez
+    tangente actual en coordenadas básicas) con la transformación 'Linear' y
+    los ejes locales del elemento; los elementos de otros tipos producen un
+    ValueError. M es la matriz diagonal de las masas nodales (nodeMass) y
+    C = alphaM*M + betaK*K (amortiguamiento de Rayleigh).
+
+    Con reducir=True se eliminan los gdl de fix() y los gdl esclavos de
+    equalDOF/rigidDiaphragm (K_r = T' K T), como hace constraints
+    'Transformation'; con reducir=False se devuelven las matrices de todos
+    los gdl del dominio.
+
+    Devuelve:
+        matrices : diccionario con
+            'K', 'M', 'C' : scipy.sparse.csr_matrix (n, n)
+            'mapa'        : np.ndarray (n, 2) con (nudo, gdl) de cada fila
+            'T'           : (solo con reducir=True) scipy.sparse.csr_matrix
+                            (n_total, n) con u_total = T @ u, en el orden de
+                            mapa_gdl()
+    """
+    mapa, inicio = mapa_gdl()
+    n = len(mapa)
+
+    filas, columnas, valores = _rigidez_elementos(inicio)
+    K = sp.coo_matrix((valores, (filas, columnas)), shape=(n, n)).tocsr()
+
+    masas = np.zeros(n)
+    for tag, i0 in inicio.items():
+        m = ops.nodeMass(tag)
+        masas[i0:i0 + len(m)] = m
+    M = sp.diags(masas, format='csr')
+
+    if reducir:
+        T, libres = _transformacion_restricciones(mapa, inicio)
+        K = (T.T @ K @ T).tocsr()
+        M = (T.T @ M @ T).tocsr()
+        mapa = mapa[libres]
+
+    C = (alphaM*M + betaK*K).tocsr()
+    matrices = {'K': K, 'M': M, 'C': C, 'mapa': mapa}
+    if reducir:
+        matrices['T'] = T
+    return matrices
+
+
+def guardar_matrices_npz(ruta, matrices):
+    """
+    Guarda en un único archivo .npz comprimido las matrices dispersas (en
+    formato CSR: data, indices, indptr y shape de cada una) y el mapa de gdl
+    devueltos por extraer_matrices().
+    """
+    arrays = {}
+    for nombre, valor in matrices.items():
+        if sp.issparse(valor):
+            valor = valor.tocsr()
+            arrays[nombre + '_data'] = valor.data
+            arrays[nombre + '_indices'] = valor.indices
+            arrays[nombre + '_indptr'] = valor.indptr
+            arrays[nombre + '_shape'] = np.array(valor.shape)
+        else:
+            arrays[nombre] = np.asarray(valor)
+    np.savez_compressed(ruta, **arrays)
+
+
+def cargar_matrices_npz(ruta):
+    """
+    Lee un archivo escrito por guardar_matrices_npz() y devuelve el mismo
+    diccionario de matrices CSR y arrays.
+    """
+    matrices = {}
+    with np.load(ruta) as datos:
+        for clave in datos.files:
+            if clave.endswith('_data'):
+                nombre = clave[:-5]
+                matrices[nombre] = sp.csr_matrix(
+                    (datos[clave], datos[nombre + '_indices'], datos[nombre + '_indptr']),
+                    shape=tuple(datos[nombre + '_shape']))
+            elif not clave.endswith(('_indices', '_indptr', '_shape')):
+                matrices[clave] = datos[clave]
+    return matrices
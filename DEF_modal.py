@@ -0,0 +1,426 @@
+import os
+import sys
+import time
+import hashlib
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import openseespy.opensees as ops
+from scipy.sparse.linalg import eigsh, splu, LinearOperator
+
+from DEF_matrices_dispersas import mapa_gdl, extraer_matrices
+from DEF_portico3d import generar_portico, definir_portico, construir_portico_ejemplo
+
+# Carpeta por defecto para la caché (.npz) de resultados modales
+DIR_CACHE_MODAL = os.environ.get('MODAL_CACHE_DIR',
+                                 os.path.join(os.path.expanduser('~'), '.cache', 'modal'))
+
+# Gdl libres hasta los que analisis_modal(solver='auto') usa el solver denso:
+# con los 264 gdl del pórtico de 52 elementos '-fullGenLapack' ya tarda 20
+# veces más que ARPACK (ver medir_solvers_modales())
+UMBRAL_DENSO = 50
+
+
+def huella_modelo():
+    """
+    Huella (SHA-1) del modelo definido en OpenSees, para reconocer un modelo
+    ya analizado. Entran, con todos sus bits:
+        - nudos: coordenadas, masas y desplazamientos actuales (el estado
+          tras la gravedad o un análisis previo cambia la rigidez tangente)
+        - gdl empotrados (fix) y restricciones equalDOF/rigidDiaphragm
+        - elementos: tipo, nudos y rigidez tangente en coordenadas básicas
+          (basicStiffness), que recoge materiales, secciones e integración
+    y, además, la descripción de printModel('-JSON') (transformaciones,
+    masas de elemento, ...), que OpenSees escribe con 6 cifras.
+
+    Devuelve:
+        huella : cadena hexadecimal
+    """
+    h = hashlib.sha1()
+    nodos = ops.getNodeTags()
+    h.update(np.asarray(nodos, dtype=np.int64).tobytes())
+    for nd in nodos:
+        for valores in (ops.nodeCoord(nd), ops.nodeMass(nd), ops.nodeDisp(nd)):
+            h.update(np.asarray(valores, dtype=float).tobytes())
+
+    fijos = sorted(set(ops.getFixedNodes()))
+    h.update(repr([(nd, ops.getFixedDOFs(nd)) for nd in fijos]).encode())
+    maestros = ops.getRetainedNodes()
+    h.update(repr([(c, r, ops.getConstrainedDOFs(c, r)) for c in sorted(set(ops.getConstrainedNodes()))
+                   for r in maestros]).encode())
+
+    for tag in ops.getEleTags():
+        h.update(repr((tag, ops.eleType(tag), ops.eleNodes(tag))).encode())
+        try:
+            h.update(np.asarray(ops.basicStiffness(tag), dtype=float).tobytes())
+        except ops.OpenSeesError:
+            pass
+
+    descriptor, ruta = tempfile.mkstemp(suffix='.json')
+    os.close(descriptor)
+    try:
+        ops.printModel('-JSON', '-file', ruta)
+        with open(ruta, 'rb') as f:
+            h.update(f.read())
+    finally:
+        os.remove(ruta)
+    return h.hexdigest()
+
+
+def _leer_cache(ruta):
+    try:
+        with np.load(ruta) as datos:
+            modal = {k: datos[k] for k in ('Lambda', 'autovectores', 'mapa')}
+            modal['solver'] = str(datos['solver'])
+            propiedades = {k[3:]: datos[k] for k in datos.files if k.startswith('MP_')}
+    except (OSError, ValueError, KeyError):
+        return None
+    modal['propiedades'] = propiedades or None
+    return modal
+
+
+def _escribir_cache(ruta, modal):
+    os.makedirs(os.path.dirname(ruta), exist_ok=True)
+    temporal = ruta + f'.{os.getpid()}.tmp.npz'
+    propiedades = {'MP_' + k: np.asarray(v) for k, v in (modal['propiedades'] or {}).items()}
+    np.savez(temporal, Lambda=modal['Lambda'], autovectores=modal['autovectores'], mapa=modal['mapa'],
+             solver=modal['solver'], **propiedades)
+    os.replace(temporal, ruta)
+
+
+def gdl_libres():
+    """
+    Número de ecuaciones del modelo con constraints 'Transformation': gdl de
+    todos los nudos menos los empotrados (fix) y los esclavos de
+    equalDOF/rigidDiaphragm.
+    """
+    n = sum(len(ops.nodeDisp(nd)) for nd in ops.getNodeTags())
+    n -= sum(len(ops.getFixedDOFs(nd)) for nd in set(ops.getFixedNodes()))
+    maestros = ops.getRetainedNodes()
+    n -= sum(len(ops.getConstrainedDOFs(c, r)) for c in set(ops.getConstrainedNodes()) for r in maestros)
+    return n
+
+
+def elegir_solver(n_modos, propiedades=False, umbral=UMBRAL_DENSO):
+    """
+    Solver de analisis_modal() según el tamaño del modelo:
+        '-fullGenLapack' : LAPACK denso de OpenSees (O(n³) en tiempo y O(n²)
+                           en memoria) si gdl_libres() <= umbral o si se
+                           piden casi tantos modos como gdl
+        '-genBandArpack' : ARPACK de OpenSees cuando se piden propiedades
+                           (modalProperties() lee los modos del dominio)
+        'scipy'          : ARPACK (Lanczos) en modo shift-invert sobre las
+                           matrices dispersas K y M en los demás casos
+    """
+    n = gdl_libres()
+    if n <= umbral or n_modos >= n - 1:
+        return '-fullGenLapack'
+    if propiedades:
+        return '-genBandArpack'
+    return 'scipy'
+
+
+def _modos_dispersos(n_modos, tol):
+    # Shift-invert alrededor de 0 (los modos de menor frecuencia) sobre las
+    # matrices reducidas; los autovectores se expanden a todos los gdl con T.
+    # K es simétrica: factorización LU con pivote en la diagonal y orden de
+    # mínimo grado de K + K' (la de eigsh por defecto, COLAMD con pivote
+    # parcial, multiplica por ~15 el relleno y por ~100 el tiempo)
+    matrices = extraer_matrices()
+    K = matrices['K'].tocsc()
+    lu = splu(K, permc_spec='MMD_AT_PLUS_A', diag_pivot_thresh=0.0, options={'SymmetricMode': True})
+    OPinv = LinearOperator(K.shape, matvec=lu.solve, dtype=float)
+    Lambda, phi = eigsh(K, k=n_modos, M=matrices['M'], sigma=0.0, which='LM', tol=tol, OPinv=OPinv)
+    orden = np.argsort(Lambda)
+    return Lambda[orden], (matrices['T'] @ phi[:, orden]).T
+
+
+def _resolver_modos(n_modos, solver, tol):
+    # Devuelve (Lambda, autovectores, mapa, solver usado)
+    mapa, inicio = mapa_gdl()
+    if solver == 'scipy':
+        try:
+            Lambda, autovectores = _modos_dispersos(n_modos, tol)
+            return Lambda, autovectores, mapa, solver
+        except ValueError:
+            # Elementos que extraer_matrices() no admite: ARPACK de OpenSees
+            solver = '-genBandArpack'
+    Lambda = ops.eigen(*([solver] if solver else []), int(n_modos))
+    autovectores = np.zeros((len(Lambda), len(mapa)))
+    for k in range(len(Lambda)):
+        for nd, i0 in inicio.items():
+            v = ops.nodeEigenvector(nd, k + 1)
+            autovectores[k, i0:i0 + len(v)] = v
+    return np.array(Lambda), autovectores, mapa, solver
+
+
+def analisis_modal(n_modos, solver='auto', tol=0.0, umbral=UMBRAL_DENSO, propiedades=False, cache=True,
+                   dir_cache=None):
+    """
+    eigen() (y, con propiedades=True, modalProperties()) con memoria en
+    disco: los resultados se guardan en dir_cache (por defecto
+    DIR_CACHE_MODAL, o la variable de entorno MODAL_CACHE_DIR) en un .npz
+    por huella_modelo(), solver y número de modos, de modo que volver a
+    ejecutar el mismo modelo no repite el cálculo y cualquier cambio del
+    modelo (nudos, masas, restricciones, rigideces, estado) da otra huella.
+
+    Cuando los resultados se toman de la caché, o se calculan con
+    solver='scipy', no se llama a eigen(), así que nodeEigenvector() y los
+    recorders 'eigen' no tienen datos: las formas modales se leen de
+    'autovectores' (ver forma_modal()).
+
+    Parámetros:
+        n_modos     : número de modos
+        solver      : 'auto' (ver elegir_solver()), 'scipy' (ARPACK
+                      shift-invert sobre K y M dispersas de
+                      DEF_matrices_dispersas.extraer_matrices(); si el modelo
+                      tiene elementos que no admite se usa '-genBandArpack')
+                      o una opción de eigen() ('-fullGenLapack',
+                      '-genBandArpack', ...; None -> la de OpenSees por
+                      defecto)
+        tol         : tolerancia relativa de los autovalores con 'scipy'
+                      (0 -> precisión de máquina)
+        umbral      : gdl libres hasta los que 'auto' usa el solver denso
+        propiedades : si se llama también a modalProperties('-return')
+                      (factores de participación, masas participantes, ...)
+
+    Devuelve:
+        diccionario con
+            'Lambda'       : autovalores (n_modos,)
+            'omega'        : frecuencias angulares (n_modos,)
+            'periodos'     : periodos (n_modos,)
+            'autovectores' : np.ndarray (n_modos, n_gdl) en el orden de 'mapa'
+            'mapa'         : (nudo, gdl) de cada columna (ver
+                             DEF_matrices_dispersas.mapa_gdl)
+            'propiedades'  : diccionario de modalProperties() o None
+            'solver'       : solver usado
+            'huella'       : huella_modelo()
+            'en_cache'     : True si los resultados vienen de la caché
+    """
+    if solver == 'auto':
+        solver = elegir_solver(n_modos, propiedades, umbral)
+    if solver == 'scipy' and propiedades:
+        raise ValueError("modalProperties() necesita los modos de eigen(): use un solver de OpenSees")
+
+    huella = huella_modelo()
+    ruta = None
+    modal = None
+    if cache:
+        if dir_cache is None:
+            dir_cache = DIR_CACHE_MODAL
+        clave = hashlib.sha1(repr((huella, solver, int(n_modos), float(tol) if solver == 'scipy' else None))
+                             .encode()).hexdigest()
+        ruta = os.path.join(dir_cache, clave + '.npz')
+        modal = _leer_cache(ruta)
+        if modal is not None and propiedades and modal['propiedades'] is None:
+            modal = None
+    en_cache = modal is not None
+
+    if modal is None:
+        Lambda, autovectores, mapa, usado = _resolver_modos(n_modos, solver, tol)
+        modal = {'Lambda': Lambda, 'autovectores': autovectores, 'mapa': mapa, 'solver': str(usado),
+                 'propiedades': None}
+        if propiedades:
+            modal['propiedades'] = {k: np.asarray(v) for k, v in ops.modalProperties('-return').items()}
+        if cache:
+            _escribir_cache(ruta, modal)
+
+    omega = np.sqrt(modal['Lambda'])
+    modal.update(omega=omega, periodos=2*np.pi/omega, huella=huella, en_cache=en_cache)
+    return modal
+
+
+def forma_modal(modal, nodos, modo, dof):
+    """
+    Componente dof del autovector 'modo' (desde 1) en cada nudo, como
+    nodeEigenvector(nudo, modo, dof), a partir de analisis_modal().
+
+    Devuelve:
+        np.ndarray (n_nudos,)
+    """
+    indice = {(int(nd), int(g)): i for i, (nd, g) in enumerate(modal['mapa'])}
+    return np.array([modal['autovectores'][modo - 1, indice[(int(nd), int(dof))]] for nd in nodos])
+
+
+# Tablas del informe de modalProperties() después de los autovalores:
+# (título, comentario, clave de las propiedades, por modos)
+_TABLAS_INFORME = (
+    ('TOTAL MASS OF THE STRUCTURE', 'The total masses (translational and rotational) of the structure\n'
+     '# including the masses at fixed DOFs (if any).', 'totalMass', False),
+    ('TOTAL FREE MASS OF THE STRUCTURE', 'The total masses (translational and rotational) of the structure\n'
+     '# including only the masses at free DOFs.', 'totalFreeMass', False),
+    ('CENTER OF MASS', 'The center of mass of the structure, calculated from free masses.', 'centerOfMass', False),
+    ('MODAL PARTICIPATION FACTORS', "The participation factor for a certain mode 'a' in a certain direction 'i'\n"
+     '# indicates how strongly displacement along (or rotation about)\n'
+     '# the global axes is represented in the eigenvector of that mode.', 'partiFactor', True),
+    ('MODAL PARTICIPATION MASSES', 'The modal participation masses for each mode.', 'partiMass', True),
+    ('MODAL PARTICIPATION MASSES (cumulative)', 'The cumulative modal participation masses for each mode.',
+     'partiMassesCumu', True),
+    ('MODAL PARTICIPATION MASS RATIOS (%)', 'The modal participation mass ratios (%) for each mode.',
+     'partiMassRatios', True),
+    ('MODAL PARTICIPATION MASS RATIOS (%) (cumulative)',
+     'The cumulative modal participation mass ratios (%) for each mode.', 'partiMassRatiosCumu', True),
+)
+
+
+def _tabla_informe(f, columnas, filas, modos=False):
+    # Primera columna de 15 caracteres y las demás de 14, como en el informe
+    # de OpenSees
+    if modos:
+        columnas = ['MODE'] + list(columnas)
+    f.write('#' + ''.join(f'{c:>14s}' for c in columnas) + '\n')
+    f.write('# ' + ' '.join(['-'*13]*len(columnas)) + '\n')
+    for k, fila in enumerate(filas):
+        linea = (f'{k + 1:14d}' if modos else '') + ''.join(f'{v:14.6g}' for v in fila)
+        f.write(' ' + linea + '\n')
+    f.write('\n\n')
+
+
+def escribir_propiedades_modales(propiedades, ruta):
+    """
+    Escribe el informe de modalProperties('-file', ruta) a partir del
+    diccionario 'propiedades' de analisis_modal(), de modo que también se
+    obtiene cuando los modos vienen de la caché. Los valores menores que
+    1e-10 veces el mayor de su columna (ruido numérico) se escriben como 0.
+    """
+    direcciones = [d for d in ('MX', 'MY', 'MZ', 'RMX', 'RMY', 'RMZ') if 'partiFactor' + d in propiedades]
+    autovalores = np.column_stack([propiedades[c] for c in ('eigenLambda', 'eigenOmega', 'eigenFrequency',
+                                                            'eigenPeriod')])
+
+    os.makedirs(os.path.dirname(ruta) or '.', exist_ok=True)
+    with open(ruta, 'w') as f:
+        f.write('# MODAL ANALYSIS REPORT\n\n')
+        f.write('* 1. DOMAIN SIZE:\n# This is the size of the problem: 1 for 1D problems, '
+                '2 for 2D problems, 3 for 3D problems.\n')
+        f.write(f"{int(np.ravel(propiedades['domainSize'])[0])}\n\n\n")
+        f.write('* 2. EIGENVALUE ANALYSIS:\n')
+        _tabla_informe(f, ('LAMBDA', 'OMEGA', 'FREQUENCY', 'PERIOD'), autovalores, modos=True)
+
+        for numero, (titulo, texto, clave, por_modos) in enumerate(_TABLAS_INFORME, start=3):
+            f.write(f'* {numero}. {titulo}:\n# {texto}\n')
+            if por_modos:
+                tabla = np.column_stack([propiedades[clave + d] for d in direcciones])
+                tabla[np.abs(tabla) < 1e-10*np.max(np.abs(tabla), axis=0)] = 0.0
+                _tabla_informe(f, direcciones, tabla, modos=True)
+            elif clave == 'centerOfMass':
+                centro = np.ravel(propiedades[clave])
+                _tabla_informe(f, ('X', 'Y', 'Z')[:centro.size], [centro])
+            else:
+                _tabla_informe(f, direcciones, [np.ravel(propiedades[clave])])
+
+
+# ---------------------------------------------------------------------------
+# Banco de pruebas de los solvers
+# ---------------------------------------------------------------------------
+
+def modelo_1gdl(T=1.0, M=1.0):
+    """
+    Oscilador de 1-GDL de los scripts de espectros (zeroLength con material
+    'Elastic' y masa M en el nudo 2).
+    """
+    ops.wipe()
+    ops.model('basic', '-ndm', 1, '-ndf', 1)
+    ops.uniaxialMaterial('Elastic', 1, M*(2*np.pi/T)**2)
+    ops.node(1, 0.0)
+    ops.node(2, 0.0, '-mass', M)
+    ops.fix(1, 1)
+    ops.element('zeroLength', 1, 1, 2, '-mat', 1, '-dir', 1)
+
+
+def modelo_portico_elastico(vanos=1, plantas=2, divisiones=1):
+    """
+    Pórtico 3D regular de generar_portico() con vanos x vanos vanos,
+    'plantas' plantas y 'divisiones' elementos por columna y por viga, con
+    sección elástica de IPE200 (forceBeamColumn) y masa unitaria en X e Y
+    en cada nudo de forjado. Con (6, 10, 2) tiene unos 10 000 gdl libres y
+    con (10, 20, 3) unos 100 000.
+    """
+    ops.wipe()
+    ops.model('basic', '-ndm', 3, '-ndf', 6)
+    E = 2e5
+    ops.section('Elastic', 1, E, 2848.0, 19.43e6, 1.424e6, E/2.6, 69.8e3)
+    ops.geomTransf('Linear', 1, 0, 0, 1)
+    ops.geomTransf('Linear', 2, 1, 0, 0)
+    ops.beamIntegration('Lobatto', 1, 1, 3)
+    portico = generar_portico(vanos, vanos, plantas, div_columna=divisiones, div_viga_x=divisiones,
+                              div_viga_y=divisiones, masa_nudo=[1, 1, 0, 0, 0, 0])
+    definir_portico(portico)
+
+
+# Modelos de medir_solvers_modales(): nombre -> (función, argumentos)
+MODELOS_BANCO = {
+    '1 GDL': (modelo_1gdl, {}),
+    '52 elementos': (construir_portico_ejemplo, {}),
+    '2k gdl': (modelo_portico_elastico, {'vanos': 3, 'plantas': 5, 'divisiones': 2}),
+    '10k gdl': (modelo_portico_elastico, {'vanos': 6, 'plantas': 10, 'divisiones': 2}),
+    '100k gdl': (modelo_portico_elastico, {'vanos': 10, 'plantas': 20, 'divisiones': 3}),
+}
+
+SOLVERS_BANCO = ('-fullGenLapack', '-genBandArpack', 'scipy')
+
+
+def _memoria_pico():
+    # Pico de memoria residente del proceso [MB] (NaN si no se puede medir)
+    try:
+        import resource
+    except ImportError:
+        return np.nan
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return pico/2**20 if sys.platform == 'darwin' else pico/2**10
+
+
+def _medir_solver(construir_modelo, argumentos, solver, n_modos, tol, n_max_denso):
+    construir_modelo(**argumentos)
+    n = gdl_libres()
+    medida = {'gdl': n, 'tiempo': np.nan, 'memoria': np.nan, 'T1': np.nan}
+    # ARPACK necesita menos modos que gdl; el solver denso, memoria para n x n
+    if (solver != '-fullGenLapack' and n_modos >= n - 1) or (solver == '-fullGenLapack' and n > n_max_denso):
+        return medida
+    base = _memoria_pico()
+    tic = time.perf_counter()
+    Lambda, _, _, _ = _resolver_modos(n_modos, solver, tol)
+    medida['tiempo'] = time.perf_counter() - tic
+    medida['memoria'] = _memoria_pico() - base
+    medida['T1'] = 2*np.pi/np.sqrt(Lambda[0])
+    ops.wipe()
+    return medida
+
+
+def medir_solvers_modales(modelos=None, solvers=SOLVERS_BANCO, n_modos=6, tol=0.0, n_max_denso=4000):
+    """
+    Compara el tiempo y la memoria de los solvers de autovalores en modelos
+    de tamaño creciente (por defecto MODELOS_BANCO: 1 GDL, el pórtico de
+    52 elementos y pórticos generados de 2k, 10k y 100k gdl). Cada medida
+    se hace en un proceso nuevo, para que el pico de memoria residente sea
+    el de ese solver: 'memoria' es lo que crece el pico durante el cálculo
+    de los modos (NaN en sistemas sin el módulo resource).
+
+    El solver denso se omite por encima de n_max_denso gdl (ocuparía
+    8*n² bytes por matriz) y los de ARPACK cuando se piden casi tantos modos
+    como gdl; sus medidas quedan en NaN. Para el modelo de 1 GDL se pide un
+    solo modo.
+
+    Devuelve:
+        lista de diccionarios con 'modelo', 'solver', 'gdl', 'tiempo' [s],
+        'memoria' [MB] y 'T1' (periodo fundamental)
+
+    Nota: en Windows los procesos se crean con 'spawn', por lo que el script
+    que llama a esta función debe protegerse con if __name__ == '__main__':
+    """
+    if modelos is None:
+        modelos = MODELOS_BANCO
+    resultados = []
+    print("{:14s} {:>8s} {:16s} {:>10s} {:>10s} {:>10s}".format(
+        'modelo', 'gdl', 'solver', 'tiempo [s]', 'memoria', 'T1 [s]'))
+    for nombre, (construir_modelo, argumentos) in modelos.items():
+        for solver in solvers:
+            k = 1 if nombre == '1 GDL' else n_modos
+            with ProcessPoolExecutor(max_workers=1) as pool:
+                medida = pool.submit(_medir_solver, construir_modelo, argumentos, solver, k, tol,
+                                     n_max_denso).result()
+            medida.update(modelo=nombre, solver=solver)
+            resultados.append(medida)
+            print("{:14s} {:8d} {:16s} {:10.4f} {:8.1f}MB {:10.5f}".format(
+                nombre, medida['gdl'], solver, medida['tiempo'], medida['memoria'], medida['T1']))
+    return resultados
@@ -0,0 +1,217 @@
+import os
+import sys
+import hashlib
+import functools
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import openseespy.opensees as ops
+
+from DEF_secciones_fibras import momento_curvatura
+
+# Carpeta por defecto para la caché (.npz) de los diagramas momento-curvatura
+DIR_CACHE_MC = os.environ.get('MC_CACHE_DIR',
+                              os.path.join(os.path.expanduser('~'), '.cache', 'momento_curvatura'))
+
+
+# Comandos de OpenSees que definen los materiales de las fibras
+_COMANDOS_MATERIALES = ('uniaxialMaterial', 'nDMaterial')
+
+
+def _llamadas_materiales(f):
+    # Argumentos de los comandos de material que ejecuta f(). Se ejecuta con
+    # esos comandos sustituidos por un registro (en openseespy.opensees y en
+    # los módulos que los importan por nombre), sin tocar el dominio.
+    funcion = f
+    while isinstance(funcion, functools.partial):
+        funcion = funcion.func
+    espacios = [vars(m) for m in list(sys.modules.values()) if hasattr(m, '__dict__')]
+    if hasattr(funcion, '__globals__'):
+        espacios.append(funcion.__globals__)
+
+    llamadas = []
+    def registro(nombre):
+        return lambda *args: llamadas.append((nombre,) + args)
+
+    originales = {nombre: getattr(ops, nombre) for nombre in _COMANDOS_MATERIALES}
+    sustituidos = []
+    for espacio in espacios:
+        for nombre, original in originales.items():
+            if espacio.get(nombre) is original:
+                sustituidos.append((espacio, nombre, original))
+                espacio[nombre] = registro(nombre)
+    try:
+        f()
+    finally:
+        for espacio, nombre, original in sustituidos:
+            espacio[nombre] = original
+    return llamadas
+
+
+def _huella_codigo(f):
+    # Sustituto de _llamadas_materiales() cuando f no usa los comandos de
+    # openseespy.opensees directamente: código, constantes, valores por
+    # defecto y variables capturadas de la función
+    if isinstance(f, functools.partial):
+        return (_huella_codigo(f.func), f.args, sorted(f.keywords.items()))
+    codigo = f.__code__
+
+    def constantes(codigo):
+        return tuple(constantes(c) if hasattr(c, 'co_code') else c for c in codigo.co_consts) + (codigo.co_code,)
+
+    celdas = tuple(c.cell_contents for c in f.__closure__ or ())
+    return (f'{f.__module__}.{f.__qualname__}', constantes(codigo), f.__defaults__,
+            f.__kwdefaults__, celdas)
+
+
+def huella_materiales(definir_materiales=None):
+    """
+    Representación de los materiales que define definir_materiales() (por
+    defecto DEF_portico3d.definir_materiales_acero): la lista de comandos
+    uniaxialMaterial/nDMaterial con sus argumentos, capturada ejecutando la
+    función sin modificar el dominio de OpenSees. Si no se captura ningún
+    comando (la función no llama a los de openseespy.opensees), se usa el
+    código, las constantes y las variables capturadas de la función.
+    """
+    if definir_materiales is None:
+        from DEF_portico3d import definir_materiales_acero
+        definir_materiales = definir_materiales_acero
+    llamadas = _llamadas_materiales(definir_materiales)
+    if llamadas:
+        return repr(llamadas)
+    return repr(_huella_codigo(definir_materiales))
+
+
+def huella_seccion(fibras, curvatura_max, eje='y', npasos=100, GJ=1e12, definir_materiales=None):
+    """
+    Huella (sha1) de todo lo que determina un diagrama momento-curvatura
+    salvo el axil: fibras, materiales (ver huella_materiales()), eje,
+    curvatura máxima, nº de pasos y GJ.
+    """
+    h = hashlib.sha1(np.ascontiguousarray(fibras, dtype=float).tobytes())
+    h.update(repr((huella_materiales(definir_materiales), eje, float(curvatura_max), int(npasos),
+                   float(GJ))).encode())
+    return h.hexdigest()
+
+
+# Datos comunes de cada proceso de trabajo: la sección se envía una sola vez
+# al arrancar el proceso y no con cada bloque de axiles.
+_datos_trabajador = {}
+
+
+def _iniciar_trabajador(fibras, opciones):
+    _datos_trabajador['fibras'] = fibras
+    _datos_trabajador['opciones'] = opciones
+
+
+def _barrer_axiles(axiles_bloque):
+    # Cada proceso tiene su propio intérprete y, por tanto, su propio dominio de OpenSees
+    fibras = _datos_trabajador['fibras']
+    opciones = _datos_trabajador['opciones']
+    return np.array([momento_curvatura(fibras, P=P, **opciones)[1] for P in axiles_bloque])
+
+
+def _leer_cache(ruta):
+    try:
+        with np.load(ruta) as datos:
+            return dict(zip(datos['axiles'].tolist(), datos['momentos']))
+    except (OSError, ValueError, KeyError):
+        return {}
+
+
+def _escribir_cache(ruta, curvas):
+    os.makedirs(os.path.dirname(ruta), exist_ok=True)
+    axiles = np.array(sorted(curvas))
+    temporal = ruta + f'.{os.getpid()}.tmp.npz'
+    np.savez(temporal, axiles=axiles, momentos=np.array([curvas[P] for P in axiles.tolist()]))
+    os.replace(temporal, ruta)
+
+
+def curvas_momento_curvatura(fibras, axiles, curvatura_max, eje='y', npasos=100, GJ=1e12,
+                             definir_materiales=None, nproc=None, cache=True, dir_cache=None):
+    """
+    Diagramas momento-curvatura de una sección de fibras para un vector de
+    axiles, repartiendo los axiles entre procesos de trabajo (cada uno con
+    su propio dominio de OpenSees, ver momento_curvatura()).
+
+    Con cache=True los diagramas se guardan en dir_cache (por defecto
+    DIR_CACHE_MC, o la variable de entorno MC_CACHE_DIR) en un .npz por
+    huella de sección (huella_seccion()); solo se calculan los axiles que no
+    estén ya en la caché y los nuevos se añaden a ella.
+
+    Parámetros:
+        fibras             : np.ndarray (n, 4) de DEF_secciones_fibras
+        axiles             : axiles P [N], negativos en compresión
+        curvatura_max      : curvatura final [1/mm]
+        eje                : 'y' (flexión en el canto) o 'z'
+        definir_materiales : función (o functools.partial) que define los
+                             uniaxialMaterial de las fibras; debe poder
+                             importarse desde los procesos de trabajo
+        nproc              : número de procesos (None -> os.cpu_count();
+                             1 -> cálculo en serie en este intérprete)
+
+    Devuelve:
+        diccionario con 'axiles' (nP,), 'curvaturas' (npasos+1,),
+        'momentos' (nP, npasos+1), 'M_max' (nP,) y 'huella'
+
+    Nota: en Windows los procesos se crean con 'spawn', por lo que el script
+    que llama a esta función debe protegerse con if __name__ == '__main__':
+    """
+    axiles = np.atleast_1d(np.asarray(axiles, dtype=float))
+    fibras = np.asarray(fibras, dtype=float)
+    opciones = dict(curvatura_max=curvatura_max, eje=eje, npasos=npasos, GJ=GJ,
+                    definir_materiales=definir_materiales)
+    huella = huella_seccion(fibras, curvatura_max, eje, npasos, GJ, definir_materiales)
+
+    curvas = {}
+    ruta = None
+    if cache:
+        if dir_cache is None:
+            dir_cache = DIR_CACHE_MC
+        ruta = os.path.join(dir_cache, huella + '.npz')
+        curvas = _leer_cache(ruta)
+
+    pendientes = np.array([P for P in dict.fromkeys(axiles.tolist()) if P not in curvas])
+    if pendientes.size:
+        if nproc is None:
+            nproc = os.cpu_count() or 1
+        nproc = max(1, min(nproc, pendientes.size))
+        if nproc == 1:
+            _iniciar_trabajador(fibras, opciones)
+            nuevas = _barrer_axiles(pendientes)
+        else:
+            bloques = np.array_split(pendientes, nproc)
+            with ProcessPoolExecutor(max_workers=nproc, initializer=_iniciar_trabajador,
+                                     initargs=(fibras, opciones)) as pool:
+                nuevas = np.vstack(list(pool.map(_barrer_axiles, bloques)))
+        curvas.update(zip(pendientes.tolist(), nuevas))
+        if cache:
+            _escribir_cache(ruta, curvas)
+
+    momentos = np.array([curvas[P] for P in axiles.tolist()])
+    M_max = np.array([np.nanmax(np.abs(M)) if np.any(np.isfinite(M[1:])) else np.nan
+                      for M in momentos])
+
+    return {'axiles': axiles, 'curvaturas': np.linspace(0.0, curvatura_max, npasos + 1),
+            'momentos': momentos, 'M_max': M_max, 'huella': huella}
+
+
+def superficie_PM(fibras, axiles, curvatura_max, ejes=('y', 'z'), npasos=100, GJ=1e12,
+                  definir_materiales=None, nproc=None, cache=True, dir_cache=None):
+    """
+    Superficie de interacción axil-momento: momento máximo del diagrama
+    momento-curvatura para cada axil y cada eje de flexión. Los axiles que la
+    sección no resiste dan NaN.
+
+    Devuelve:
+        diccionario con 'axiles' (nP,) y, por cada eje, 'M' + eje (p.ej.
+        'My', 'Mz') con el momento máximo (nP,) y 'curvas_' + eje con el
+        resultado completo de curvas_momento_curvatura()
+    """
+    superficie = {'axiles': np.atleast_1d(np.asarray(axiles, dtype=float))}
+    for eje in ejes:
+        curvas = curvas_momento_curvatura(fibras, axiles, curvatura_max, eje, npasos, GJ,
+                                          definir_materiales, nproc, cache, dir_cache)
+        superficie['M' + eje] = curvas['M_max']
+        superficie['curvas_' + eje] = curvas
+    return superficie
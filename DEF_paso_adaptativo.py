@@ -0,0 +1,231 @@
+import time
+
+import numpy as np
+import openseespy.opensees as ops
+
+# Algoritmos que se prueban, por orden, cuando un paso no converge
+ALGORITMOS = (('Newton',), ('KrylovNewton',), ('NewtonLineSearch',), ('ModifiedNewton',))
+
+
+def crear_control(dt, dt_min=None, dt_max=None, algoritmos=ALGORITMOS, factor=2.0,
+                  crecer_tras=4, iter_faciles=None, al_converger=()):
+    """
+    Estado del control de paso adaptativo: paso de tiempo en un análisis
+    'Transient' o incremento de desplazamiento en un 'Static' con
+    DisplacementControl.
+
+    Cuando un paso no converge se repite con los siguientes algoritmos de
+    la lista y, si ninguno converge, se divide el paso por 'factor' (hasta
+    dt_min). Tras 'crecer_tras' pasos seguidos que convergen con el primer
+    algoritmo en iter_faciles iteraciones o menos, el paso se multiplica
+    por 'factor' (hasta dt_max).
+
+    Parámetros:
+        dt           : paso inicial
+        dt_min       : paso mínimo (por defecto dt/2**6)
+        dt_max       : paso máximo (por defecto dt; con analisis_interpolado()
+                       puede ser mayor que el paso de las salidas)
+        algoritmos   : tuplas de argumentos de algorithm(), en orden de uso
+        iter_faciles : iteraciones máximas de un paso "fácil" (por defecto 5)
+        al_converger : funciones sin argumentos que se llaman tras cada paso
+                       convergido, también los intermedios de un paso
+                       dividido (p.ej. DEF_energia.actualizar_energia)
+
+    Devuelve:
+        control : diccionario que se pasa a dar_paso(), avanzar_hasta() y
+                  resumen_control()
+    """
+    return {'dt': float(dt), 'dt_inicial': float(dt), 'dt_min': float(dt/2**6 if dt_min is None else dt_min),
+            'dt_max': float(dt if dt_max is None else dt_max), 'algoritmos': list(algoritmos),
+            'factor': float(factor), 'crecer_tras': int(crecer_tras),
+            'iter_faciles': 5 if iter_faciles is None else int(iter_faciles),
+            'algoritmo': None, 'faciles': 0, 'registro': [], 'tiempo': 0.0,
+            'al_converger': list(al_converger)}
+
+
+def _usar_algoritmo(control, k):
+    if control['algoritmo'] != k:
+        ops.algorithm(*control['algoritmos'][k])
+        control['algoritmo'] = k
+
+
+def dar_paso(control, analizar, h_max=None):
+    """
+    Un paso convergido con el control adaptativo (ver crear_control()).
+    analizar(h) debe dar un paso de tamaño h y devolver el código de
+    analyze(): ops.analyze(1, h) en un análisis transitorio, o fijar
+    integrator('DisplacementControl', ..., h) y llamar a ops.analyze(1) en
+    uno estático. El paso se anota en control['registro'] como (tiempo,
+    h, nº de algoritmo, iteraciones, intentos fallidos previos).
+
+    Devuelve:
+        h del paso convergido, o None si no converge ni con dt_min ni con
+        ninguno de los algoritmos (el dominio queda en el último paso
+        convergido)
+    """
+    tic = time.perf_counter()
+    if control['algoritmo'] is None:
+        _usar_algoritmo(control, 0)
+    h = control['dt'] if h_max is None else min(control['dt'], h_max)
+    intentos = 0
+    while True:
+        ok = -1
+        for k in range(len(control['algoritmos'])):
+            _usar_algoritmo(control, k)
+            ok = analizar(h)
+            if ok == 0:
+                break
+            intentos += 1
+        if ok == 0:
+            break
+        # Ningún algoritmo converge: se divide el paso
+        control['faciles'] = 0
+        if h/control['factor'] < control['dt_min']*(1.0 - 1e-12):
+            _usar_algoritmo(control, 0)
+            control['tiempo'] += time.perf_counter() - tic
+            return None
+        h /= control['factor']
+        control['dt'] = h
+
+    iteraciones = ops.testIter()
+    control['registro'].append((ops.getTime(), h, k, iteraciones, intentos))
+    for funcion in control['al_converger']:
+        funcion()
+
+    # Paso fácil con el primer algoritmo: se vuelve a él y se intenta crecer
+    if k == 0 and intentos == 0 and iteraciones <= control['iter_faciles']:
+        control['faciles'] += 1
+        if control['faciles'] >= control['crecer_tras'] and control['dt'] < control['dt_max']:
+            control['dt'] = min(control['dt']*control['factor'], control['dt_max'])
+            control['faciles'] = 0
+    else:
+        control['faciles'] = 0
+    _usar_algoritmo(control, 0)
+    control['tiempo'] += time.perf_counter() - tic
+    return h
+
+
+def _analizar_transitorio(h):
+    return ops.analyze(1, h)
+
+
+def avanzar_hasta(control, t_objetivo):
+    """
+    Avanza el análisis transitorio desde getTime() hasta t_objetivo con
+    pasos de dar_paso().
+
+    Devuelve:
+        True si se llega a t_objetivo, False si un paso no converge
+    """
+    tol_t = 1e-9*control['dt_min']
+    t = ops.getTime()
+    while t_objetivo - t > tol_t:
+        if dar_paso(control, _analizar_transitorio, t_objetivo - t) is None:
+            return False
+        t = ops.getTime()
+    return True
+
+
+def analisis_adaptativo(control, Nsteps, dt_salida, al_paso=None):
+    """
+    Sustituye al bucle 'for i in range(Nsteps): analyze(1, dt)' de los
+    scripts: avanza hasta cada instante de salida t0 + (i+1)*dt_salida con
+    avanzar_hasta() y llama a al_paso(i) para leer la respuesta. Se para
+    en el primer instante que no se alcanza.
+
+    Devuelve:
+        pasos : nº de instantes de salida alcanzados
+    """
+    t0 = ops.getTime()
+    for i in range(Nsteps):
+        if not avanzar_hasta(control, t0 + (i + 1)*dt_salida):
+            return i
+        if al_paso is not None:
+            al_paso(i)
+    return Nsteps
+
+
+def analisis_interpolado(control, Nsteps, dt_salida, leer):
+    """
+    Como analisis_adaptativo(), pero los pasos no se recortan en los
+    instantes de salida, de modo que dt_max puede ser mayor que dt_salida:
+    tras cada paso convergido se llama a leer() y la respuesta en los
+    instantes t0 + (i+1)*dt_salida que quedan dentro del paso se interpola
+    linealmente entre los dos estados convergidos. Solo el último paso se
+    recorta para terminar en t0 + Nsteps*dt_salida.
+
+    La carga se evalúa solo al final de cada paso: con pasos mayores que el
+    del registro la excitación se filtra, así que dt_max debe elegirse
+    según el contenido en frecuencia de la carga.
+
+    Parámetros:
+        leer : función sin argumentos que devuelve la respuesta que se
+               guarda (escalar o vector), p.ej. desplazamientos y fuerzas
+
+    Devuelve:
+        pasos   : nº de instantes de salida alcanzados
+        valores : np.ndarray (pasos, n_valores) con la respuesta interpolada
+    """
+    t0 = ops.getTime()
+    t_fin = t0 + Nsteps*dt_salida
+    # Holgura para el redondeo acumulado de getTime() en muchos pasos
+    tol_t = 1e-6*control['dt_min']
+    t_ant = t0
+    x_ant = np.atleast_1d(np.asarray(leer(), dtype=float))
+    valores = np.zeros((Nsteps, x_ant.size))
+    i = 0
+    while i < Nsteps:
+        if dar_paso(control, _analizar_transitorio, t_fin - t_ant) is None:
+            return i, valores[:i]
+        t = ops.getTime()
+        x = np.atleast_1d(np.asarray(leer(), dtype=float))
+        while i < Nsteps and t0 + (i + 1)*dt_salida <= t + tol_t:
+            w = min((t0 + (i + 1)*dt_salida - t_ant)/(t - t_ant), 1.0)
+            valores[i] = x_ant + w*(x - x_ant)
+            i += 1
+        t_ant, x_ant = t, x
+    return Nsteps, valores
+
+
+def resumen_control(control, dt_referencia=None, tiempo_referencia=None):
+    """
+    Resumen del control de paso: pasos, pasos con fallo, pasos con cada
+    algoritmo, iteraciones medias y máximas, dt mínimo y medio y tiempo de
+    cálculo.
+
+    Se compara también con el mismo análisis a paso fijo: si se da
+    tiempo_referencia (tiempo medido del bucle a paso fijo al que sustituye
+    el control) se usa ese; si no, se estima el tiempo a paso fijo
+    dt_referencia con el coste medio de cada analyze() (incluidos los
+    intentos fallidos). Por defecto dt_referencia es el paso inicial del
+    control, el del bucle 'for i in range(Nsteps): analyze(1, dt)'.
+
+    Devuelve:
+        resumen  : diccionario con los valores anteriores, 'tiempo_referencia'
+                   y 'tiempo_ahorrado' (negativo si el control es más lento)
+        registro : np.ndarray (pasos, 5) con (tiempo, dt, algoritmo,
+                   iteraciones, intentos fallidos) de cada paso
+    """
+    registro = np.array(control['registro'], dtype=float).reshape(-1, 5)
+    n = len(registro)
+    resumen = {
+        'pasos': n,
+        'pasos_con_fallo': int(np.count_nonzero(registro[:, 4])),
+        'pasos_por_algoritmo': {control['algoritmos'][k][0]: int(np.count_nonzero(registro[:, 2] == k))
+                                for k in range(len(control['algoritmos']))},
+        'iteraciones_media': float(registro[:, 3].mean()) if n else 0.0,
+        'iteraciones_max': int(registro[:, 3].max()) if n else 0,
+        'dt_min': float(registro[:, 1].min()) if n else control['dt'],
+        'dt_medio': float(registro[:, 1].mean()) if n else control['dt'],
+        'tiempo': control['tiempo'],
+    }
+    if tiempo_referencia is None and n:
+        if dt_referencia is None:
+            dt_referencia = control['dt_inicial']
+        duracion = registro[-1, 0] - (registro[0, 0] - registro[0, 1])
+        llamadas = n + registro[:, 4].sum()
+        tiempo_referencia = control['tiempo']/llamadas*duracion/dt_referencia
+    if tiempo_referencia is not None:
+        resumen['tiempo_referencia'] = float(tiempo_referencia)
+        resumen['tiempo_ahorrado'] = float(tiempo_referencia - control['tiempo'])
+    return resumen, registro
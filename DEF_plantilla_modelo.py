@@ -0,0 +1,227 @@
+import time
+from collections import namedtuple
+
+import numpy as np
+import openseespy.opensees as ops
+
+from DEF_series_temporales import preparar_serie_path, definir_serie_path
+
+# Marcador de un valor que se sustituye al ejecutar la plantilla
+Parametro = namedtuple('Parametro', ['nombre'])
+
+
+def crear_plantilla(construccion, actualizacion=()):
+    """
+    Crea una plantilla de modelo a partir de dos listas de comandos.
+
+    Cada comando es una tupla (funcion, *argumentos), donde funcion es el
+    nombre de un comando de OpenSees ('node', 'element', ...) o una función
+    de Python (p.ej. definir_serie_path). Los argumentos Parametro('K') se
+    sustituyen por valores['K'] al ejecutar.
+
+        construccion  : comandos que definen el modelo completo (se ejecutan
+                        tras wipe() en preparar_plantilla()).
+        actualizacion : comandos que cambian entre ejecuciones sin reconstruir
+                        el modelo (updateParameter, rayleigh, cambio de
+                        registro...). Se ejecutan al final de
+                        preparar_plantilla() y tras reset() en
+                        actualizar_plantilla().
+
+    Devuelve:
+        plantilla : diccionario con las dos listas de comandos
+    """
+    return {'construccion': list(construccion), 'actualizacion': list(actualizacion)}
+
+
+def _ejecutar_comandos(comandos, valores):
+    for comando in comandos:
+        funcion = comando[0]
+        if isinstance(funcion, str):
+            funcion = getattr(ops, funcion)
+        args = [valores[a.nombre] if isinstance(a, Parametro) else a for a in comando[1:]]
+        funcion(*args)
+
+
+def preparar_plantilla(plantilla, valores):
+    """
+    Construye el modelo desde cero: wipe(), comandos de construcción y
+    comandos de actualización con los valores dados.
+    """
+    ops.wipe()
+    _ejecutar_comandos(plantilla['construccion'], valores)
+    _ejecutar_comandos(plantilla['actualizacion'], valores)
+
+
+def actualizar_plantilla(plantilla, valores):
+    """
+    Vuelve el dominio al estado inicial con reset() (desplazamientos,
+    velocidades, tiempo y estado de los materiales a cero) y ejecuta solo los
+    comandos de actualización, sin reconstruir nodos, elementos ni objetos
+    de análisis.
+    """
+    ops.reset()
+    _ejecutar_comandos(plantilla['actualizacion'], valores)
+
+
+def plantilla_1gdl_elastica(M=1.0):
+    """
+    Plantilla del oscilador elástico de 1-GDL de los scripts de espectros.
+
+    Entre periodos solo cambian la rigidez (parámetro 1 de OpenSees sobre el
+    'E' del material Elastic) y alphaM; el registro cambia con los valores
+    'tagTS' y 'serie' (serie preparada con preparar_serie_path()).
+
+    Valores necesarios: K, alphaM, tagTS, serie
+    """
+    construccion = [
+        ('model', 'basic', '-ndm', 1, '-ndf', 1),
+        ('uniaxialMaterial', 'Elastic', 1, Parametro('K')),
+        ('node', 1, 0),
+        ('node', 2, 0, '-mass', M),
+        ('fix', 1, 1),
+        ('element', 'zeroLength', 1, 1, 2, '-mat', 1, '-dir', 1, '-doRayleigh', 1),
+        ('parameter', 1, 'element', 1, 'material', 1, 'E'),
+        (definir_serie_path, Parametro('tagTS'), Parametro('serie')),
+        ('pattern', 'UniformExcitation', 1, 1, '-accel', Parametro('tagTS')),
+        ('system', 'UmfPack'),
+        ('numberer', 'RCM'),
+        ('constraints', 'Transformation'),
+        ('algorithm', 'Newton'),
+        ('integrator', 'Newmark', 0.5, 0.25),
+        ('analysis', 'Transient'),
+    ]
+    actualizacion = [
+        ('updateParameter', 1, Parametro('K')),
+        ('rayleigh', Parametro('alphaM'), 0, 0, 0),
+    ]
+    return crear_plantilla(construccion, actualizacion)
+
+
+# Puntos de la envolvente del material 'Hysteretic' que admiten parámetros
+# de OpenSees (parameter ... 'material', 1, nombre), en el orden de sus argumentos
+ENVOLVENTE_HISTERETICO = ('mom1p', 'rot1p', 'mom2p', 'rot2p', 'mom3p', 'rot3p',
+                          'mom1n', 'rot1n', 'mom2n', 'rot2n', 'mom3n', 'rot3n')
+
+
+def plantilla_1gdl_histeretica(M=1.0, pinchX=0.8, pinchY=0.2):
+    """
+    Plantilla del oscilador de 1-GDL con material 'Hysteretic' de
+    1GDL_EspectroNolineal.py.
+
+    Entre periodos (y resistencias) cambian los 12 puntos de la envolvente,
+    cada uno con su parámetro de OpenSees (1..12, en el orden de
+    ENVOLVENTE_HISTERETICO), y alphaM; el registro se fija al construir con
+    'tagTS' y 'serie'.
+
+    Valores necesarios: los de valores_1gdl_histeretico(), tagTS, serie
+    """
+    envolvente = [Parametro(n) for n in ENVOLVENTE_HISTERETICO]
+    construccion = [
+        ('model', 'basic', '-ndm', 1, '-ndf', 1),
+        ('uniaxialMaterial', 'Hysteretic', 2, *envolvente, pinchX, pinchY, 0, 0, 0),
+        ('node', 1, 0),
+        ('node', 2, 0, '-mass', M),
+        ('fix', 1, 1),
+        ('element', 'zeroLength', 1, 1, 2, '-mat', 2, '-dir', 1, '-doRayleigh', 1),
+        *[('parameter', k, 'element', 1, 'material', 1, n) for k, n in enumerate(ENVOLVENTE_HISTERETICO, 1)],
+        (definir_serie_path, Parametro('tagTS'), Parametro('serie')),
+        ('pattern', 'UniformExcitation', 1, 1, '-accel', Parametro('tagTS')),
+        ('system', 'UmfPack'),
+        ('numberer', 'RCM'),
+        ('constraints', 'Transformation'),
+        ('algorithm', 'Newton'),
+        ('integrator', 'Newmark', 0.5, 0.25),
+        ('analysis', 'Transient'),
+    ]
+    actualizacion = [('updateParameter', k, v) for k, v in enumerate(envolvente, 1)]
+    actualizacion.append(('rayleigh', Parametro('alphaM'), 0, 0, 0))
+    return crear_plantilla(construccion, actualizacion)
+
+
+def valores_1gdl_histeretico(Tj, M=1.0, Fy=300.0, Damping=0.05):
+    """
+    Valores de plantilla_1gdl_histeretica() para el periodo Tj: envolvente
+    trilineal simétrica (Fy en dy, 2*dy y 3*dy, con dy = Fy/K) y alphaM =
+    2*Damping*omega.
+    """
+    K = M*(2*np.pi/Tj)**2
+    dy = Fy/K
+    valores = {'alphaM': 2*Damping*np.sqrt(K/M)}
+    for k in (1, 2, 3):
+        valores[f'mom{k}p'], valores[f'rot{k}p'] = Fy, k*dy
+        valores[f'mom{k}n'], valores[f'rot{k}n'] = -Fy, -k*dy
+    return valores
+
+
+def cambiar_registro(tagTS, serie, tag_patron=1, dir=1):
+    """
+    Sustituye el registro de una excitación uniforme sin reconstruir el
+    modelo: elimina el patrón y la serie anteriores y define los nuevos.
+    """
+    ops.remove('loadPattern', tag_patron)
+    ops.remove('timeSeries', tagTS)
+    definir_serie_path(tagTS, serie)
+    ops.pattern('UniformExcitation', tag_patron, dir, '-accel', tagTS)
+
+
+def medir_plantilla_espectro(T, dt, ag, M=1.0, Damping=0.05):
+    """
+    Compara, en la malla de periodos T, el coste de reconstruir el modelo de
+    1-GDL en cada periodo (wipe() + todos los comandos + eigen, como en
+    1GDL_EspectroElastico.py) con el de la plantilla (reset() +
+    updateParameter + rayleigh). Separa el tiempo de preparación del tiempo
+    de resolución e imprime el resumen.
+
+    Devuelve:
+        diccionario con los tiempos [s] de cada variante y la diferencia
+        máxima de umax entre ambas.
+    """
+    T = np.atleast_1d(np.asarray(T, dtype=float))
+    ag = np.asarray(ag, dtype=float)
+    Nsteps = ag.size
+    serie = preparar_serie_path(dt, ag)
+    plantilla = plantilla_1gdl_elastica(M)
+
+    def resolver():
+        umax = 0.0
+        for i in range(Nsteps):
+            ops.analyze(1, dt)
+            umax = max(umax, abs(ops.nodeDisp(2, 1)))
+        return umax
+
+    resultados = {}
+    for variante in ['reconstruccion', 'plantilla']:
+        t_preparar = 0.0
+        t_resolver = 0.0
+        umax = np.zeros(len(T))
+        for j, Tj in enumerate(T):
+            tic = time.perf_counter()
+            K = M*(2*np.pi/Tj)**2
+            valores = {'K': K, 'tagTS': 1, 'serie': serie}
+            if variante == 'reconstruccion' or j == 0:
+                ops.wipe()
+                _ejecutar_comandos(plantilla['construccion'], valores)
+                omegaI = np.sqrt(ops.eigen('-fullGenLapack', 1)[0])
+                valores['alphaM'] = 2*Damping*omegaI
+                _ejecutar_comandos(plantilla['actualizacion'], valores)
+            else:
+                valores['alphaM'] = 2*Damping*np.sqrt(K/M)
+                actualizar_plantilla(plantilla, valores)
+            t_preparar += time.perf_counter() - tic
+
+            tic = time.perf_counter()
+            umax[j] = resolver()
+            t_resolver += time.perf_counter() - tic
+        resultados[variante] = {'preparar': t_preparar, 'resolver': t_resolver, 'umax': umax}
+
+    ops.wipe()
+
+    dif = np.max(np.abs(resultados['plantilla']['umax'] - resultados['reconstruccion']['umax']))
+    for variante in ['reconstruccion', 'plantilla']:
+        r = resultados[variante]
+        print("{:15s}: preparar {:.4f} s ({:.3f} ms/periodo), resolver {:.4f} s".format(
+            variante, r['preparar'], r['preparar']/len(T)*1e3, r['resolver']))
+    print("Diferencia máxima en umax: {:.3e}".format(dif))
+
+    resultados['diferencia_umax'] = dif
+    return resultados
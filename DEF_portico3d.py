@@ -0,0 +1,289 @@
+import numpy as np
+import openseespy.opensees as ops
+
+from DEF_secciones_fibras import seccion_fibras, definir_seccion_fibras
+
+
+def definir_materiales_acero(matTag1=1, matTag2=2, E=2e5, Fy=275.0, b=0.01, R0=12, cR1=0.925, cR2=0.15):
+    """
+    Materiales de los scripts MGDL-NL: 'Elastic' (matTag1) y 'Steel02'
+    (matTag2) con endurecimiento isótropo a1..a4 como en los scripts.
+    """
+    ops.uniaxialMaterial('Elastic', matTag1, E)
+
+    a2 = 1.0
+    a1 = a2*(Fy/E)
+    a4 = 1.0
+    a3 = a4*(Fy/E)
+    sigInit = 0.0
+    ops.uniaxialMaterial('Steel02', matTag2, Fy, E, b, R0, cR1, cR2, a1, a2, a3, a4, sigInit)
+
+
+def definir_seccion_ipe200(secTag=1, matTag=2, GJ=1e12, numSubdivY=20, numSubdivZ=2):
+    """
+    Sección de fibras IPE200 de los scripts MGDL-NL: alas de numSubdivY x
+    numSubdivZ fibras, alma de numSubdivZ x numSubdivY*2 y cuatro fibras para
+    el acuerdo alma-ala (malla de DEF_secciones_fibras, en caché).
+    IPE200 - https://www.staticstools.eu/es/profile-ipe/IPE200/mm/show
+    """
+    fibras = seccion_fibras('IPE200', matTag, nfy=numSubdivY, nfz=numSubdivZ, nwy=numSubdivZ, nwz=numSubdivY*2)
+    definir_seccion_fibras(secTag, fibras, GJ)
+
+
+def _por_planta(valor, plantas):
+    # Escalar o lista con un valor por planta -> np.ndarray (plantas,)
+    return np.broadcast_to(np.asarray(valor), (plantas,)).copy()
+
+
+def generar_portico(vanos_x=1, vanos_y=1, plantas=2, luz_x=5000.0, luz_y=4000.0, altura=4000.0,
+                    div_columna=1, div_viga_x=1, div_viga_y=1, int_columnas=1, int_vigas_x=1,
+                    int_vigas_y=None, transf_columnas=2, transf_vigas=1, masa_nudo=None, diafragma=False):
+    """
+    Genera con NumPy la geometría de un pórtico 3D regular de vanos_x x
+    vanos_y vanos y 'plantas' plantas, sin llamar a OpenSees (ver
+    definir_portico()).
+
+    Parámetros:
+        luz_x, luz_y     : luz de los vanos [mm]; escalar o una por vano
+        altura           : altura de planta [mm]; escalar o una por planta
+        div_columna      : nº de elementos por columna en cada planta
+        div_viga_x/y     : nº de elementos por viga en dirección X/Y
+        int_columnas     : beamIntegration de las columnas; escalar o una por planta
+        int_vigas_x/y    : beamIntegration de las vigas X/Y (int_vigas_y=None
+                           toma int_vigas_x); escalar o una por planta
+        transf_columnas  : geomTransf de las columnas
+        transf_vigas     : geomTransf de las vigas
+        masa_nudo        : masas (ndf=6) de cada nudo de forjado (None: sin masas)
+        diafragma        : añade un nudo maestro por planta en el centro de la
+                           planta con rigidDiaphragm sobre los nudos del forjado
+
+    Numeración: primero los nudos de las líneas de columnas, nivel a nivel
+    (tag = 1 + i + (vanos_x+1)*(j + (vanos_y+1)*k)), luego los nudos
+    intermedios de las vigas X e Y y por último los nudos maestros. Los
+    elementos siguen el mismo orden: columnas, vigas X y vigas Y.
+
+    Devuelve:
+        portico : diccionario de np.ndarray con
+            'nudos', 'coords' (n, 3), 'masas' (n, 6), 'planta' (n,)
+                                   planta de cada nudo (0 = base, -1 = nudo
+                                   intermedio de columna)
+            'rejilla'            : tags de las líneas de columnas (i, j, nivel)
+            'elementos', 'conectividad' (ne, 2), 'tipo' (ne,) 0 columna,
+                                   1 viga X, 2 viga Y, 'planta_elemento',
+                                   'transf', 'integracion'
+            'nudos_base', 'nudos_planta' (plantas, m), 'maestros',
+            'coords_maestros', 'alturas', 'cotas'
+    """
+    luces_x = np.broadcast_to(np.asarray(luz_x, dtype=float), (vanos_x,))
+    luces_y = np.broadcast_to(np.asarray(luz_y, dtype=float), (vanos_y,))
+    alturas = _por_planta(np.asarray(altura, dtype=float), plantas)
+    X = np.concatenate(([0.0], np.cumsum(luces_x)))
+    Y = np.concatenate(([0.0], np.cumsum(luces_y)))
+    cotas = np.concatenate(([0.0], np.cumsum(alturas)))
+    nx, ny = vanos_x + 1, vanos_y + 1
+
+    # Niveles de las líneas de columnas: div_columna por planta
+    t = np.arange(div_columna)/div_columna
+    Z = np.concatenate([cotas[:-1, None] + alturas[:, None]*t[None, :], cotas[-1:, None]], axis=None)
+    nk = Z.size
+    k, j, i = np.meshgrid(np.arange(nk), np.arange(ny), np.arange(nx), indexing='ij')
+    rejilla = (1 + i + nx*(j + ny*k)).transpose(2, 1, 0)  # (i, j, nivel)
+    coords = [np.column_stack((X[i.ravel()], Y[j.ravel()], Z[k.ravel()]))]
+    planta = np.where(k.ravel() % div_columna == 0, k.ravel()//div_columna, -1)
+    plantas_nudo = [planta]
+
+    siguiente = nx*ny*nk + 1
+    forjado = rejilla[:, :, ::div_columna]  # (i, j, planta)
+
+    def vigas(eje, div):
+        # Nudos intermedios y conectividad de las vigas en la dirección 'eje'
+        nonlocal siguiente
+        extremos = np.moveaxis(forjado[:, :, 1:], eje, 0)  # (a lo largo, transversal, planta)
+        ni, nt, nf = extremos.shape
+        xyz = np.moveaxis(np.stack(np.meshgrid(X, Y, indexing='ij'), axis=-1), eje, 0)
+        s = np.arange(1, div)/div
+        p0 = xyz[:-1, :, None, None, :]
+        p1 = xyz[1:, :, None, None, :]
+        puntos = p0 + (p1 - p0)*s[None, None, None, :, None]  # (vano, transversal, 1, div-1, 2)
+        puntos = np.broadcast_to(puntos, (ni - 1, nt, nf, div - 1, 2))
+        # orden de numeración: planta, transversal, vano, subdivisión
+        orden = (2, 1, 0, 3)
+        n_int = (ni - 1)*nt*nf*(div - 1)
+        tags_int = (siguiente + np.arange(n_int)).reshape(nf, nt, ni - 1, div - 1).transpose(2, 1, 0, 3)
+        siguiente += n_int
+        z = np.broadcast_to(cotas[1:][None, None, :, None], tags_int.shape)
+        xyz_int = np.concatenate((puntos, z[..., None]), axis=-1).transpose(*orden, 4).reshape(-1, 3)
+        f_int = np.broadcast_to(np.arange(1, nf + 1)[None, None, :, None], tags_int.shape)
+        cadena = np.concatenate((extremos[:-1, :, :, None], tags_int, extremos[1:, :, :, None]), axis=3)
+        con = np.stack((cadena[..., :-1], cadena[..., 1:]), axis=-1).transpose(*orden, 4).reshape(-1, 2)
+        f_ele = np.broadcast_to(np.arange(1, nf + 1)[None, None, :, None], cadena[..., 1:].shape)
+        return (tags_int.transpose(*orden).ravel(), xyz_int, f_int.transpose(*orden).ravel(),
+                con, f_ele.transpose(*orden).ravel())
+
+    # Columnas: nivel, j, i
+    col = np.stack((rejilla[:, :, :-1], rejilla[:, :, 1:]), axis=-1).transpose(2, 1, 0, 3).reshape(-1, 2)
+    f_col = np.repeat(np.arange(nk - 1)//div_columna + 1, nx*ny)
+    conectividad = [col]
+    tipo = [np.zeros(len(col), dtype=int)]
+    planta_ele = [f_col]
+
+    intermedios = [[] for f in range(plantas)]
+    for eje, div, clase in [(0, div_viga_x, 1), (1, div_viga_y, 2)]:
+        tags_int, xyz_int, f_int, con, f_ele = vigas(eje, div)
+        coords.append(xyz_int)
+        plantas_nudo.append(f_int)
+        conectividad.append(con)
+        tipo.append(np.full(len(con), clase))
+        planta_ele.append(f_ele)
+        for f in range(plantas):
+            intermedios[f].append(tags_int[f_int == f + 1])
+
+    coords = np.concatenate(coords)
+    planta = np.concatenate(plantas_nudo)
+    conectividad = np.concatenate(conectividad)
+    tipo = np.concatenate(tipo)
+    planta_ele = np.concatenate(planta_ele)
+    nudos = np.arange(1, len(coords) + 1)
+
+    masas = np.zeros((len(nudos), 6))
+    if masa_nudo is not None:
+        masas[planta > 0] = masa_nudo
+
+    nudos_planta = np.array([np.concatenate([forjado[:, :, f + 1].ravel(order='F')] + intermedios[f])
+                             for f in range(plantas)])
+
+    if diafragma:
+        maestros = nudos[-1] + 1 + np.arange(plantas)
+        coords_maestros = np.column_stack((np.full(plantas, X[-1]/2), np.full(plantas, Y[-1]/2), cotas[1:]))
+    else:
+        maestros = np.zeros(0, dtype=int)
+        coords_maestros = np.zeros((0, 3))
+
+    int_vigas_y = int_vigas_x if int_vigas_y is None else int_vigas_y
+    integraciones = np.stack([_por_planta(v, plantas) for v in (int_columnas, int_vigas_x, int_vigas_y)])
+    integracion = integraciones[tipo, planta_ele - 1]
+    transf = np.where(tipo == 0, transf_columnas, transf_vigas)
+
+    return {
+        'nudos': nudos,
+        'coords': coords,
+        'masas': masas,
+        'planta': planta,
+        'rejilla': rejilla,
+        'elementos': np.arange(1, len(conectividad) + 1),
+        'conectividad': conectividad,
+        'tipo': tipo,
+        'planta_elemento': planta_ele,
+        'transf': transf,
+        'integracion': integracion,
+        'nudos_base': rejilla[:, :, 0].ravel(order='F'),
+        'nudos_planta': nudos_planta,
+        'maestros': maestros,
+        'coords_maestros': coords_maestros,
+        'alturas': alturas,
+        'cotas': cotas,
+    }
+
+
+def definir_portico(portico, tipo_elemento='forceBeamColumn'):
+    """
+    Define en OpenSees los nudos, masas, empotramientos, diafragmas y
+    elementos generados por generar_portico(). Los geomTransf y
+    beamIntegration referenciados deben existir antes de la llamada.
+
+    Las filas se convierten a listas de Python una sola vez (tolist()) y se
+    pasan a node()/element() sin más trabajo por elemento.
+    """
+    masas = portico['masas']
+    con_masa = np.any(masas != 0, axis=1).tolist()
+    for tag, xyz, m, hay_masa in zip(portico['nudos'].tolist(), portico['coords'].tolist(),
+                                     masas.tolist(), con_masa):
+        if hay_masa:
+            ops.node(tag, *xyz, '-mass', *m)
+        else:
+            ops.node(tag, *xyz)
+
+    for tag in portico['nudos_base'].tolist():
+        ops.fix(tag, 1, 1, 1, 1, 1, 1)
+
+    for tag, xyz, esclavos in zip(portico['maestros'].tolist(), portico['coords_maestros'].tolist(),
+                                  portico['nudos_planta'].tolist()):
+        ops.node(tag, *xyz)
+        ops.fix(tag, 0, 0, 1, 1, 1, 0)
+        ops.rigidDiaphragm(3, tag, *esclavos)
+
+    for tag, (ni, nj), transf, integracion in zip(portico['elementos'].tolist(), portico['conectividad'].tolist(),
+                                                  portico['transf'].tolist(), portico['integracion'].tolist()):
+        ops.element(tipo_elemento, tag, ni, nj, transf, integracion)
+
+
+def segmentos_portico(portico):
+    """
+    Coordenadas de los extremos de cada elemento, (ne, 2, 3), p.ej. para
+    dibujar el pórtico con mpl_toolkits.mplot3d.art3d.Line3DCollection o
+    colorear los elementos con resultados indexados por 'elementos'.
+    """
+    return portico['coords'][portico['conectividad'] - 1]
+
+
+def construir_portico_ejemplo(diafragma=False):
+    """
+    Construye el pórtico 3D de 2 plantas de los scripts MGDL-NL (52 elementos
+    'forceBeamColumn' con sección de fibras IPE200 y Steel02) a partir de
+    generar_portico(): un vano de 5000 mm en X y de 4000 mm en Y, plantas de
+    4000 mm, columnas divididas en 4 tramos, vigas X en 4 tramos y vigas Y
+    de un solo elemento. Las masas están, como en los scripts, a media altura
+    y en la cabeza de cada columna y en el centro de las vigas X.
+
+    Con diafragma=True se añade un nudo maestro por planta con
+    rigidDiaphragm, como en MGDL-NL_Pushover.py.
+
+    Devuelve:
+        info : diccionario con
+            'nodos_base'       : nudos empotrados
+            'nodos_control'    : nudos de la columna (x=0, y=0) en la base y en
+                                 cada planta, para las derivas
+            'alturas'          : altura de cada planta [mm]
+            'nodos_planta'     : nudos de cada forjado (esclavos del diafragma)
+            'nodos_maestros'   : nudos maestros del diafragma (si diafragma=True)
+            'columnas_base'    : elementos de columna que arrancan en la base
+            'portico'          : arrays de generar_portico()
+    """
+    ops.wipe()
+    ops.model('basic', '-ndm', 3, '-ndf', 6)
+
+    matTag2 = 2
+    definir_materiales_acero(1, matTag2)
+    secTag = 1
+    definir_seccion_ipe200(secTag, matTag2)
+
+    transfTag1 = 1
+    ops.geomTransf('Linear', transfTag1, 0, 0, 1)
+    transfTag2 = 2
+    ops.geomTransf('Linear', transfTag2, 1, 0, 0)
+    integrationTag = 1
+    N = 3  # Nº de Puntos de Gauss
+    ops.beamIntegration('Lobatto', integrationTag, secTag, N)
+
+    portico = generar_portico(1, 1, 2, 5000.0, 4000.0, 4000.0, div_columna=4, div_viga_x=4, div_viga_y=1,
+                              int_columnas=integrationTag, int_vigas_x=integrationTag,
+                              transf_columnas=transfTag2, transf_vigas=transfTag1, diafragma=diafragma)
+    x, z = portico['coords'][:, 0], portico['coords'][:, 2]
+    en_columna = (portico['planta'] != 0) & np.isin(x, [0.0, 5000.0]) & (z % 2000 == 0)
+    centro_viga_x = (portico['planta'] > 0) & (x == 2500.0)
+    portico['masas'][en_columna | centro_viga_x] = [1, 1, 0, 0, 0, 0]
+    definir_portico(portico)
+
+    rejilla = portico['rejilla']
+    columnas = portico['tipo'] == 0
+    info = {
+        'nodos_base': portico['nudos_base'].tolist(),
+        'nodos_control': rejilla[0, 0, ::4].tolist(),
+        'alturas': portico['alturas'].tolist(),
+        'nodos_planta': portico['nudos_planta'].tolist(),
+        'nodos_maestros': portico['maestros'].tolist(),
+        'columnas_base': portico['elementos'][columnas & np.isin(portico['conectividad'][:, 0],
+                                                                 portico['nudos_base'])].tolist(),
+        'portico': portico,
+    }
+    return info
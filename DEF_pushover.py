@@ -0,0 +1,158 @@
+import numpy as np
+import openseespy.opensees as ops
+
+from DEF_modal import forma_modal
+from DEF_paso_adaptativo import ALGORITMOS, crear_control, dar_paso
+
+TIPOS_PATRON = ('modal', 'uniforme', 'triangular')
+
+
+def patron_pushover(tipo, nodos, dof=1, modo=1, masas=None, alturas=None, modal=None):
+    """
+    Cargas laterales del pushover en los nudos de planta (p.ej. los
+    maestros de los diafragmas), normalizadas a carga máxima +1:
+        'modal'      : componente dof del autovector 'modo' en cada nudo,
+                       como ux1/ux2 en MGDL-NL_Pushover.py (de 'modal' o,
+                       sin él, de eigen(), que debe haberse ejecutado antes)
+        'uniforme'   : proporcional a la masa de cada planta
+        'triangular' : proporcional a masa x altura
+
+    Parámetros:
+        nodos   : nudos donde se aplican las cargas (uno por planta)
+        masas   : masa de cada planta (por defecto iguales)
+        alturas : altura de cada planta (por defecto la última coordenada
+                  de cada nudo)
+        modal   : resultado de DEF_modal.analisis_modal() (los modos de la
+                  caché no están en el dominio de OpenSees)
+
+    Devuelve:
+        cargas : np.ndarray (n_nudos,)
+    """
+    if tipo not in TIPOS_PATRON:
+        raise ValueError(f"Patrón '{tipo}' desconocido: {TIPOS_PATRON}")
+    n = len(nodos)
+    masas = np.ones(n) if masas is None else np.asarray(masas, dtype=float)
+    if tipo == 'modal' and modal is not None:
+        cargas = forma_modal(modal, nodos, modo, dof)
+    elif tipo == 'modal':
+        cargas = np.array([ops.nodeEigenvector(int(nd), modo, dof) for nd in nodos])
+    elif tipo == 'uniforme':
+        cargas = masas.copy()
+    else:
+        if alturas is None:
+            alturas = [ops.nodeCoord(int(nd))[-1] for nd in nodos]
+        cargas = masas*np.asarray(alturas, dtype=float)
+    # La carga mayor, positiva: el sentido del empuje lo da el signo de incr
+    return cargas/cargas[np.argmax(np.abs(cargas))]
+
+
+def definir_patron_pushover(tag_patron, tagTS, nodos, cargas, dof=1):
+    """
+    Define el patrón 'Plain' con las cargas laterales de patron_pushover()
+    en el gdl dof de cada nudo.
+    """
+    ops.pattern('Plain', tag_patron, tagTS)
+    for nd, P in zip(nodos, cargas):
+        valores = [0.0]*len(ops.nodeDisp(int(nd)))
+        valores[dof - 1] = float(P)
+        ops.load(int(nd), *valores)
+
+
+def nudos_base(dof=1):
+    """
+    Nudos con el gdl dof empotrado (fix), cuyas reacciones suman el
+    cortante en la base. Los maestros de los diafragmas, fijados solo en
+    los gdl fuera de su plano, no entran.
+    """
+    return [nd for nd in dict.fromkeys(ops.getFixedNodes()) if dof in ops.getFixedDOFs(nd)]
+
+
+def cortante_base(nodos, dof=1):
+    """
+    Cortante en la base: una llamada a reactions() y la suma de las
+    reacciones en dof de los nudos dados.
+    """
+    ops.reactions()
+    return sum(ops.nodeReaction(nd, dof) for nd in nodos)
+
+
+def pushover(nodo_control, dof, incr, desp_objetivo=None, deriva_objetivo=None, altura=None,
+             caida_resistencia=0.2, incr_min=None, incr_max=None, algoritmos=ALGORITMOS,
+             nodos=None, pasos_max=10000, al_paso=None):
+    """
+    Pushover en control de desplazamiento del nudo_control (gdl dof) con
+    incremento adaptativo: el incremento se divide y se cambia de algoritmo
+    cuando un paso no converge y crece de nuevo en los tramos fáciles (ver
+    DEF_paso_adaptativo). El análisis 'Static' (system, numberer,
+    constraints, test) y el patrón de cargas laterales deben estar ya
+    definidos; el integrador DisplacementControl lo fija esta función.
+
+    Se para al llegar al desplazamiento objetivo (desp_objetivo, o
+    deriva_objetivo*altura), cuando el cortante cae por debajo de
+    (1 - caida_resistencia) veces el máximo tras el pico, cuando un paso no
+    converge con incr_min o tras pasos_max pasos.
+
+    Parámetros:
+        incr             : incremento inicial (con signo: sentido del empuje)
+        incr_min         : incremento mínimo (por defecto incr/2**6)
+        incr_max         : incremento máximo (por defecto 4*incr)
+        nodos            : nudos cuyas reacciones suman el cortante (por
+                           defecto nudos_base(dof))
+        al_paso          : función al_paso(i) que se llama tras cada paso
+                           convergido (para leer otras respuestas)
+
+    Devuelve:
+        diccionario con 'desplazamiento', 'cortante', 'factor_carga',
+        'incremento', 'iteraciones' (np.ndarray por paso), 'V_max',
+        'desp_V_max', 'motivo' ('objetivo', 'caida', 'no converge' o
+        'pasos') y 'control' (ver DEF_paso_adaptativo.resumen_control)
+    """
+    if desp_objetivo is None:
+        if deriva_objetivo is None or altura is None:
+            raise ValueError("Hace falta desp_objetivo o deriva_objetivo y altura")
+        desp_objetivo = deriva_objetivo*altura
+    signo = 1.0 if incr > 0 else -1.0
+    objetivo = signo*abs(desp_objetivo)
+    incr = abs(incr)
+    if nodos is None:
+        nodos = nudos_base(dof)
+
+    control = crear_control(incr, incr_min, 4*incr if incr_max is None else incr_max, algoritmos)
+
+    def analizar(h):
+        ops.integrator('DisplacementControl', nodo_control, dof, signo*h)
+        return ops.analyze(1)
+
+    u0 = ops.nodeDisp(nodo_control, dof)
+    desplazamientos, cortantes, factores = [], [], []
+    V_max, i_max = 0.0, 0
+    motivo = 'pasos'
+    for i in range(pasos_max):
+        restante = abs(objetivo - (ops.nodeDisp(nodo_control, dof) - u0))
+        if restante <= 1e-9*control['dt_min']:
+            motivo = 'objetivo'
+            break
+        if dar_paso(control, analizar, restante) is None:
+            motivo = 'no converge'
+            break
+
+        desplazamientos.append(ops.nodeDisp(nodo_control, dof))
+        cortantes.append(cortante_base(nodos, dof))
+        # Con DisplacementControl el tiempo del dominio es el factor de carga
+        factores.append(ops.getTime())
+        if al_paso is not None:
+            al_paso(i)
+
+        V = abs(cortantes[-1])
+        if V > V_max:
+            V_max, i_max = V, i
+        elif caida_resistencia is not None and V < (1.0 - caida_resistencia)*V_max:
+            motivo = 'caida'
+            break
+
+    registro = np.array(control['registro'], dtype=float).reshape(-1, 5)
+    return {'desplazamiento': np.array(desplazamientos), 'cortante': np.array(cortantes),
+            'factor_carga': np.array(factores), 'incremento': registro[:, 1],
+            'iteraciones': registro[:, 3].astype(int), 'V_max': V_max,
+            'desp_V_max': desplazamientos[i_max] if desplazamientos else 0.0,
+            'motivo': motivo, 'control': control}
@@ -0,0 +1,244 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import openseespy.opensees as ops
+
+from DEF_portico3d import construir_portico_ejemplo
+from DEF_pushover import patron_pushover, definir_patron_pushover, pushover
+from DEF_modal import analisis_modal
+
+# Opciones por defecto de cada caso (mismos valores que MGDL-NL_Pushover.py)
+OPCIONES_PUSHOVER = {
+    'gravedad': -9810.0,        # carga vertical en cada nudo con masa (None: sin gravedad)
+    'pasos_gravedad': 10,
+    'tol': 1e-6,
+    'iter': 100,
+    'incr': 1.0,                # incremento inicial de desplazamiento
+    'desp_objetivo': 500.0,
+    'deriva_objetivo': None,    # alternativa a desp_objetivo (deriva de la altura total)
+    'caida_resistencia': 0.2,
+    'n_modos': 6,               # modos que se calculan para los patrones 'modal'
+}
+
+_EJES = {1: 'X', 2: 'Y'}
+_COLUMNAS = ['nombre', 'dof', 'signo', 'patron', 'modo', 'motivo', 'pasos', 'V_max', 'desp_V_max',
+             'tiempo_calculo']
+
+
+def construir_portico_pushover():
+    """
+    Pórtico 3D de MGDL-NL_Pushover.py: construir_portico_ejemplo() con un
+    nudo maestro de diafragma rígido por planta.
+    """
+    return construir_portico_ejemplo(diafragma=True)
+
+
+def casos_pushover(direcciones=(1, 2), signos=(1, -1), patrones=('uniforme', 'modal'), modo=None):
+    """
+    Lista de casos de pushover dirección x sentido x patrón de cargas
+    (p.ej. ±X, ±Y con cargas uniformes y modales).
+
+    Parámetros:
+        direcciones : gdl del empuje (1 -> X, 2 -> Y)
+        signos      : sentidos del empuje (+1, -1)
+        patrones    : patrones de DEF_pushover.TIPOS_PATRON
+        modo        : modo de los patrones 'modal' (None -> el de mayor masa
+                      participante en la dirección del empuje)
+
+    Devuelve:
+        lista de diccionarios con 'nombre' (p.ej. '+X modal'), 'dof',
+        'signo', 'patron' y 'modo'
+    """
+    return [{'nombre': f"{'+' if s > 0 else '-'}{_EJES.get(d, d)} {p}", 'dof': int(d), 'signo': int(s),
+             'patron': p, 'modo': modo}
+            for d in direcciones for s in signos for p in patrones]
+
+
+# ---------------------------------------------------------------------------
+# Procesos de trabajo: el modelo se construye una vez por proceso y se vuelve
+# a su estado inicial con reset() antes de cada caso.
+# ---------------------------------------------------------------------------
+
+_datos_trabajador = {}
+
+_TAG_TS = 1
+_TAG_GRAVEDAD = 1
+_TAG_LATERAL = 2
+
+
+def _iniciar_trabajador(construir_modelo, casos, opciones):
+    op = dict(OPCIONES_PUSHOVER)
+    if opciones:
+        op.update(opciones)
+    info = construir_modelo()
+    nodos = info['nodos_maestros']
+
+    # Cargas laterales de cada caso, con los autovectores del modelo inicial
+    cargas = {}
+    modal = None
+    if any(c['patron'] == 'modal' for c in casos):
+        modal = analisis_modal(op['n_modos'], propiedades=True)
+    for c in casos:
+        modo = c.get('modo')
+        if c['patron'] == 'modal' and modo is None:
+            modo = int(np.argmax(modal['propiedades']['partiMassRatiosM' + _EJES[c['dof']]])) + 1
+        cargas[c['nombre']] = (patron_pushover(c['patron'], nodos, c['dof'], modo=modo or 1, modal=modal),
+                               modo)
+    ops.wipeAnalysis()
+
+    ops.timeSeries('Linear', _TAG_TS)
+    _datos_trabajador.update(info=info, cargas=cargas, opciones=op,
+                             nodos_masa=[nd for nd in ops.getNodeTags() if ops.nodeMass(nd, 1) > 0.0])
+
+
+def _ejecutar_caso(caso):
+    tic = time.perf_counter()
+    datos = _datos_trabajador
+    op, info = datos['opciones'], datos['info']
+    nodos = info['nodos_maestros']
+    cargas, modo = datos['cargas'][caso['nombre']]
+
+    ops.reset()
+    for tag in ops.getPatterns():
+        ops.remove('loadPattern', tag)
+    ops.system('UmfPack')
+    ops.numberer('AMD')
+    ops.constraints('Transformation')
+    ops.algorithm('Newton')
+    ops.test('NormDispIncr', op['tol'], op['iter'], 0)
+
+    gravedad_ok = True
+    if op['gravedad'] is not None:
+        ops.pattern('Plain', _TAG_GRAVEDAD, _TAG_TS)
+        for nd in datos['nodos_masa']:
+            valores = [0.0]*len(ops.nodeDisp(nd))
+            valores[len(ops.nodeCoord(nd)) - 1] = op['gravedad']
+            ops.load(nd, *valores)
+        ops.integrator('LoadControl', 1.0/op['pasos_gravedad'])
+        ops.analysis('Static')
+        gravedad_ok = ops.analyze(op['pasos_gravedad']) == 0
+        ops.loadConst('-time', 0.0)
+
+    if gravedad_ok:
+        definir_patron_pushover(_TAG_LATERAL, _TAG_TS, nodos, cargas, caso['dof'])
+        nodo_control = nodos[-1]
+        incr = caso['signo']*op['incr']
+        ops.integrator('DisplacementControl', nodo_control, caso['dof'], incr)
+        ops.analysis('Static')
+        r = pushover(nodo_control, caso['dof'], incr, desp_objetivo=op['desp_objetivo'],
+                     deriva_objetivo=op['deriva_objetivo'], altura=info['alturas'][-1],
+                     caida_resistencia=op['caida_resistencia'])
+    else:
+        # Sin equilibrio bajo la gravedad no se empuja: el caso queda sin curva
+        print(f"Caso {caso['nombre']}: el análisis de gravedad no converge")
+        r = {'motivo': 'gravedad', 'V_max': 0.0, 'desp_V_max': 0.0, 'desplazamiento': np.zeros(0),
+             'cortante': np.zeros(0), 'factor_carga': np.zeros(0)}
+    ops.wipeAnalysis()
+
+    return {'nombre': caso['nombre'], 'dof': caso['dof'], 'signo': caso['signo'],
+            'patron': caso['patron'], 'modo': modo or 0, 'cargas': cargas, 'motivo': r['motivo'],
+            'pasos': len(r['cortante']), 'V_max': r['V_max'], 'desp_V_max': r['desp_V_max'],
+            'desplazamiento': r['desplazamiento'], 'cortante': r['cortante'],
+            'factor_carga': r['factor_carga'], 'tiempo_calculo': time.perf_counter() - tic}
+
+
+# ---------------------------------------------------------------------------
+# Archivo de resultados
+# ---------------------------------------------------------------------------
+
+def _guardar(ruta_resultados, resultados):
+    # Curvas de todos los casos concatenadas; el caso k ocupa inicio[k]:inicio[k+1]
+    columnas = {c: np.array([r[c] for r in resultados]) for c in _COLUMNAS}
+    inicio = np.cumsum([0] + [r['pasos'] for r in resultados])
+    curvas = {c: np.concatenate([r[c] for r in resultados])
+              for c in ('desplazamiento', 'cortante', 'factor_carga')}
+    temporal = ruta_resultados + f'.{os.getpid()}.tmp.npz'
+    np.savez(temporal, inicio=inicio, cargas=np.array([r['cargas'] for r in resultados]),
+             **columnas, **curvas)
+    os.replace(temporal, ruta_resultados)
+
+
+def leer_resultados_pushover(ruta_resultados):
+    """
+    Lee el archivo de resultados de pushover_casos().
+
+    Devuelve:
+        diccionario nombre del caso -> diccionario con 'dof', 'signo',
+        'patron', 'modo' (0 si no es modal), 'cargas', 'motivo' (el de
+        DEF_pushover.pushover() o 'gravedad' si no converge la gravedad), 'pasos',
+        'V_max', 'desp_V_max', 'tiempo_calculo' y la curva de capacidad
+        ('desplazamiento', 'cortante', 'factor_carga')
+    """
+    with np.load(ruta_resultados) as datos:
+        datos = dict(datos)
+    inicio = datos['inicio']
+    resultados = {}
+    for k, nombre in enumerate(datos['nombre'].tolist()):
+        caso = {c: datos[c][k].item() for c in _COLUMNAS[1:]}
+        caso['cargas'] = datos['cargas'][k]
+        for c in ('desplazamiento', 'cortante', 'factor_carga'):
+            caso[c] = datos[c][inicio[k]:inicio[k + 1]]
+        resultados[nombre] = caso
+    return resultados
+
+
+def pushover_casos(casos=None, ruta_resultados='Outputs/pushover_casos.npz',
+                   construir_modelo=construir_portico_pushover, opciones=None, nproc=None):
+    """
+    Pushover del mismo modelo para varios casos de carga lateral (±X, ±Y,
+    cargas uniformes, modales, ...) repartidos entre procesos.
+
+    Cada proceso construye el modelo una sola vez, calcula los modos y las
+    cargas laterales de todos los casos y, antes de cada caso, lo devuelve a
+    su estado inicial con reset(). En cada caso se aplica la gravedad
+    (opciones['gravedad'] en los nudos con masa), el patrón lateral en los
+    nudos maestros y el pushover de DEF_pushover.pushover() con el último
+    maestro como nudo de control. Las curvas de capacidad de todos los casos
+    se escriben en un único .npz junto con los datos de cada caso.
+
+    construir_modelo debe hacer wipe(), definir el modelo (con diafragmas) y
+    devolver un diccionario con 'nodos_maestros' y 'alturas' (ver
+    DEF_portico3d.construir_portico_ejemplo). Por defecto se usa el pórtico
+    de MGDL-NL_Pushover.py (construir_portico_pushover).
+
+    Parámetros:
+        casos            : lista de casos (ver casos_pushover(); por defecto
+                           ±X, ±Y con cargas uniformes y modales)
+        ruta_resultados  : archivo .npz de resultados
+        construir_modelo : función (importable) que construye el modelo
+        opciones         : cambios sobre OPCIONES_PUSHOVER
+        nproc            : número de procesos (None -> os.cpu_count();
+                           1 -> cálculo en serie en este intérprete, que
+                           borra el modelo actual de OpenSees)
+
+    Devuelve:
+        resultados por caso (ver leer_resultados_pushover)
+
+    Nota: en Windows los procesos se crean con 'spawn', por lo que el script
+    que llama a esta función debe protegerse con if __name__ == '__main__':
+    """
+    if casos is None:
+        casos = casos_pushover()
+    nombres = [c['nombre'] for c in casos]
+    if len(set(nombres)) != len(nombres):
+        raise ValueError("Los nombres de los casos deben ser distintos")
+    carpeta = os.path.dirname(ruta_resultados)
+    if carpeta:
+        os.makedirs(carpeta, exist_ok=True)
+    if nproc is None:
+        nproc = os.cpu_count() or 1
+
+    datos = (construir_modelo, casos, opciones)
+    if nproc > 1:
+        with ProcessPoolExecutor(max_workers=min(nproc, len(casos)), initializer=_iniciar_trabajador,
+                                 initargs=datos) as pool:
+            resultados = list(pool.map(_ejecutar_caso, casos))
+    else:
+        _iniciar_trabajador(*datos)
+        resultados = [_ejecutar_caso(c) for c in casos]
+        ops.wipe()
+
+    _guardar(ruta_resultados, resultados)
+    return leer_resultados_pushover(ruta_resultados)
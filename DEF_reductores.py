@@ -0,0 +1,146 @@
+import numpy as np
+
+
+def iniciar_reductores(x0, t0=0.0):
+    """
+    Estado de los reductores en línea de varios canales: se actualizan por
+    bloques de muestras con actualizar_reductores() y guardan solo los
+    acumulados (memoria constante por canal, sin historias).
+
+    Parámetros:
+        x0 : valores de los canales al inicio del análisis (n_canales,);
+             entran en las integrales y en los cruces por cero, pero no en
+             los máximos, que son los de las muestras tras cada paso como
+             np.max(np.abs(ustep)) en los scripts
+        t0 : instante inicial
+
+    Devuelve:
+        estado : diccionario para actualizar_reductores() y resultados_reductores()
+    """
+    x0 = np.atleast_1d(np.asarray(x0, dtype=float))
+    n = x0.size
+    return {
+        't0': float(t0), 't': float(t0), 'x': x0.copy(), 'n': 0,
+        'max': np.full(n, -np.inf), 't_max': np.full(n, np.nan),
+        'min': np.full(n, np.inf), 't_min': np.full(n, np.nan),
+        'pico': np.zeros(n), 't_pico': np.full(n, np.nan),
+        'integral_cuadrado': np.zeros(n), 'integral_abs': np.zeros(n),
+        'cruces': np.zeros(n, dtype=int), 'signo': np.sign(x0),
+    }
+
+
+def actualizar_reductores(estado, t, X):
+    """
+    Añade un bloque de muestras a los reductores.
+
+    Parámetros:
+        t : instantes de las muestras (m,)
+        X : valores de los canales, np.ndarray de forma (m, n_canales)
+    """
+    t = np.atleast_1d(np.asarray(t, dtype=float))
+    X = np.asarray(X, dtype=float).reshape(t.size, -1)
+    if t.size == 0:
+        return
+    columnas = np.arange(X.shape[1])
+
+    # Máximo, mínimo y máximo absoluto con el instante en que se alcanzan
+    # (la primera vez, como np.argmax)
+    for nombre, valores, mayor in (('max', X, True), ('min', X, False), ('pico', np.abs(X), True)):
+        k = np.argmax(valores, axis=0) if mayor else np.argmin(valores, axis=0)
+        extremo = valores[k, columnas]
+        mejora = extremo > estado[nombre] if mayor else extremo < estado[nombre]
+        estado[nombre] = np.where(mejora, extremo, estado[nombre])
+        estado['t_' + nombre] = np.where(mejora, t[k], estado['t_' + nombre])
+
+    # Integrales por la regla del trapecio, enlazando con la última muestra
+    # del bloque anterior
+    tt = np.concatenate(([estado['t']], t))
+    XX = np.vstack((estado['x'], X))
+    h = np.diff(tt)[:, None]
+    estado['integral_cuadrado'] += np.sum(0.5*h*(XX[:-1]**2 + XX[1:]**2), axis=0)
+    estado['integral_abs'] += np.sum(0.5*h*(np.abs(XX[:-1]) + np.abs(XX[1:])), axis=0)
+
+    # Cruces por cero: cambios de signo, saltando las muestras nulas (cada
+    # cero toma el signo de la última muestra no nula)
+    S = np.vstack((estado['signo'], np.sign(X)))
+    ultimo = np.where(S != 0, np.arange(S.shape[0])[:, None], 0)
+    np.maximum.accumulate(ultimo, axis=0, out=ultimo)
+    S = np.take_along_axis(S, ultimo, axis=0)
+    estado['cruces'] += np.sum(S[1:]*S[:-1] < 0, axis=0)
+    estado['signo'] = S[-1]
+
+    estado['t'] = float(t[-1])
+    estado['x'] = X[-1].copy()
+    estado['n'] += t.size
+
+
+def resultados_reductores(estado):
+    """
+    Medidas de cada canal hasta la última muestra.
+
+    Devuelve:
+        diccionario de np.ndarray (n_canales,) con
+            'max', 't_max', 'min', 't_min'  : extremos y su instante
+            'pico', 't_pico'                : máximo de |x| y su instante
+            'rms'                           : sqrt(int(x² dt)/duración)
+            'integral_cuadrado'             : int(x² dt) (con la aceleración
+                                              del terreno, la intensidad de
+                                              Arias es pi/(2g) por este valor)
+            'integral_abs'                  : int(|x| dt) (velocidad absoluta
+                                              acumulada, CAV, con aceleraciones)
+            'residual'                      : último valor
+            'cruces'                        : nº de cruces por cero
+        y 'pasos' (nº de muestras)
+    """
+    duracion = estado['t'] - estado['t0']
+    resultado = {k: estado[k].copy() for k in ('max', 't_max', 'min', 't_min', 'pico', 't_pico',
+                                               'integral_cuadrado', 'integral_abs', 'cruces')}
+    resultado['rms'] = np.sqrt(estado['integral_cuadrado']/duracion) if duracion > 0 else np.abs(estado['x'])
+    resultado['residual'] = estado['x'].copy()
+    resultado['pasos'] = estado['n']
+    return resultado
+
+
+def iniciar_energia_entrada(ag, M=1.0, dt=1.0):
+    """
+    Reductor en línea de la energía de entrada de una excitación
+    UniformExcitation, E(t) = -int(ag M v dt), por la regla del trapecio, y
+    de su máximo, sin guardar la historia de velocidades. Sigue la
+    convención de los scripts de espectros: la muestra k de la velocidad
+    (la de después del paso k+1) se asocia a ag[k] y la integral empieza
+    con E = 0 en la primera muestra.
+
+    Parámetros:
+        ag : aceleración del terreno (Nsteps,) (fuera del registro se toma 0)
+        M  : masa excitada
+        dt : paso de tiempo de las muestras
+
+    Devuelve:
+        estado : diccionario para actualizar_energia_entrada(); 'energia' es
+                 la energía de entrada en la última muestra y 'max' su máximo
+    """
+    return {'ag': np.asarray(ag, dtype=float), 'M': float(M), 'dt': float(dt),
+            'k': 0, 'f': None, 'energia': 0.0, 'max': 0.0}
+
+
+def actualizar_energia_entrada(estado, v):
+    """
+    Añade un bloque de muestras de velocidad (m,) a la energía de entrada.
+    """
+    v = np.atleast_1d(np.asarray(v, dtype=float))
+    if v.size == 0:
+        return
+    k = estado['k']
+    ag = np.zeros(v.size)
+    tramo = estado['ag'][k:k + v.size]
+    ag[:tramo.size] = tramo
+    f = -ag*estado['M']*v
+    if estado['f'] is not None:
+        f = np.concatenate(([estado['f']], f))
+    # Suma acumulada desde la energía anterior, en el mismo orden que
+    # cumulative_trapezoid sobre la historia completa
+    E = np.cumsum(np.concatenate(([estado['energia']], estado['dt']*(f[1:] + f[:-1])/2.0)))
+    estado['energia'] = float(E[-1])
+    estado['max'] = max(estado['max'], float(np.max(E)))
+    estado['f'] = f[-1]
+    estado['k'] = k + v.size
@@ -0,0 +1,212 @@
+import numpy as np
+import openseespy.opensees as ops
+
+from DEF_reductores import (iniciar_reductores, actualizar_reductores, resultados_reductores,
+                            iniciar_energia_entrada, actualizar_energia_entrada)
+
+# Magnitudes disponibles para los canales: (quantity, tag, dof, *args)
+#   'disp', 'vel', 'accel'  -> nodeDisp/nodeVel/nodeAccel(tag), dof 1..ndf
+#   'reaction'              -> nodeReaction(tag) tras reactions(), dof 1..ndf
+#   'eleForce'              -> eleForce(tag), componente 1..n
+#   'eleResponse'           -> eleResponse(tag, *args), componente 1..n
+#                              p.ej. ('eleResponse', 1, 1, 'section', 1, 'force')
+#   'loadFactor'            -> getLoadFactor(tag), tag = patrón de carga
+#   'time'                  -> getTime()
+_FUNCIONES = {
+    'disp': ops.nodeDisp,
+    'vel': ops.nodeVel,
+    'accel': ops.nodeAccel,
+    'reaction': ops.nodeReaction,
+    'eleForce': ops.eleForce,
+    'eleResponse': ops.eleResponse,
+}
+
+
+def preparar_canales(canales):
+    """
+    Agrupa los canales por llamada a OpenSees: todos los grados de libertad
+    de un mismo nodo o elemento se obtienen con una única llamada por paso
+    (nodeDisp(tag) devuelve el vector completo del nodo).
+
+    Devuelve:
+        llamadas   : lista de (funcion, argumentos); cada llamada devuelve una lista
+        posiciones : (nº de llamada, índice en su lista) de cada canal
+        nombres    : lista con un nombre legible por canal, p.ej. 'disp_2_1'
+    """
+    claves = []
+    posiciones = []
+    nombres = []
+    for canal in canales:
+        magnitud = canal[0]
+        if magnitud == 'time':
+            clave, indice = ('time',), 0
+        elif magnitud == 'loadFactor':
+            clave, indice = ('loadFactor', canal[1]), 0
+        elif magnitud in _FUNCIONES:
+            clave, indice = (magnitud, canal[1]) + tuple(canal[3:]), canal[2] - 1
+        else:
+            raise ValueError(f"Magnitud desconocida en el canal {canal}")
+        if clave not in claves:
+            claves.append(clave)
+        posiciones.append((claves.index(clave), indice))
+        nombres.append('_'.join(str(c) for c in canal))
+
+    llamadas = []
+    for clave in claves:
+        magnitud = clave[0]
+        if magnitud == 'time':
+            llamadas.append((lambda: [ops.getTime()], ()))
+        elif magnitud == 'loadFactor':
+            llamadas.append((lambda tag: [ops.getLoadFactor(tag)], clave[1:]))
+        else:
+            llamadas.append((_FUNCIONES[magnitud], clave[1:]))
+
+    return llamadas, posiciones, nombres
+
+
+def _orden_columnas(llamadas, posiciones):
+    # Longitud de la lista que devuelve cada llamada (se consulta una vez)
+    inicio = np.cumsum([0] + [len(np.atleast_1d(f(*args))) for f, args in llamadas])
+    return np.array([inicio[g] + k for g, k in posiciones])
+
+
+def registrar_respuesta(canales, Nsteps, dt=None, cada=1, parar_si_falla=True, bloque=1000, al_paso=()):
+    """
+    Ejecuta Nsteps pasos de análisis y guarda la respuesta de todos los
+    canales en una matriz preasignada de forma (pasos, canales).
+
+    canales es una lista declarativa de tuplas (magnitud, tag, dof, ...),
+    p.ej.:
+        [('disp', 2, 1), ('vel', 2, 1), ('accel', 2, 1),
+         ('reaction', 1, 1), ('eleForce', 1, 1), ('loadFactor', 1), ('time',)]
+
+    En cada paso se hace una sola llamada por nodo/elemento y magnitud; las
+    filas se acumulan como listas de Python y se vuelcan a la matriz cada
+    'bloque' pasos, con una única conversión a NumPy por bloque.
+
+    Parámetros:
+        canales         : lista de canales (ver _FUNCIONES)
+        Nsteps          : número de pasos de análisis
+        dt              : paso de tiempo (None para análisis estático)
+        cada            : se guarda un resultado cada 'cada' pasos y se llama
+                          a analyze(cada, dt) entre registros
+        parar_si_falla  : si analyze() no converge se detiene el análisis y
+                          se devuelven solo las filas completadas
+        bloque          : número de filas acumuladas antes de volcarlas
+        al_paso         : funciones sin argumentos que se llaman tras cada
+                          analyze() (p.ej. DEF_energia.actualizar_energia)
+
+    Devuelve:
+        datos   : np.ndarray de forma (Nsteps//cada, len(canales))
+        nombres : nombre de cada columna
+    """
+    llamadas, posiciones, nombres = preparar_canales(canales)
+    npasos = Nsteps//cada
+    datos = np.zeros((npasos, len(canales)))
+
+    i0 = 0
+    for filas in _bloques_respuesta(canales, llamadas, posiciones, npasos, dt, cada, parar_si_falla,
+                                    bloque, al_paso):
+        datos[i0:i0 + len(filas)] = filas
+        i0 += len(filas)
+
+    return datos[:i0], nombres
+
+
+def _leer_fila(llamadas):
+    fila = []
+    for funcion, args in llamadas:
+        fila += funcion(*args)
+    return fila
+
+
+def _bloques_respuesta(canales, llamadas, posiciones, npasos, dt, cada, parar_si_falla, bloque, al_paso):
+    # Bucle de análisis común: da bloques de hasta 'bloque' filas (pasos,
+    # canales) en el orden de los canales
+    hay_reacciones = any(c[0] == 'reaction' for c in canales)
+    if hay_reacciones:
+        ops.reactions()
+    orden = _orden_columnas(llamadas, posiciones)
+    argumentos = (cada,) if dt is None else (cada, dt)
+
+    filas = []
+    for i in range(npasos):
+        ok = ops.analyze(*argumentos)
+        if ok != 0 and parar_si_falla:
+            print(f"El análisis no converge en el paso {i*cada + 1}; se detiene el registro.")
+            break
+        if hay_reacciones:
+            ops.reactions()
+        for funcion in al_paso:
+            funcion()
+
+        filas.append(_leer_fila(llamadas))
+
+        if len(filas) == bloque:
+            yield np.array(filas)[:, orden]
+            filas = []
+
+    if filas:
+        yield np.array(filas)[:, orden]
+
+
+def registrar_envolventes(canales, Nsteps, dt=None, cada=1, historia=(), parar_si_falla=True, bloque=1000,
+                          al_paso=(), entrada=None):
+    """
+    Como registrar_respuesta(), pero en lugar de guardar la historia de
+    todos los canales los reduce en línea (DEF_reductores): máximos y
+    mínimos con su instante, máximo absoluto, RMS, valor residual,
+    integrales de x² y |x| (tipo Arias/CAV) y cruces por cero. La memoria
+    es la de un bloque de filas, independiente de Nsteps; solo se guarda la
+    historia completa de los canales de 'historia'.
+
+    Parámetros:
+        canales  : lista de canales (ver registrar_respuesta())
+        historia : canales de 'canales' cuya historia completa se guarda
+        entrada  : (canal de velocidad de 'canales', ag, M) para reducir
+                   también la energía de entrada -int(ag M v dt) de una
+                   excitación UniformExcitation (DEF_reductores.
+                   iniciar_energia_entrada(), con ag muestreada cada
+                   cada*dt)
+        (el resto como en registrar_respuesta())
+
+    Devuelve:
+        envolventes : diccionario de DEF_reductores.resultados_reductores()
+                      con un valor por canal, más 'nombres' y, con
+                      'entrada', 'energia_entrada' (valor final) y
+                      'energia_entrada_max'
+        historias   : diccionario {nombre del canal: np.ndarray (pasos,)}
+                      con los canales de 'historia' y 'time'
+    """
+    canales = list(canales)
+    historia = [canales.index(c) for c in historia]
+    llamadas, posiciones, nombres = preparar_canales(canales + [('time',)])
+    hay_reacciones = any(c[0] == 'reaction' for c in canales)
+    if hay_reacciones:
+        ops.reactions()
+    fila0 = np.array(_leer_fila(llamadas))[_orden_columnas(llamadas, posiciones)]
+    reductores = iniciar_reductores(fila0[:-1], fila0[-1])
+    if entrada is not None:
+        canal_v, ag, M = entrada
+        canal_v = canales.index(canal_v)
+        energia = iniciar_energia_entrada(ag, M, cada*dt)
+
+    npasos = Nsteps//cada
+    historias = np.zeros((npasos if historia else 0, len(historia) + 1))
+    i0 = 0
+    for filas in _bloques_respuesta(canales, llamadas, posiciones, npasos, dt, cada, parar_si_falla,
+                                    bloque, al_paso):
+        actualizar_reductores(reductores, filas[:, -1], filas[:, :-1])
+        if entrada is not None:
+            actualizar_energia_entrada(energia, filas[:, canal_v])
+        if historia:
+            historias[i0:i0 + len(filas)] = filas[:, historia + [-1]]
+        i0 += len(filas)
+
+    envolventes = resultados_reductores(reductores)
+    envolventes['nombres'] = nombres[:-1]
+    if entrada is not None:
+        envolventes['energia_entrada'] = energia['energia']
+        envolventes['energia_entrada_max'] = energia['max']
+    historias = {nombres[j]: historias[:i0, k] for k, j in enumerate(historia + [-1])} if historia else {}
+    return envolventes, historias
@@ -0,0 +1,137 @@
+import numpy as np
+import openseespy.opensees as ops
+
+from DEF_matrices_dispersas import transformaciones_elementos
+
+
+def cargar_espectro(ruta):
+    """
+    Lee un espectro guardado con np.savez como en 1GDL_EspectroElastico.py
+    (ImperialValley_EspectroL.npz: T, umax, vmax, amax, Emax, Fmax).
+
+    Devuelve:
+        diccionario con un np.ndarray por magnitud
+    """
+    with np.load(ruta) as datos:
+        return {k: datos[k] for k in datos.files}
+
+
+def coeficientes_cqc(omega, amortiguamiento=0.05):
+    """
+    Coeficientes de correlación modal de la CQC (Der Kiureghian, 1981) para
+    un mismo amortiguamiento en todos los modos:
+        rho_ij = 8 xi² (1 + b) b^1.5 / ((1 - b²)² + 4 xi² b (1 + b)²),
+    con b = omega_j/omega_i.
+
+    Devuelve:
+        rho : np.ndarray (n_modos, n_modos)
+    """
+    omega = np.asarray(omega, dtype=float)
+    b = omega[None, :]/omega[:, None]
+    xi2 = amortiguamiento**2
+    return 8*xi2*(1 + b)*b**1.5/((1 - b**2)**2 + 4*xi2*b*(1 + b)**2)
+
+
+def combinar_modos(R, omega, metodo='CQC', amortiguamiento=0.05):
+    """
+    Combina las respuestas máximas de cada modo, R (n_modos, ...), con SRSS
+    (raíz de la suma de cuadrados) o CQC (combinación cuadrática completa),
+    para todas las magnitudes a la vez.
+
+    Devuelve:
+        np.ndarray (...) con la respuesta combinada
+    """
+    R = np.asarray(R, dtype=float)
+    if metodo == 'SRSS':
+        return np.sqrt(np.sum(R**2, axis=0))
+    if metodo != 'CQC':
+        raise ValueError("metodo debe ser 'SRSS' o 'CQC'")
+    rho = coeficientes_cqc(omega, amortiguamiento)
+    return np.sqrt(np.maximum(np.einsum('i...,ij,j...->...', R, rho, R), 0.0))
+
+
+def _masas_gdl(mapa):
+    # Masa nodal de cada gdl (nudo, gdl) de mapa
+    masas = {}
+    return np.array([masas.setdefault(nd, ops.nodeMass(int(nd)))[g - 1] for nd, g in mapa.tolist()])
+
+
+def analisis_rsa(modal, T_espectro, Sd_espectro, dof=1, metodo='CQC', amortiguamiento=0.05,
+                 nodos_control=None, alturas=None, elementos=None):
+    """
+    Análisis modal espectral del modelo definido en OpenSees con los modos
+    de DEF_modal.analisis_modal() y un espectro de desplazamientos (p.ej. la
+    columna umax del .npz de 1GDL_EspectroElastico.py) en la dirección dof.
+
+    Para cada modo n: Gamma_n = phi_n' M r / phi_n' M phi_n, Sd_n se
+    interpola en el espectro en T_n y la respuesta máxima es
+    u_n = Gamma_n Sd_n phi_n. Las magnitudes derivadas (desplazamientos de
+    planta, derivas, fuerzas de los elementos, cortante en la base) se
+    calculan modo a modo y después se combinan con SRSS o CQC.
+
+    Parámetros:
+        modal           : resultado de DEF_modal.analisis_modal()
+        T_espectro      : periodos del espectro
+        Sd_espectro     : desplazamiento espectral en cada periodo (en las
+                          unidades del modelo)
+        metodo          : 'CQC' o 'SRSS'
+        amortiguamiento : amortiguamiento de los coeficientes de la CQC
+        nodos_control   : nudos de la base y de cada planta (como
+                          info['nodos_control'] de construir_portico_ejemplo)
+        alturas         : altura de cada planta, para las derivas
+        elementos       : tags de los elementos viga-columna cuyas fuerzas
+                          se calculan (None -> ninguno)
+
+    Devuelve:
+        diccionario con
+            'periodos', 'Sd', 'participacion' (Gamma), 'masa_efectiva' (n_modos,)
+            'desplazamientos' : (n_gdl,) en el orden de modal['mapa']
+            'cortante_base'   : cortante en la base en la dirección dof
+            'desp_plantas'    : (n_plantas + 1,) si hay nodos_control
+            'derivas'         : (n_plantas,) si además hay alturas
+            'elementos', 'fuerzas' : tags (ne,) y fuerzas básicas (ne, nb)
+                              ([N, Mz_i, Mz_j, My_i, My_j, T] en 3D) si hay
+                              elementos
+            'modales'         : las mismas magnitudes de cada modo, sin
+                                combinar (con signo)
+    """
+    mapa = np.asarray(modal['mapa'])
+    phi = np.asarray(modal['autovectores'])
+    omega = np.sqrt(np.asarray(modal['Lambda'], dtype=float))
+    periodos = 2*np.pi/omega
+    masas = _masas_gdl(mapa)
+    r = (mapa[:, 1] == dof).astype(float)
+
+    phiM = phi*masas
+    L = phiM @ r
+    Gamma = L/np.sum(phiM*phi, axis=1)
+    Sd = np.interp(periodos, T_espectro, Sd_espectro)
+    q = Gamma*Sd
+
+    modales = {'desplazamientos': q[:, None]*phi,
+               'cortante_base': Gamma*L*omega**2*Sd}
+    if nodos_control is not None:
+        fila = {(nd, g): i for i, (nd, g) in enumerate(mapa.tolist())}
+        indices = [fila[(int(nd), dof)] for nd in nodos_control]
+        modales['desp_plantas'] = modales['desplazamientos'][:, indices]
+        if alturas is not None:
+            modales['derivas'] = np.diff(modales['desp_plantas'], axis=1)/np.asarray(alturas, dtype=float)
+    if elementos is not None:
+        inicio = {}
+        for i, nd in enumerate(mapa[:, 0].tolist()):
+            inicio.setdefault(nd, i)
+        tags, fuerzas = [], []
+        for g in transformaciones_elementos(inicio, elementos):
+            u_e = modales['desplazamientos'][:, g['gdl']]
+            fuerzas.append(np.einsum('ebc,ecd,ned->neb', g['kb'], g['Ag'], u_e))
+            tags.append(g['tags'])
+        modales['fuerzas'] = np.concatenate(fuerzas, axis=1)
+        elementos = np.concatenate(tags)
+
+    resultado = {'periodos': periodos, 'Sd': Sd, 'participacion': Gamma, 'masa_efectiva': Gamma*L,
+                 'modales': modales}
+    for clave, valor in modales.items():
+        resultado[clave] = combinar_modos(valor, omega, metodo, amortiguamiento)
+    if elementos is not None:
+        resultado['elementos'] = elementos
+    return resultado
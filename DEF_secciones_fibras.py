@@ -0,0 +1,299 @@
+import os
+import hashlib
+
+import numpy as np
+import openseespy.opensees as ops
+
+# Carpeta por defecto para la caché (.npy) de las secciones malladas
+DIR_CACHE_SECCIONES = os.environ.get('SECCIONES_CACHE_DIR',
+                                     os.path.join(os.path.expanduser('~'), '.cache', 'secciones_fibras'))
+
+# Perfiles en doble T: h, b, tw, tf, r [mm]
+PERFILES_I = {
+    'IPE80': (80, 46, 3.8, 5.2, 5), 'IPE100': (100, 55, 4.1, 5.7, 7), 'IPE120': (120, 64, 4.4, 6.3, 7),
+    'IPE140': (140, 73, 4.7, 6.9, 7), 'IPE160': (160, 82, 5.0, 7.4, 9), 'IPE180': (180, 91, 5.3, 8.0, 9),
+    'IPE200': (200, 100, 5.6, 8.5, 12), 'IPE220': (220, 110, 5.9, 9.2, 12), 'IPE240': (240, 120, 6.2, 9.8, 15),
+    'IPE270': (270, 135, 6.6, 10.2, 15), 'IPE300': (300, 150, 7.1, 10.7, 15), 'IPE330': (330, 160, 7.5, 11.5, 18),
+    'IPE360': (360, 170, 8.0, 12.7, 18), 'IPE400': (400, 180, 8.6, 13.5, 21), 'IPE450': (450, 190, 9.4, 14.6, 21),
+    'IPE500': (500, 200, 10.2, 16.0, 21), 'IPE550': (550, 210, 11.1, 17.2, 24), 'IPE600': (600, 220, 12.0, 19.0, 24),
+    'HEA100': (96, 100, 5.0, 8.0, 12), 'HEA120': (114, 120, 5.0, 8.0, 12), 'HEA140': (133, 140, 5.5, 8.5, 12),
+    'HEA160': (152, 160, 6.0, 9.0, 15), 'HEA180': (171, 180, 6.0, 9.5, 15), 'HEA200': (190, 200, 6.5, 10.0, 18),
+    'HEA220': (210, 220, 7.0, 11.0, 18), 'HEA240': (230, 240, 7.5, 12.0, 21), 'HEA260': (250, 260, 7.5, 12.5, 24),
+    'HEA280': (270, 280, 8.0, 13.0, 24), 'HEA300': (290, 300, 8.5, 14.0, 27), 'HEA320': (310, 300, 9.0, 15.5, 27),
+    'HEA340': (330, 300, 9.5, 16.5, 27), 'HEA360': (350, 300, 10.0, 17.5, 27), 'HEA400': (390, 300, 11.0, 19.0, 27),
+    'HEA450': (440, 300, 11.5, 21.0, 27), 'HEA500': (490, 300, 12.0, 23.0, 27),
+    'HEB100': (100, 100, 6.0, 10.0, 12), 'HEB120': (120, 120, 6.5, 11.0, 12), 'HEB140': (140, 140, 7.0, 12.0, 12),
+    'HEB160': (160, 160, 8.0, 13.0, 15), 'HEB180': (180, 180, 8.5, 14.0, 15), 'HEB200': (200, 200, 9.0, 15.0, 18),
+    'HEB220': (220, 220, 9.5, 16.0, 18), 'HEB240': (240, 240, 10.0, 17.0, 21), 'HEB260': (260, 260, 10.0, 17.5, 24),
+    'HEB280': (280, 280, 10.5, 18.0, 24), 'HEB300': (300, 300, 11.0, 19.0, 27), 'HEB320': (320, 300, 11.5, 20.5, 27),
+    'HEB340': (340, 300, 12.0, 21.5, 27), 'HEB360': (360, 300, 12.5, 22.5, 27), 'HEB400': (400, 300, 13.5, 24.0, 27),
+    'HEB450': (450, 300, 14.0, 26.0, 27), 'HEB500': (500, 300, 14.5, 28.0, 27),
+}
+
+# Versión del mallador: forma parte de la clave de caché, de modo que un
+# cambio en la forma de mallar invalida las mallas guardadas
+VERSION_MALLA = 1
+
+# Secciones ya malladas en este proceso
+_SECCIONES = {}
+
+
+def _rectangulo(y0, z0, y1, z1, ny, nz, matTag):
+    # Fibras de patch('rect', matTag, ny, nz, y0, z0, y1, z1): centro y área de cada celda
+    dy = (y1 - y0)/ny
+    dz = (z1 - z0)/nz
+    y, z = np.meshgrid(y0 + dy*(np.arange(ny) + 0.5), z0 + dz*(np.arange(nz) + 0.5), indexing='ij')
+    return np.column_stack((y.ravel(), z.ravel(), np.full(y.size, dy*dz), np.full(y.size, matTag)))
+
+
+def mallar_perfil_i(h, b, tw, tf, r, matTag, nfy=20, nfz=2, nwy=2, nwz=40):
+    """
+    Malla de fibras de un perfil en doble T (IPE, HEA, HEB): alas de nfy x nfz
+    fibras, alma de nwy x nwz fibras y una fibra por acuerdo alma-ala, como
+    en los scripts (eje y a lo ancho del ala, eje z en el canto).
+
+    Devuelve:
+        fibras : np.ndarray (n, 4) con columnas y, z, área, matTag
+    """
+    A = ((2*r)**2 - np.pi*r**2)/4  # área de cada acuerdo
+    yr = tw/2 + r/3
+    zr = h/2 - tf - r/3
+    acuerdos = np.array([[yr, zr, A, matTag], [-yr, zr, A, matTag],
+                         [yr, -zr, A, matTag], [-yr, -zr, A, matTag]], dtype=float)
+    return np.concatenate((
+        _rectangulo(-b/2, h/2 - tf, b/2, h/2, nfy, nfz, matTag),      # Ala sup
+        _rectangulo(-tw/2, -h/2 + tf, tw/2, h/2 - tf, nwy, nwz, matTag),  # Alma
+        _rectangulo(-b/2, -h/2, b/2, -h/2 + tf, nfy, nfz, matTag),     # Ala inf
+        acuerdos))
+
+
+def mallar_cajon(h, b, t, matTag, nb=10, nh=10, nt=2):
+    """
+    Malla de fibras de un perfil tubular rectangular (cajón) de canto h,
+    ancho b y espesor t: alas de nb x nt fibras y almas de nt x nh fibras.
+
+    Devuelve:
+        fibras : np.ndarray (n, 4) con columnas y, z, área, matTag
+    """
+    return np.concatenate((
+        _rectangulo(-b/2, h/2 - t, b/2, h/2, nb, nt, matTag),
+        _rectangulo(-b/2, -h/2, b/2, -h/2 + t, nb, nt, matTag),
+        _rectangulo(-b/2, -h/2 + t, -b/2 + t, h/2 - t, nt, nh, matTag),
+        _rectangulo(b/2 - t, -h/2 + t, b/2, h/2 - t, nt, nh, matTag)))
+
+
+def mallar_circular(D, t, matTag, nr=4, nc=16):
+    """
+    Malla de fibras de una sección circular maciza (t=None) o tubular de
+    diámetro D y espesor t: nr anillos y nc sectores. Cada fibra se sitúa en
+    el centro de gravedad de su sector de corona.
+
+    Devuelve:
+        fibras : np.ndarray (n, 4) con columnas y, z, área, matTag
+    """
+    re = D/2
+    ri = 0.0 if t is None else re - t
+    radios = np.linspace(ri, re, nr + 1)
+    r0, r1 = radios[:-1], radios[1:]
+    dtheta = 2*np.pi/nc
+    theta = dtheta*(np.arange(nc) + 0.5)
+    area = dtheta/2*(r1**2 - r0**2)
+    rg = 2/3*(r1**3 - r0**3)/(r1**2 - r0**2)*np.sin(dtheta/2)/(dtheta/2)
+    y = np.outer(rg, np.cos(theta)).ravel()
+    z = np.outer(rg, np.sin(theta)).ravel()
+    return np.column_stack((y, z, np.repeat(area, nc), np.full(y.size, matTag)))
+
+
+def _mallar(perfil, matTag, malla):
+    if isinstance(perfil, str):
+        if perfil not in PERFILES_I:
+            raise ValueError(f"Perfil desconocido: {perfil}")
+        return mallar_perfil_i(*PERFILES_I[perfil], matTag, **malla)
+    tipo, *dimensiones = perfil
+    if tipo == 'cajon':
+        return mallar_cajon(*dimensiones, matTag, **malla)
+    if tipo == 'circular':
+        D, t = (dimensiones + [None])[:2]
+        return mallar_circular(D, t, matTag, **malla)
+    raise ValueError(f"Tipo de sección desconocido: {tipo}")
+
+
+def seccion_fibras(perfil, matTag=2, cache=True, dir_cache=None, **malla):
+    """
+    Devuelve la malla de fibras de un perfil, guardada en caché por perfil,
+    material y densidad de malla.
+
+    perfil puede ser:
+        'IPE200', 'HEA300', 'HEB400'...  (ver PERFILES_I)
+        ('cajon', h, b, t)
+        ('circular', D) o ('circular', D, t)
+    y malla son los argumentos de densidad de mallar_perfil_i(),
+    mallar_cajon() o mallar_circular() (p.ej. nfy=10, nwz=20).
+
+    Con cache=True la malla se guarda en dir_cache (por defecto
+    DIR_CACHE_SECCIONES, o la variable de entorno SECCIONES_CACHE_DIR) como
+    un archivo .npy y además en memoria durante el proceso.
+
+    Devuelve:
+        fibras : np.ndarray (n, 4) de solo lectura con columnas y, z, área, matTag
+    """
+    clave = repr((VERSION_MALLA, perfil if isinstance(perfil, str) else tuple(perfil), matTag,
+                  sorted(malla.items())))
+    if cache and clave in _SECCIONES:
+        return _SECCIONES[clave]
+
+    ruta = None
+    fibras = None
+    if cache:
+        if dir_cache is None:
+            dir_cache = DIR_CACHE_SECCIONES
+        ruta = os.path.join(dir_cache, hashlib.sha1(clave.encode()).hexdigest() + '.npy')
+        try:
+            fibras = np.load(ruta)
+        except (OSError, ValueError):
+            fibras = None
+
+    if fibras is None:
+        fibras = _mallar(perfil, matTag, malla)
+        if cache:
+            os.makedirs(dir_cache, exist_ok=True)
+            temporal = ruta + f'.{os.getpid()}.tmp'
+            with open(temporal, 'wb') as f:
+                np.save(f, fibras)
+            os.replace(temporal, ruta)
+
+    fibras.setflags(write=False)
+    if cache:
+        _SECCIONES[clave] = fibras
+    return fibras
+
+
+def definir_seccion_fibras(secTag, fibras, GJ=1e12):
+    """
+    Define section('Fiber', secTag, '-GJ', GJ) con todas las fibras de un
+    array (n, 4) de seccion_fibras(). Las filas se convierten a listas de
+    Python una sola vez y cada fibra se pasa directamente a fiber().
+    """
+    ops.section('Fiber', secTag, '-GJ', GJ)
+    for y, z, A, matTag in fibras.tolist():
+        ops.fiber(y, z, A, int(matTag))
+
+
+def propiedades_fibras(fibras):
+    """
+    Área y momentos de inercia (respecto a los ejes y, z de la sección) de
+    una malla de fibras.
+
+    Devuelve:
+        A, Iy, Iz  (Iy = suma de A*z^2, flexión en el canto)
+    """
+    y, z, A = fibras[:, 0], fibras[:, 1], fibras[:, 2]
+    return A.sum(), np.sum(A*z**2), np.sum(A*y**2)
+
+
+def momento_curvatura(fibras, curvatura_max, P=0.0, eje='y', npasos=100, GJ=1e12, definir_materiales=None):
+    """
+    Diagrama momento-curvatura de una sección de fibras con un elemento
+    zeroLengthSection: primero se aplica el axil P (negativo en compresión)
+    y después se impone la curvatura con DisplacementControl hasta
+    curvatura_max en npasos pasos.
+
+    eje='y' es la flexión en el canto (My, fibras repartidas en z) y eje='z'
+    la flexión lateral (Mz). definir_materiales() define los uniaxialMaterial
+    de las fibras (por defecto los de DEF_portico3d.definir_materiales_acero).
+    El modelo de OpenSees se borra (wipe) al empezar y al terminar.
+
+    Devuelve:
+        curvaturas : np.ndarray (npasos+1,)
+        momentos   : np.ndarray (npasos+1,); tras un fallo de convergencia
+                     los valores restantes quedan como NaN (todos si la
+                     sección no resiste el axil P)
+    """
+    if definir_materiales is None:
+        from DEF_portico3d import definir_materiales_acero
+        definir_materiales = definir_materiales_acero
+    dof = 5 if eje == 'y' else 6
+
+    ops.wipe()
+    ops.model('basic', '-ndm', 3, '-ndf', 6)
+    definir_materiales()
+    definir_seccion_fibras(1, fibras, GJ)
+    ops.node(1, 0.0, 0.0, 0.0)
+    ops.node(2, 0.0, 0.0, 0.0)
+    ops.fix(1, 1, 1, 1, 1, 1, 1)
+    ops.fix(2, 0, 1, 1, 1, int(dof != 5), int(dof != 6))
+    ops.element('zeroLengthSection', 1, 1, 2, 1)
+
+    curvaturas = np.linspace(0.0, curvatura_max, npasos + 1)
+    momentos = np.full(npasos + 1, np.nan)
+
+    # Axil en 10 incrementos; si la sección no lo resiste no hay diagrama
+    ops.timeSeries('Linear', 1)
+    ops.pattern('Plain', 1, 1)
+    ops.load(2, P, 0.0, 0.0, 0.0, 0.0, 0.0)
+    ops.system('BandGeneral')
+    ops.numberer('Plain')
+    ops.constraints('Plain')
+    ops.test('NormUnbalance', 1e-9*max(1.0, abs(P)), 50)
+    ops.algorithm('Newton')
+    ops.integrator('LoadControl', 0.1)
+    ops.analysis('Static')
+    if ops.analyze(10) != 0:
+        ops.wipe()
+        return curvaturas, momentos
+    ops.loadConst('-time', 0.0)
+
+    ops.timeSeries('Linear', 2)
+    ops.pattern('Plain', 2, 2)
+    carga = [0.0]*6
+    carga[dof - 1] = 1.0
+    ops.load(2, *carga)
+    ops.integrator('DisplacementControl', 2, dof, curvatura_max/npasos)
+    ops.test('NormDispIncr', 1e-12, 50)
+
+    momentos[0] = 0.0
+    for i in range(1, npasos + 1):
+        if ops.analyze(1) != 0:
+            break
+        momentos[i] = ops.getLoadFactor(2)
+
+    ops.wipe()
+    return curvaturas, momentos
+
+
+def convergencia_malla(perfil, mallas, curvatura_max, tol=0.01, P=0.0, eje='y', matTag=2,
+                       npasos=100, definir_materiales=None):
+    """
+    Error del diagrama momento-curvatura en función del número de fibras.
+
+    mallas es una lista de diccionarios de densidad de malla (p.ej.
+    [{'nfy': 4, 'nfz': 1, 'nwy': 1, 'nwz': 8}, ...]); la última se toma como
+    referencia. El error de cada malla es max|M - M_ref| / max|M_ref| sobre
+    toda la curva. Se imprime la tabla y se elige la malla más barata (con
+    menos fibras) cuyo error no supera tol.
+
+    Devuelve:
+        diccionario con 'fibras' (nº de fibras de cada malla), 'error',
+        'curvaturas', 'momentos' (una fila por malla) y 'malla_optima'
+    """
+    n_fibras = []
+    momentos = []
+    for malla in mallas:
+        fibras = seccion_fibras(perfil, matTag, **malla)
+        curvaturas, M = momento_curvatura(fibras, curvatura_max, P, eje, npasos,
+                                          definir_materiales=definir_materiales)
+        n_fibras.append(len(fibras))
+        momentos.append(M)
+    momentos = np.array(momentos)
+    referencia = momentos[-1]
+    error = np.nanmax(np.abs(momentos - referencia), axis=1)/np.nanmax(np.abs(referencia))
+
+    validas = [k for k in range(len(mallas)) if error[k] <= tol]
+    optima = min(validas, key=lambda k: n_fibras[k])
+
+    for k, malla in enumerate(mallas):
+        marca = '  <-' if k == optima else ''
+        print("{:5d} fibras  error {:.3e}  {}{}".format(n_fibras[k], error[k], malla, marca))
+
+    return {'fibras': np.array(n_fibras), 'error': error, 'curvaturas': curvaturas,
+            'momentos': momentos, 'malla_optima': mallas[optima]}
@@ -28,25 +28,14 @@ pi = np.pi
 M = 2.0 # masa del sistema
 xi = 0.05 # amortiguamiento (5%)
 # ===== FUNCIONES AUXILIARES =====
-def leer_registro_peer(filepath):
-    """Lee un archivo PEER .AT2 y devuelve un array con aceleraciones en g."""
-    vals = []
-    with open(filepath, 'r') as f:
-        for line in f:
-            try:
-                nums = [float(x) for x in line.strip().split()]
-                vals.extend(nums)
-            except:
-                continue
-    return np.array(vals, dtype=float)
+from DEF_leer_registro_peer import leer_registro_peer
 
 # ===== CONFIGURACIÓN DEL REGISTRO =====
 filePath = 'RSN1100_KOBE_ABN000.AT2'
 if not os.path.isfile(filePath):
     raise FileNotFoundError(" No se encontró el archivo del sismo en el directorio actual.")
 # Leer aceleraciones del terreno
-ag_g = leer_registro_peer(filePath) # en g
-dt = 0.005 # paso de tiempo del registro (según el encabezado)
+N, dt, ag_g = leer_registro_peer(filePath) # en g; dt según el encabezado
 ag = ag_g * g # convertir a mm/s²
 N = len(ag)
 t = np.arange(0, N * dt, dt)
@@ -10,7 +10,6 @@ print("Análisis Dinámico - 1 GDL")
 from openseespy.opensees import *
 import numpy as np
 import matplotlib.pyplot as plt
-import re
 
 
 # Definición del modelo: 1 dimensión (x), 1 GDL por nodo (desplazamiento)
@@ -26,50 +25,11 @@ m = 2.0     # masa en toneladas
 filePath = 'RSN1100_KOBE_ABN000.AT2'  # archivo de aceleración
 
 
-def leer_archivo_sismico(ruta_archivo):
-    """
-    Lee un archivo con un encabezado de 4 filas. De la cuarta fila obtiene el númeor correspondiente a NTPS y DT
-    La funcion devuelve un vector columna con los datos desde la fila 5 y la variale NTPS y DT de la cuarta fila
-    """
-    
-    npts=0
-    dt=0.0
-    datos_aceleracion_lista=[]
-    with open(ruta_archivo, 'r') as f:
-        
-        #Saltar las primeras 3 líneas
-        f.readline()
-        f.readline()
-        f.readline()
-        
-        #Leer la 4 línea
-        linea_metadatos = f.readline()
-        
-        #Encontrar valores
-        match_npts=re.search(r'NPTS=\s*(\d+)', linea_metadatos)
-        match_dt=re.search(r'DT=\s*([\d\.]+)', linea_metadatos)
-        
-        #Guardo las variables
-        npts=int(match_npts.group(1))
-        dt=float(match_dt.group(1))
-        
-        #Leer el resto del archivo
-        datos_completos_str = f.read()
-        
-        #Obtengo todos los valores de aceleración en una lista
-        lista_valores_str = datos_completos_str.split()
-        
-        #Convierto los datos a float y los guardo
-        datos_aceleracion_lista = [float(valor) for valor in lista_valores_str]
-
-        #Conierto la lista en un array
-        aceleraciones_vector = np.array(datos_aceleracion_lista, dtype=float)
-
-    return npts, dt, aceleraciones_vector
-#Fin de la funcion
+# DEFINITIONS:
+from DEF_leer_registro_peer import leer_registro_peer
  
 # Cargar el registro sísmico desde el archivo .AT2
-Nsteps, dt, acel = leer_archivo_sismico(filePath)
+Nsteps, dt, acel = leer_registro_peer(filePath)
 
 
 dp=0.03
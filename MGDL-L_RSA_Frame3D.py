@@ -0,0 +1,58 @@
+##################################################################
+##
+##                      Modelo de M-GDL
+##
+##  Análisis modal espectral (RSA) del pórtico 3D con el espectro
+##  elástico de 1GDL_EspectroElastico.py
+##
+## Autor - Nombre y apellidos.
+## Fecha - XX/XX/2025
+##################################################################
+
+print("=========================================================")
+print("Análisis modal espectral - Pórtico 3D")
+
+# PYTHON LIBRERIES:
+import numpy as np
+import matplotlib.pyplot as plt
+import time
+
+# DEFINITIONS:
+from DEF_portico3d import construir_portico_ejemplo
+from DEF_modal import analisis_modal
+from DEF_rsa import cargar_espectro, analisis_rsa
+
+tic = time.time()     # empieza el cronómetro
+
+# MODEL: pórtico de MGDL-NL_UnfExc_Frame3D.py
+info = construir_portico_ejemplo()
+
+# Modos (de la caché de DEF_modal si el modelo no ha cambiado)
+numEigenvalues=6
+modal=analisis_modal(numEigenvalues)
+print("Periodos:", modal['periodos'])
+
+# Espectro de desplazamientos guardado por 1GDL_EspectroElastico.py [mm]
+espectro=cargar_espectro("ImperialValley_EspectroL.npz")
+
+dof=1
+R=analisis_rsa(modal, espectro['T'], espectro['umax'], dof=dof, metodo='CQC', amortiguamiento=0.05,
+               nodos_control=info['nodos_control'], alturas=info['alturas'],
+               elementos=info['columnas_base'])
+
+print("Masa efectiva por modo:", R['masa_efectiva'])
+print("Desplazamientos de planta [mm]:", R['desp_plantas'])
+print("Derivas de entrepiso:", R['derivas'])
+print("Cortante en la base [kN]:", R['cortante_base']*1e-3)
+print("Axil y momentos de las columnas de la base [N, N·mm]:")
+for tag, q in zip(R['elementos'], R['fuerzas']):
+    print(tag, q)
+
+toc = time.time()     # termina el cronómetro
+print("Tiempo transcurrido: {:.4f} s".format(toc - tic))
+
+plt.plot(R['desp_plantas'], np.concatenate(([0], np.cumsum(info['alturas']))), 'o-')
+plt.title('RSA - Desplazamientos de planta')
+plt.xlabel('Desplazamiento [mm]')
+plt.ylabel('Altura [mm]')
+plt.show()
@@ -24,6 +24,7 @@ wipe() # Limpia los objetos y archivos de salida del interprete
 	
 # DEFINITIONS:
 from DEF_leer_registro_peer import leer_registro_peer
+from DEF_secciones_fibras import seccion_fibras, definir_seccion_fibras
 
 # CONSTANTS VALUES:
 g = 9810; # Aceleración de la gravedad en mm/s^2
@@ -68,15 +69,9 @@ tw=5.6
 tf=8.5
 r=12
 A=((2*r)**2-pi*r**2)/4
-section('Fiber', secTag, '-GJ', GJ)
-patch('rect', matTag2, numSubdivY, numSubdivZ, -b/2,h/2-tf, b/2,h/2) # Ala sup
-patch('rect', matTag2, numSubdivZ, numSubdivY*2, -tw/2,-h/2+tf, tw/2,h/2-tf) # Alma
-patch('rect', matTag2, numSubdivY, numSubdivZ, -b/2,-h/2, b/2,-h/2+tf) # Ala inf
-
-fiber(tw/2+r/3, h/2-tf-r/3, A, matTag2)
-fiber(-(tw/2+r/3), h/2-tf-r/3, A, matTag2)
-fiber(tw/2+r/3, -(h/2-tf-r/3), A, matTag2)
-fiber(-(tw/2+r/3),-(h/2-tf-r/3), A, matTag2)
+# Alas numSubdivY x numSubdivZ, alma numSubdivZ x numSubdivY*2 y una fibra por acuerdo alma-ala
+fibras = seccion_fibras('IPE200', matTag2, nfy=numSubdivY, nfz=numSubdivZ, nwy=numSubdivZ, nwz=numSubdivY*2)
+definir_seccion_fibras(secTag, fibras, GJ)
 
 # TIME SERIES:
 tagTS=3
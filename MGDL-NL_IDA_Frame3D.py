@@ -0,0 +1,50 @@
+##################################################################
+## 
+##                      Modelo de M-GDL
+## 
+##  Análisis dinámico incremental (IDA) del pórtico 3D
+##
+## Autor - Nombre y apellidos.
+## Fecha - XX/XX/2025
+##################################################################
+
+# PYTHON LIBRERIES:
+import numpy as np
+import matplotlib.pyplot as plt
+import time
+
+# DEFINITIONS:
+from DEF_ida import ida_malla, ida_hunt_fill
+
+# Protección necesaria para los procesos de trabajo (multiprocessing en Windows)
+if __name__ == '__main__':
+
+    print("=========================================================")
+    print("IDA - Pórtico 3D")
+
+    tic = time.time()     # empieza el cronómetro
+
+    # Registros PEER
+    registros=['Imperial Valley/RSN6_IMPVALL.I_I-ELC180.AT2',
+               'Kobe/RSN1100_KOBE_ABN000.AT2',
+               'Northridge/RSN942_NORTHR_ALH090.AT2']
+
+    # Factores de escala (Fsc) o búsqueda del colapso (hunt & fill)
+    malla=True
+    if malla:
+        Fsc=[0.25, 0.5, 0.75, 1.0, 1.2, 1.5, 2.0]
+        R=ida_malla(registros, Fsc, ruta_resultados='Outputs/IDA/ida.sqlite')
+    else:
+        R=ida_hunt_fill(registros, Fsc_inicial=0.25, paso_inicial=0.25, ruta_resultados='Outputs/IDA/ida.sqlite')
+
+    for registro in np.unique(R['registro']):
+        k=(R['registro']==registro) & (R['motivo']!='omitido')
+        plt.plot(R['deriva_max'][k], R['Fsc'][k], 'o-', label=registro)
+    plt.title('IDA')
+    plt.xlabel('Deriva máxima de entrepiso')
+    plt.ylabel('Fsc')
+    plt.legend()
+    plt.show()
+
+    toc = time.time()     # termina el cronómetro
+    print("Tiempo transcurrido: {:.4f} s".format(toc - tic))
@@ -25,6 +25,9 @@ wipe() # Limpia los objetos y archivos de salida del interprete
 	
 # DEFINITIONS:
 from DEF_leer_registro_peer import leer_registro_peer
+from DEF_secciones_fibras import seccion_fibras, definir_seccion_fibras
+from DEF_pushover import patron_pushover, definir_patron_pushover, pushover
+from DEF_modal import analisis_modal, escribir_propiedades_modales
 
 # CONSTANTS VALUES:
 g = 9810; # Aceleración de la gravedad en mm/s^2
@@ -58,39 +61,14 @@ GJ=1e12
 secTag=1
 numSubdivY=20
 numSubdivZ=2
-b=100
-h=200
-tw=5.6
-tf=8.5
-r=12
-A=((2*r)**2-pi*r**2)/4
-section('Fiber', secTag, '-GJ', GJ)
-patch('rect', matTag2, numSubdivY, numSubdivZ, -b/2,h/2-tf, b/2,h/2) # Ala sup
-patch('rect', matTag2, numSubdivZ, numSubdivY*2, -tw/2,-h/2+tf, tw/2,h/2-tf) # Alma
-patch('rect', matTag2, numSubdivY, numSubdivZ, -b/2,-h/2, b/2,-h/2+tf) # Ala inf
-
-fiber(tw/2+r/3, h/2-tf-r/3, A, matTag2)
-fiber(-(tw/2+r/3), h/2-tf-r/3, A, matTag2)
-fiber(tw/2+r/3, -(h/2-tf-r/3), A, matTag2)
-fiber(-(tw/2+r/3),-(h/2-tf-r/3), A, matTag2)
+# Alas numSubdivY x numSubdivZ, alma numSubdivZ x numSubdivY*2 y una fibra por acuerdo alma-ala
+fibras = seccion_fibras('IPE200', matTag2, nfy=numSubdivY, nfz=numSubdivZ, nwy=numSubdivZ, nwz=numSubdivY*2)
+definir_seccion_fibras(secTag, fibras, GJ)
 
 # secTag=1
 # section('Aggregator', secTag, *mats, '-section', sectionTag)
 
 
-# ACTIVAR LINEA 78 A 87, CANCELANDO DESDE LÍNEA 66 A 74
-# fib_sec_1 = [['section', 'Fiber', secTag, '-GJ', GJ],
-#              ['patch', 'rect', matTag2, numSubdivY, numSubdivZ, -b/2,h/2-tf, b/2,h/2], 
-#              ['patch', 'rect', matTag2, numSubdivZ, numSubdivY*2, -tw/2,-h/2+tf, tw/2,h/2-tf],  
-#              ['patch', 'rect',matTag2, numSubdivY, numSubdivZ, -b/2,-h/2, b/2,-h/2+tf]  
-#              ]
-# opsv.fib_sec_list_to_cmds(fib_sec_1)
-# matcolor = ['r', 'lightgrey', 'gold', 'w', 'w', 'w']
-# opsv.plot_fiber_section(fib_sec_1, matcolor=matcolor)
-# plt.axis('equal')
-# plt.show()
-
-   
 # TIME SERIES:
 tagTS=1
 
@@ -272,23 +250,27 @@ numEigenvalues=6
 os.makedirs("Outputs", exist_ok=True)
 ruta_pvd = "Outputs/PVDeigen"
 os.makedirs(ruta_pvd, exist_ok=True)
-recorder("PVD", ruta_pvd, 'eigen',numEigenvalues)
 
 # MODAL PROPERTIES
-Lambda=eigen(numEigenvalues)
-# modalProperties('-file', "reportFileName.out")
-os.makedirs("Outputs/modalProperties", exist_ok=True)
-MP=modalProperties('-file', "Outputs/modalProperties/ModalPropertiesReport.out",'-return')
-record() # Graba los recorder en un step concreto definido en la ejecición de recorder()
+# analisis_modal() guarda los modos y las propiedades en caché. Los modos de la
+# caché no están en el dominio, así que el PVD de los modos solo se graba cuando
+# se calculan (el de una ejecución anterior del mismo modelo sigue valiendo)
+modal=analisis_modal(numEigenvalues, propiedades=True)
+MP=modal['propiedades']
+escribir_propiedades_modales(MP, "Outputs/modalProperties/ModalPropertiesReport.out")
+if not modal['en_cache']:
+    recorder("PVD", ruta_pvd, 'eigen',numEigenvalues)
+    record() # Graba los recorder en un step concreto definido en la ejecición de recorder()
 
 print("Periodos:",MP['eigenPeriod'])
 
 dof=1
 eigenvector=3
-ux1=nodeEigenvector(NodeEnd+1, eigenvector, dof)
-ux2=nodeEigenvector(NodeEnd+2, eigenvector, dof)
-print('ux1:',ux1)
-print('ux2:',ux2)
+# Patrón de cargas laterales en los maestros de los diafragmas: 'modal'
+# (autovector del modo 'eigenvector', como ux1/ux2), 'uniforme' o 'triangular'
+nodos_planta=[NodeEnd+1, NodeEnd+2]
+cargas=patron_pushover('modal', nodos_planta, dof, modo=eigenvector, modal=modal)
+print('Cargas laterales:',cargas)
 wipeAnalysis()
 
 print('EIGEN ANALYSIS')
@@ -343,9 +325,7 @@ print('GRAVITY ANALYSIS')
 
 # PUSHOVER ANALYSUS
 # create a plain load pattern
-pattern("Plain", 2, tagTS)
-load(NodeEnd+1, ux1, 0, 0, 0, 0, 0)
-load(NodeEnd+2, ux2, 0, 0, 0, 0, 0)
+definir_patron_pushover(2, tagTS, nodos_planta, cargas, dof)
 
 system('UmfPack')
 numberer('AMD')
@@ -363,39 +343,15 @@ incr=1
 integrator('DisplacementControl', nodeTag, dof, incr)
 analysis("Static")
 
-Nsteps=500
-
-ustep=np.zeros(Nsteps)
-Lstep=np.zeros(Nsteps)
-Rstep=np.zeros(Nsteps)
-Fstep1=np.zeros(Nsteps)
-Fstep5=np.zeros(Nsteps)
-Fstep13=np.zeros(Nsteps)
-Fstep17=np.zeros(Nsteps)
-nstep=np.zeros(Nsteps)
-tstep=np.zeros(Nsteps)
-for i in range(Nsteps):
-
-    analyze(1)
-    
-    Fstep=eleForce(1)
-    eleR=eleResponse(1, "section",1,"force")
-    
-    # ustep[i]=nodeDisp(5, 1)
-    ustep[i]=nodeDisp(NodeEnd+2, 1)
-    Lstep[i]=getLoadFactor(1)
-    reactions()
-    Rstep[i]=nodeReaction(1, 1)
-    
-    Fstep1[i]=eleForce(1, 1)
-    Fstep5[i]=eleForce(5, 1)
-    Fstep13[i]=eleForce(13, 1)
-    Fstep17[i]=eleForce(17, 1)
-    nstep[i]=i+1
-
-Fstep=Fstep1+Fstep5+Fstep13+Fstep17
+# Incremento adaptativo (entre incr/64 y 4*incr) hasta 500 mm en el nudo de
+# control o hasta que el cortante en la base caiga un 20 % tras el pico
+desp_objetivo=500
+resultado=pushover(nodeTag, dof, incr, desp_objetivo=desp_objetivo, caida_resistencia=0.2)
+ustep=resultado['desplazamiento']
+Rstep=resultado['cortante']
+print('Fin del pushover:', resultado['motivo'], '- pasos:', len(ustep), '- V_max:', resultado['V_max'])
 print('PUSHOVER ANALYSIS')
-plt.plot(ustep,-Fstep*1e-3)
+plt.plot(ustep,-Rstep*1e-3)
 plt.title('F-u')
 plt.show()
 
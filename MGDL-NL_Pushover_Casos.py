@@ -0,0 +1,40 @@
+##################################################################
+##
+##                      Modelo de M-GDL
+##
+##  Pushover del pórtico 3D en ±X, ±Y con cargas uniformes y modales
+##
+## Autor - Nombre y apellidos.
+## Fecha - XX/XX/2025
+##################################################################
+
+# PYTHON LIBRERIES:
+import matplotlib.pyplot as plt
+import time
+
+# DEFINITIONS:
+from DEF_pushover_casos import casos_pushover, pushover_casos
+
+# Protección necesaria para los procesos de trabajo (multiprocessing en Windows)
+if __name__ == '__main__':
+
+    print("=========================================================")
+    print("Pushover - Pórtico 3D")
+
+    tic = time.time()     # empieza el cronómetro
+
+    # Casos dirección x sentido x patrón de cargas (8 pushover independientes)
+    casos=casos_pushover(direcciones=(1, 2), signos=(1, -1), patrones=('uniforme', 'modal'))
+    R=pushover_casos(casos, ruta_resultados='Outputs/Pushover/pushover_casos.npz',
+                     opciones={'desp_objetivo': 500})
+
+    for nombre, r in R.items():
+        plt.plot(abs(r['desplazamiento']), abs(r['cortante'])*1e-3, label=nombre)
+    plt.title('Curvas de capacidad')
+    plt.xlabel('Desplazamiento del nudo de control (mm)')
+    plt.ylabel('Cortante en la base (kN)')
+    plt.legend()
+    plt.show()
+
+    toc = time.time()     # termina el cronómetro
+    print("Tiempo transcurrido: {:.4f} s".format(toc - tic))
@@ -24,6 +24,10 @@ wipe() # Limpia los objetos y archivos de salida del interprete
 	
 # DEFINITIONS:
 from DEF_leer_registro_peer import leer_registro_peer
+from DEF_secciones_fibras import seccion_fibras, definir_seccion_fibras
+from DEF_paso_adaptativo import crear_control, analisis_interpolado, resumen_control
+from DEF_energia import iniciar_energia, actualizar_energia, balance_energia
+from DEF_modal import analisis_modal
 
 # CONSTANTS VALUES:
 g = 9810; # Aceleración de la gravedad en mm/s^2
@@ -57,39 +61,14 @@ GJ=1e12
 secTag=1
 numSubdivY=20
 numSubdivZ=2
-b=100
-h=200
-tw=5.6
-tf=8.5
-r=12
-A=((2*r)**2-pi*r**2)/4
-section('Fiber', secTag, '-GJ', GJ)
-patch('rect', matTag2, numSubdivY, numSubdivZ, -b/2,h/2-tf, b/2,h/2) # Ala sup
-patch('rect', matTag2, numSubdivZ, numSubdivY*2, -tw/2,-h/2+tf, tw/2,h/2-tf) # Alma
-patch('rect', matTag2, numSubdivY, numSubdivZ, -b/2,-h/2, b/2,-h/2+tf) # Ala inf
-
-fiber(tw/2+r/3, h/2-tf-r/3, A, matTag2)
-fiber(-(tw/2+r/3), h/2-tf-r/3, A, matTag2)
-fiber(tw/2+r/3, -(h/2-tf-r/3), A, matTag2)
-fiber(-(tw/2+r/3),-(h/2-tf-r/3), A, matTag2)
+# Alas numSubdivY x numSubdivZ, alma numSubdivZ x numSubdivY*2 y una fibra por acuerdo alma-ala
+fibras = seccion_fibras('IPE200', matTag2, nfy=numSubdivY, nfz=numSubdivZ, nwy=numSubdivZ, nwz=numSubdivY*2)
+definir_seccion_fibras(secTag, fibras, GJ)
 
 # secTag=1
 # section('Aggregator', secTag, *mats, '-section', sectionTag)
 
 
-# ACTIVAR LINEA 78 A 87, CANCELANDO DESDE LÍNEA 66 A 74
-# fib_sec_1 = [['section', 'Fiber', secTag, '-GJ', GJ],
-#              ['patch', 'rect', matTag2, numSubdivY, numSubdivZ, -b/2,h/2-tf, b/2,h/2], 
-#              ['patch', 'rect', matTag2, numSubdivZ, numSubdivY*2, -tw/2,-h/2+tf, tw/2,h/2-tf],  
-#              ['patch', 'rect',matTag2, numSubdivY, numSubdivZ, -b/2,-h/2, b/2,-h/2+tf]  
-#              ]
-# opsv.fib_sec_list_to_cmds(fib_sec_1)
-# matcolor = ['r', 'lightgrey', 'gold', 'w', 'w', 'w']
-# opsv.plot_fiber_section(fib_sec_1, matcolor=matcolor)
-# plt.axis('equal')
-# plt.show()
-
-   
 # TIME SERIES:
 tagTS=1
 Fsc=0.5 # Factor de escala
@@ -317,7 +296,8 @@ pattern('UniformExcitation', 1, 1, '-accel',tagTS)
 # MODELO DE AMORTIGUAMIENTO
 numEigenvalues=4
 Damping=0.05
-Lambda=eigen(numEigenvalues)
+modal=analisis_modal(numEigenvalues)
+Lambda=modal['Lambda']
 LambdaI=Lambda[0]
 omegaI=np.sqrt(LambdaI)
 
@@ -348,36 +328,48 @@ constraints("Transformation")
 integrator('Newmark', 0.5, 0.25)
 
 # create algorithm
+# El control de paso adaptativo empieza cada paso con KrylovNewton; si no
+# converge prueba Newton, NewtonLineSearch y ModifiedNewton y, si tampoco,
+# divide el paso (hasta dt/64). Tras varios pasos fáciles lo aumenta hasta
+# DT_MAX. Aquí DT_MAX = dt: el paso es el fijo del registro salvo donde hay
+# que dividirlo, como en el bucle anterior. Las salidas se interpolan en
+# t = i*dt, así que DT_MAX podría superar el dt del registro, pero entonces
+# la excitación se filtra: con DT_MAX = 2*dt el análisis tarda un 30 % menos
+# y el desplazamiento máximo cambia un 2 %.
+# Los recorder() de arriba escriben en cada subpaso convergido y no en
+# t = i*dt, así que sus archivos tienen filas de más donde se divide el paso
+# (y de menos con DT_MAX > dt); las series alineadas con el registro son las
+# de analisis_interpolado() (ustep, Rstep, ...).
 algorithm("KrylovNewton")
 tol=1e-3
 Iter=200
 pFlag=0
 nType=2
 test('NormDispIncr', tol, Iter, pFlag, nType)
+# Balance energético en cada paso convergido (también los subpasos)
+energia = iniciar_energia(ag, dt, 1, alphaM, betaK, betaKinit, betaKcomm)
+algoritmos = [('KrylovNewton',), ('Newton',), ('NewtonLineSearch',), ('ModifiedNewton',)]
+DT_MAX = dt
+control = crear_control(dt, dt_min=dt/2**6, dt_max=DT_MAX, algoritmos=algoritmos,
+                        al_converger=[lambda: actualizar_energia(energia)])
 
 # create analysis object
 analysis("Transient")
 
-ustep=np.zeros(Nsteps)
-Lstep=np.zeros(Nsteps)
-Rstep=np.zeros(Nsteps)
-Fstep1=np.zeros(Nsteps)
-Fstep5=np.zeros(Nsteps)
-nstep=np.zeros(Nsteps)
-tstep=np.zeros(Nsteps)
-for i in range(Nsteps):
-
-    analyze(1,dt)
-    
-    ustep[i]=nodeDisp(5, 1)
-    Lstep[i]=getLoadFactor(1)
+def leer_paso():
     reactions()
-    Rstep[i]=nodeReaction(1, 1)
-    Fstep1[i]=eleForce(1, 1)
-    Fstep5[i]=eleForce(5, 1)
-    nstep[i]=i+1
+    return nodeDisp(5, 1), getLoadFactor(1), nodeReaction(1, 1), eleForce(1, 1), eleForce(5, 1)
+
+pasos, salidas = analisis_interpolado(control, Nsteps, dt, leer_paso)
+ustep, Lstep, Rstep, Fstep1, Fstep5 = salidas.T
+nstep = np.arange(1, pasos + 1)
+# Comparación con el bucle anterior a paso fijo dt (mismo algoritmo y tol);
+# con su tiempo medido: resumen_control(control, tiempo_referencia=...)
+resumen, registro = resumen_control(control)
+print(f"Pasos de salida: {pasos}/{Nsteps}")
+print(resumen)
+print(balance_energia(energia))
 
-    
 Fstep=Fstep1+Fstep5
 # plt.plot(nstep,ustep)
 # plt.title('Disp.')
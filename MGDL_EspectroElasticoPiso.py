@@ -17,12 +17,13 @@ from openseespy.opensees import *
 import numpy as np
 import matplotlib.pyplot as plt
 import time
-from scipy.integrate import cumulative_trapezoid
 
 tic = time.time()     # empieza el cronómetro
 	
 # DEFINITIONS:
 from DEF_leer_registro_peer import leer_registro_peer
+from DEF_series_temporales import informe_coste_series
+from DEF_espectro_piso import aceleraciones_absolutas, espectros_piso
 
 # CONSTANTS VALUES:
 g = 9810; # Aceleración de la gravedad en mm/s^2
@@ -100,32 +101,14 @@ integrator('Newmark', 0.5, 0.25)
 analysis('Transient')
 
 # SAVE RESULTS
-ustep1=np.zeros(Nsteps)
-vstep1=np.zeros(Nsteps)
-astep1=np.zeros(Nsteps)
-ustep2=np.zeros(Nsteps)
-vstep2=np.zeros(Nsteps)
-astep2=np.zeros(Nsteps)
-
-nstep=np.zeros(Nsteps)
-tstep=np.zeros(Nsteps)
-for i in range(Nsteps):
-    
-    analyze(1,dt)
-    
-    ustep1[i]=nodeDisp(2, 1)
-    vstep1[i]=nodeVel(2, 1)
-    astep1[i]=nodeAccel(2, 1)
-    
-    ustep2[i]=nodeDisp(4, 1)
-    vstep2[i]=nodeVel(4, 1)
-    astep2[i]=nodeAccel(4, 1)
+# Una sola pasada de la estructura principal: aceleración absoluta de todas
+# las plantas (nodeAccel es relativa al terreno con UniformExcitation)
+nodos=[2, 4]
+apiso=aceleraciones_absolutas(nodos, Nsteps, dt, ag)
+tstep=np.arange(Nsteps + 1)*dt
 
-    nstep[i]=i+1
-    tstep[i]=getTime()
-    
-plt.plot(tstep,astep2, label='Piso 2')
-plt.plot(tstep,astep1, label='Piso 1')
+plt.plot(tstep,apiso[1], label='Piso 2')
+plt.plot(tstep,apiso[0], label='Piso 1')
 
 plt.title('Aceleración')
 plt.xlabel('tiempo [s]')
@@ -136,102 +119,27 @@ plt.show()
         
 T=np.arange(0.01, 3.03, 0.01)
 M=1 # Mass [T]
+amortiguamientos=(0.02, 0.05, 0.10)
+
+# Espectros de todas las plantas y amortiguamientos en una pasada vectorizada
+S=espectros_piso(apiso, dt, T, amortiguamientos, M)
+piso=1 # Piso 2
+iD=amortiguamientos.index(0.05)
+umax=S['umax'][piso, iD]
+vmax=S['vmax'][piso, iD]
+amax=S['amax'][piso, iD]
+Emax=S['Emax'][piso, iD]
+Fmax=S['Fmax'][piso, iD]
+
+for n, nd in enumerate(nodos):
+    for d, xi in enumerate(amortiguamientos):
+        plt.plot(T, S['Sa'][n, d], label='Piso {} - {:.0%}'.format(n + 1, xi))
+plt.title('Espectros de piso - Pseudoaceleración')
+plt.xlabel('T [s]')
+plt.ylabel(r'$S_a$ [mm/s$^2$]')
+plt.legend()
+plt.show()
 
-# Ruta al registro PEER
-ag=astep2
-
-umax=np.zeros(len(T))
-vmax=np.zeros(len(T))
-amax=np.zeros(len(T))
-Emax=np.zeros(len(T))
-Fmax=np.zeros(len(T))
-
-for j in range(len(T)):
-    
-    # OPENSEES LIBRERIES:
-    model('basic', '-ndm', 1, '-ndf', 1) # Carga las funciones de OpenSees para construir el modelo
-    wipe() # Limpia los objetos y archivos de salida del interprete
-
-    # MATERIALS LIBRERIES:
-    matTag=1
-    K=(2*pi/T[j])**2
-    uniaxialMaterial('Elastic', matTag, K)
-    
-    # SECTIONS LIBRERIES:
-    
-    # TIME SERIES:
-    tagTS=1
-    timeSeries('Path', tagTS, '-dt', dt, '-values', *ag)
-   
-        # NODE COORDENATES:
-    node(1, 0)
-    node(2, 0,'-mass', M)
-    
-    # BOUNDARY CONDITIONS:
-    fix(1, 1)
-    fix(2, 0)
-     
-    # ELEMENTS:
-    eleTag=1
-    element('zeroLength', eleTag, 1,2, '-mat', matTag, '-dir', 1,'-doRayleigh', 1)
-    
-    
-    # DAMPING MODEL    
-    Damping=0.05
-    Lambda=eigen('-fullGenLapack', 1)
-    LambdaI=Lambda[0]
-   
-    omegaI=np.sqrt(LambdaI)
-    
-    alphaM=2*Damping*omegaI
-    betaK=0
-    betaKinit=0
-    betaKcomm=0
-    rayleigh(alphaM, betaK, betaKinit, betaKcomm)
-    	 
-    # ANALYSIS
-    accelSeriesTag=tagTS
-    pattern('UniformExcitation', 1, 1, '-accel', accelSeriesTag)
-    
-    system('UmfPack')
-    numberer("RCM")
-    constraints('Transformation')
-    algorithm("Newton")
-    integrator('Newmark', 0.5, 0.25)
-    analysis('Transient')
-
-    # SAVE RESULTS
-    ustep=np.zeros(Nsteps)
-    vstep=np.zeros(Nsteps)
-    astep=np.zeros(Nsteps)
-    Estep=np.zeros(Nsteps)
-    Lstep=np.zeros(Nsteps)
-    Fstep=np.zeros(Nsteps)
-    nstep=np.zeros(Nsteps)
-    tstep=np.zeros(Nsteps)
-    for i in range(Nsteps):
-        
-        analyze(1,dt)
-        
-        ustep[i]=nodeDisp(2, 1)
-        vstep[i]=nodeVel(2, 1)
-        astep[i]=nodeAccel(2, 1)
-        
-        Lstep[i]=getLoadFactor(1)
-        Fstep[i]=eleForce(1, 1)
-        nstep[i]=i+1
-        tstep[i]=getTime()
-        
-    du = np.gradient(ustep, dt)
-    Estep = cumulative_trapezoid(-ag * M * vstep, dx=dt, initial=0.0)
-    
-    # FIGURE
-    umax[j]=np.max(np.abs(ustep))
-    vmax[j]=np.max(np.abs(vstep))
-    amax[j]=np.max(np.abs(astep))
-    Fmax[j]=np.max(np.abs(Fstep))
-    Emax[j]=np.max(Estep)
-        
 plt.plot(T,amax)
 plt.title('Espectro Elástico - Aceleración')
 plt.xlabel('T [s]')
@@ -266,6 +174,7 @@ plt.show()
 
 toc = time.time()     # termina el cronómetro
 print("Tiempo transcurrido: {:.4f} s".format(toc - tic))
+informe_coste_series()
 
    
 
@@ -0,0 +1,39 @@
+##################################################################
+##
+##                      Modelo de M-GDL
+##
+##  Tiempo y memoria de los solvers de autovalores según el nº de gdl
+##
+## Autor - Nombre y apellidos.
+## Fecha - XX/XX/2025
+##################################################################
+
+# PYTHON LIBRERIES:
+import numpy as np
+import matplotlib.pyplot as plt
+
+# DEFINITIONS:
+from DEF_modal import medir_solvers_modales, SOLVERS_BANCO
+
+# Protección necesaria para los procesos de trabajo (multiprocessing en Windows)
+if __name__ == '__main__':
+
+    print("=========================================================")
+    print("Solvers de autovalores: 1 GDL, 52 elementos, 2k, 10k y 100k gdl")
+
+    # '-fullGenLapack' (denso), '-genBandArpack' (ARPACK de OpenSees) y
+    # 'scipy' (ARPACK shift-invert sobre K y M dispersas)
+    R=medir_solvers_modales(n_modos=6, n_max_denso=4000)
+
+    fig, ax = plt.subplots(1, 2, figsize=(10, 4))
+    for solver in SOLVERS_BANCO:
+        filas=[r for r in R if r['solver']==solver and np.isfinite(r['tiempo'])]
+        gdl=[r['gdl'] for r in filas]
+        ax[0].loglog(gdl, [r['tiempo'] for r in filas], 'o-', label=solver)
+        ax[1].loglog(gdl, [r['memoria'] for r in filas], 'o-', label=solver)
+    ax[0].set_xlabel('gdl')
+    ax[0].set_ylabel('Tiempo (s)')
+    ax[1].set_xlabel('gdl')
+    ax[1].set_ylabel('Memoria (MB)')
+    ax[0].legend()
+    plt.show()